@@ -6,8 +6,10 @@ import json
 from datetime import datetime
 import logging
 from logging.handlers import RotatingFileHandler
-from api_statement_parser import parse_statement_from_file # Import the parsing function
-import io
+from api_statement_parser import parse_statement_from_file, result_cache # Import the parsing function
+from statement_core.detect import UnsupportedStatementError
+from statement_core.ingest import spool_upload
+from statement_core.merchants import merchant_memo
 import traceback
 
 # Load environment variables
@@ -34,7 +36,8 @@ def index():
         'status': 'API is running',
         'endpoints': {
             'health': '/health',
-            'analyze': '/analyze-statement'
+            'analyze': '/analyze-statement',
+            'cache_stats': '/cache-stats'
         },
         'version': '1.0.0'
     })
@@ -43,6 +46,14 @@ def index():
 def health_check():
     return jsonify({"status": "healthy"}), 200
 
+@app.route('/cache-stats')
+def cache_stats():
+    # Counters are per worker process; the disk tier is shared
+    stats = result_cache.get_stats()
+    # The merchant memo counts in its SQLite file, across workers and CLI runs
+    stats['merchant_memo'] = merchant_memo.get_stats() if merchant_memo is not None else None
+    return jsonify(stats), 200
+
 @app.route('/analyze-statement', methods=['POST'])
 def analyze_statement():
     app.logger.info('Received analyze-statement request')
@@ -65,15 +76,17 @@ def analyze_statement():
             app.logger.warning(f'Invalid file type: {file.filename}')
             return jsonify({'error': 'Only PDF files are supported'}), 400
 
-        # Pass the file stream to the parsing function
-        file_stream = io.BytesIO(file.read())
-        file_stream.name = file.filename  # Preserve the filename
-        app.logger.info('Starting statement parsing')
-        
-        results = parse_statement_from_file(file_stream)
+        # Small uploads stay in memory, large ones are spooled to a temp file;
+        # either way the parser reads the same buffer without copying it
+        with spool_upload(file.stream, file.filename) as source:
+            app.logger.info('Starting statement parsing')
+            results = parse_statement_from_file(source)
         app.logger.info('Successfully parsed statement')
         return jsonify(results), 200
 
+    except UnsupportedStatementError as e:
+        app.logger.warning(f'Rejected statement: {str(e)}')
+        return jsonify({'error': 'Unsupported statement', 'details': str(e)}), 400
     except Exception as e:
         app.logger.error(f'Error processing file: {str(e)}')
         app.logger.error(traceback.format_exc())
@@ -88,7 +101,7 @@ def not_found_error(error):
     return jsonify({
         'error': 'Not Found',
         'message': 'The requested URL was not found on the server.',
-        'available_endpoints': ['/', '/health', '/analyze-statement']
+        'available_endpoints': ['/', '/health', '/analyze-statement', '/cache-stats']
     }), 404
 
 @app.errorhandler(500)
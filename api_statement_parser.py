@@ -1,225 +1,147 @@
-import pandas as pd
-import pdfplumber
+import numpy as np
 from pathlib import Path
-import io
-import re
-from datetime import datetime
 import json
 import sys
 import argparse
 import traceback
 import logging
 
+from statement_core import amounts, classifier, dates, extraction, keywords, merchants, payees, tokenizer, vectorized
+from statement_core.amounts import rupees, summarize
+from statement_core.detect import ISSUER_LABELS, UnsupportedStatementError, sniff_issuer
+from statement_core.ingest import PdfSource, as_source
+from statement_core.category_model import category_models
+from statement_core.parsers import phonepe
+from statement_core.parsers.phonepe import TRANSACTION_PATTERNS, PhonePeParser
+from statement_core.result_cache import ResultCache, code_version
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-class StatementParser:
-    def __init__(self, file_source):
-        # file_source can be a file path (string or Path object) or a file-like object
-        self.file_source = file_source
+# Category model (statement_core/categories/api.json); its version is part of the result cache key
+CATEGORY_MODEL = 'api'
+# Compiled at import, so workers forked from a preloaded app inherit it
+category_models.get(CATEGORY_MODEL)
+# Known merchants in memory before the first upload
+if merchants.merchant_memo is not None:
+    merchants.merchant_memo.warm(category_models.get(CATEGORY_MODEL).version)
+
+# Changes whenever the parsing or matching code changes, invalidating cached results
+PARSER_VERSION = code_version(__file__, phonepe.__file__, amounts.__file__, classifier.__file__, dates.__file__,
+                              extraction.__file__, keywords.__file__, merchants.__file__, payees.__file__,
+                              tokenizer.__file__, vectorized.__file__)
+
+# Parsed results keyed by PDF content hash, shared across workers via disk
+result_cache = ResultCache()
+
+# Issuers this parser understands; unrecognised statements are still attempted
+SUPPORTED_ISSUERS = ('phonepe',)
+
+class StatementParser(PhonePeParser):
+    """The shared PhonePe record parser with the API's categories"""
+
+    def __init__(self, file_source, mode=None, categories=None):
+        # One model for the whole statement, even if the file is reloaded mid-parse
+        self.categories = categories or category_models.get(CATEGORY_MODEL)
+        super().__init__(file_source, mode=mode, categorize=self._categorize_transactions)
         self.filename = getattr(file_source, 'name', 'uploaded_file') # Get name if file object
         logger.info(f"Initializing parser for file: {self.filename}")
 
     def parse(self):
         """Parse the file into a standardized DataFrame"""
         try:
-            if isinstance(self.file_source, (str, Path)):
-                if str(self.file_source).endswith('.pdf'):
-                    logger.info(f"Opening PDF file: {self.file_source}")
-                    return self._parse_pdf(open(self.file_source, 'rb'))
-                else:
-                    raise ValueError("Unsupported file format")
-            elif hasattr(self.file_source, 'read'): # Check if it's a file-like object
-                logger.info("Processing file-like object")
-                return self._parse_pdf(self.file_source)
-            else:
+            if isinstance(self.file_source, (str, Path)) and not str(self.file_source).endswith('.pdf'):
+                raise ValueError("Unsupported file format")
+            if (not isinstance(self.file_source, (str, Path, PdfSource, bytes, bytearray, memoryview))
+                    and not hasattr(self.file_source, 'read')):
                 raise ValueError("Unsupported file source type")
+            return super().parse()
         except Exception as e:
             logger.error(f"Error in parse method: {str(e)}")
             logger.error(traceback.format_exc())
             raise
 
-    def _parse_pdf(self, pdf_file_obj):
-        """Handle PDF parsing with comprehensive extraction"""
-        try:
-            with pdfplumber.open(pdf_file_obj) as pdf:
-                all_extracted_text = []
-                logger.info(f"PDF opened successfully. Number of pages: {len(pdf.pages)}")
-                
-                # Transaction patterns for PhonePe statements
-                transaction_patterns = [
-                    # Pattern 1: PhonePe standard format
-                    re.compile(
-                        r'(?P<date>(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s*\d{1,2},\s*\d{4})\s*'
-                        r'(?P<time>\d{2}:\d{2}\s*[AP]M)?\s*'
-                        r'(?P<description>.*?)\s*'
-                        r'(?P<type>Credit|Debit)?\s*'
-                        r'(?:INR|₹|Rs\.?)\s*(?P<amount>[\d,]+\.?\d*)',
-                        re.IGNORECASE | re.MULTILINE | re.DOTALL
-                    ),
-                    # Pattern 2: Alternative PhonePe format
-                    re.compile(
-                        r'(?P<date>\d{1,2}\s*(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s*\d{4})\s*'
-                        r'(?P<time>\d{2}:\d{2}\s*[AP]M)?\s*'
-                        r'(?P<description>.*?)\s*'
-                        r'(?P<amount>[-+]?₹?\s*[\d,]+\.?\d*)',
-                        re.IGNORECASE | re.MULTILINE | re.DOTALL
-                    )
-                ]
-
-                # Extract text from all pages
-                for i, page in enumerate(pdf.pages):
-                    text = page.extract_text()
-                    if text and text.strip():
-                        all_extracted_text.append(text)
-                        logger.debug(f"Extracted text from page {i+1}")
-
-                full_text = "\n".join(all_extracted_text)
-                transactions = []
-                logger.info("Starting transaction extraction")
-
-                # Extract transactions
-                for pattern in transaction_patterns:
-                    matches = list(pattern.finditer(full_text))
-                    logger.info(f"Found {len(matches)} potential transactions with pattern")
-                    
-                    for match in matches:
-                        try:
-                            date_str = match.group('date').strip()
-                            date = self._parse_date(date_str)
-                            description = match.group('description').strip()
-                            amount_str = match.group('amount')
-                            amount_str = re.sub(r'[₹,\s]', '', amount_str)
-                            amount = float(amount_str)
-                            
-                            transaction_type = match.group('type') if 'type' in match.groupdict() else None
-                            if transaction_type:
-                                transaction_type = transaction_type.upper()
-                                if transaction_type in ['DEBIT', 'Dr']:
-                                    amount = -abs(amount)
-                            
-                            transactions.append({
-                                'date': date,
-                                'amount': amount,
-                                'description': description,
-                                'category': self._categorize_transaction(description)
-                            })
-                            logger.debug(f"Processed transaction: {date} - {amount} - {description}")
-                        except Exception as e:
-                            logger.warning(f"Could not process transaction: {e}")
-                            logger.debug(f"Problematic match: {match.groupdict()}")
-
-                if transactions:
-                    logger.info(f"Successfully extracted {len(transactions)} transactions")
-                    df = pd.DataFrame(transactions)
-                    df = df[df['amount'].abs() > 0]
-                    df = df.drop_duplicates(subset=['date', 'amount', 'description'])
-                    df = df.sort_values('date')
-                    return df
-                else:
-                    logger.warning("No transactions found in the PDF")
-                    return pd.DataFrame(columns=['date', 'amount', 'description', 'category'])
+    def _categorize_transactions(self, descriptions):
+        """Categorize transactions based on their descriptions"""
+        return payees.categorize_many(descriptions, self.categories)
 
-        except Exception as e:
-            logger.error(f"PDF parsing error: {str(e)}")
-            logger.error(traceback.format_exc())
-            return pd.DataFrame(columns=['date', 'amount', 'description', 'category'])
-
-    def _parse_date(self, date_str):
-        """Parse date string into datetime object"""
-        try:
-            if not date_str:
-                return datetime.now()
-
-            date_str = date_str.strip()
-            date_formats = [
-                '%d %b %Y',      # 06 Nov 2024
-                '%b %d %Y',      # Nov 06 2024
-                '%d %B %Y',      # 06 November 2024
-                '%B %d %Y',      # November 06 2024
-                '%m/%d/%Y',      # 11/06/2024
-                '%d/%m/%Y',      # 06/11/2024
-                '%Y-%m-%d',      # 2024-11-06
-                '%d-%m-%Y',      # 06-11-2024
-                '%b %d, %Y',     # Nov 06, 2024
-                '%d %b, %Y',     # 06 Nov, 2024
-                '%d-%b-%Y',      # 06-Nov-2024
-                '%b-%d-%Y'       # Nov-06-2024
-            ]
-            
-            for fmt in date_formats:
-                try:
-                    parsed_date = datetime.strptime(date_str, fmt)
-                    if parsed_date.year > datetime.now().year:
-                        parsed_date = parsed_date.replace(year=datetime.now().year)
-                    return parsed_date
-                except ValueError:
-                    continue
-            
-            # Fallback: try to extract components
-            components = re.findall(r'\d+', date_str)
-            if len(components) >= 3:
-                day, month, year = map(int, components[:3])
-                if year < 100:
-                    year += 2000 if year < 50 else 1900
-                return datetime(year, month, day)
-            
-            return datetime.now()
-            
-        except Exception as e:
-            logger.error(f"Date parsing error: {str(e)}")
-            return datetime.now()
-
-    def _categorize_transaction(self, description):
-        """Categorize transaction based on description"""
-        description = description.lower()
-        
-        categories = {
-            'Food': ['restaurant', 'food', 'swiggy', 'zomato', 'dining'],
-            'Transportation': ['uber', 'ola', 'metro', 'fuel', 'petrol', 'diesel'],
-            'Shopping': ['amazon', 'flipkart', 'myntra', 'retail', 'store'],
-            'Bills': ['electricity', 'water', 'gas', 'mobile', 'internet', 'broadband'],
-            'Entertainment': ['movie', 'netflix', 'amazon prime', 'hotstar'],
-            'Transfer': ['transfer', 'sent', 'received', 'upi', 'neft', 'imps'],
-            'Salary': ['salary', 'income', 'payment'],
-        }
-        
-        for category, keywords in categories.items():
-            if any(keyword in description for keyword in keywords):
-                return category
-        
-        return 'Others'
+def iter_transactions(file_source):
+    """Yield transactions from a statement one at a time, for incremental consumers"""
+    return StatementParser(file_source).iter_transactions()
 
 def parse_statement_from_file(file_source):
     """Function to parse a statement from a file-like object or path."""
-    statement_parser = StatementParser(file_source)
-    df = statement_parser.parse()
-    
+    source = as_source(file_source)
+    try:
+        # Identical uploads with unchanged parser code and categories reuse the earlier result
+        categories = category_models.get(CATEGORY_MODEL)
+        cache_key = result_cache.key(source, f"{PARSER_VERSION}-{categories.version}")
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Result cache hit for {cache_key[:12]}")
+            return cached
+
+        # Reject other issuers' statements before extracting every page
+        issuer = sniff_issuer(source, expected=SUPPORTED_ISSUERS[0])
+        if issuer is not None and issuer not in SUPPORTED_ISSUERS:
+            raise UnsupportedStatementError(
+                f"{ISSUER_LABELS[issuer]} statements are not supported; please upload a PhonePe statement")
+
+        statement_parser = StatementParser(source, categories=categories)
+        response = _build_response(statement_parser.parse())
+        response['truncated'] = statement_parser.truncated
+        # A partial result would hide the full one if cached
+        if not statement_parser.truncated:
+            result_cache.put(cache_key, response)
+        return response
+    finally:
+        if source is not file_source:
+            source.close()
+
+def _build_response(df):
+    """Convert the parsed DataFrame into the JSON response.
+
+    Totals are summed as int64 paise; rupees appear only in the output.
+    """
+    paise = df['amount_paise'].to_numpy(dtype=np.int64)
+    descriptions = df['description'] if 'description' in df else [''] * len(df)
+
     # Convert DataFrame to dictionary format
-    transactions = []
-    for _, row in df.iterrows():
-        transactions.append({
-            'date': row['date'].strftime('%Y-%m-%d'),
-            'amount': float(row['amount']),
-            'description': str(row['description']) if 'description' in row else '',
-            'category': str(row['category'])
-        })
+    transactions = [
+        {
+            'date': date.strftime('%Y-%m-%d'),
+            'amount': amount,
+            'description': str(description),
+            'category': str(category)
+        }
+        for date, amount, description, category in zip(df['date'], rupees(paise).tolist(), descriptions, df['category'])
+    ]
 
     # Calculate totals
-    total_received = float(df[df['amount'] > 0]['amount'].sum())
-    total_spent = float(df[df['amount'] < 0]['amount'].sum())
-    
+    totals = summarize(paise, df['category'])
+
     # Calculate category breakdown
-    category_breakdown = df[df['amount'] < 0].groupby('category')['amount'].sum().to_dict()
-    category_breakdown = {k: float(v) for k, v in category_breakdown.items()}
+    category_breakdown = {k: rupees(spent) for k, (spent, _) in sorted(totals['by_category'].items())}
+
+    # Per-payee totals from the parse stage's payee column, biggest spends first
+    payee_breakdown = {}
+    if 'payee' in df:
+        for payee, vpa, count, received, spent, _ in payees.payee_totals(df).itertuples():
+            payee_breakdown[payee] = {
+                'vpa': vpa if isinstance(vpa, str) else None,
+                'count': int(count),
+                'received': rupees(int(received)),
+                'spent': rupees(int(spent))
+            }
 
     # Create response object
     response = {
         'transactions': transactions,
-        'totalReceived': total_received,
-        'totalSpent': total_spent,
-        'categoryBreakdown': category_breakdown
+        'totalReceived': rupees(totals['received']),
+        'totalSpent': rupees(totals['spent']),
+        'categoryBreakdown': category_breakdown,
+        'payeeBreakdown': payee_breakdown
     }
     return response
 
@@ -0,0 +1,36 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Module-level caches are created on import, so point them away from the
+# repo's cache/ directory before any test imports statement_core
+os.environ['STATEMENT_CACHE_DIR'] = tempfile.mkdtemp(prefix='statement-cache-')
+
+from statement_core import extraction, merchants, ocr
+from statement_core.merchants import MerchantMemo
+from statement_core.page_cache import PageTextCache
+from statement_core.result_cache import ResultCache
+
+# These call a running server rather than the code in this tree
+collect_ignore = ['test_api.py', 'test_app.py']
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Give every test its own empty cache directory, shared instances included"""
+    directory = tmp_path / 'cache'
+    monkeypatch.setenv('STATEMENT_CACHE_DIR', str(directory))
+    page_cache = PageTextCache(str(directory / 'pages.db'))
+    monkeypatch.setattr(extraction, 'page_cache', page_cache)
+    monkeypatch.setattr(ocr, 'page_cache', page_cache)
+    merchant_memo = MerchantMemo(str(directory / 'merchants.db'))
+    monkeypatch.setattr(merchants, 'merchant_memo', merchant_memo)
+    result_cache = ResultCache(str(directory / 'results'))
+    for name in ('api_statement_parser', 'api_server'):
+        if name in sys.modules:
+            monkeypatch.setattr(sys.modules[name], 'result_cache', result_cache)
+    if 'api_server' in sys.modules:
+        monkeypatch.setattr(sys.modules['api_server'], 'merchant_memo', merchant_memo)
+    return directory
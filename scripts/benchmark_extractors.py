@@ -0,0 +1,31 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from statement_core.extraction import benchmark_extractors
+
+
+def main(paths):
+    """Rank the text backends on sample statements and print the best order"""
+    totals = {}
+    for path in paths:
+        with open(path, 'rb') as f:
+            pdf_bytes = f.read()
+
+        print(path)
+        for name, seconds, correct in benchmark_extractors(pdf_bytes):
+            print(f"  {name:<12} {seconds * 1000:8.1f} ms  {'ok' if correct else 'MISMATCH'}")
+            total, all_correct = totals.get(name, (0.0, True))
+            totals[name] = (total + seconds, all_correct and correct)
+
+    # Backends that were wrong on any sample go last
+    order = sorted(totals, key=lambda name: (not totals[name][1], totals[name][0]))
+    print(f"PARSER_EXTRACTORS={','.join(order)}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python benchmark_extractors.py <statement.pdf> [<statement.pdf> ...]", file=sys.stderr)
+        sys.exit(1)
+
+    main(sys.argv[1:])
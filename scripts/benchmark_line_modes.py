@@ -0,0 +1,58 @@
+import os
+import sys
+import time
+
+# Appended, so `statement_parser` resolves to the one next to this script
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import statement_parser as cli_statement_parser
+import api_statement_parser
+from statement_core.ingest import PdfSource
+from statement_core.vectorized import LINE_MODES
+
+PARSERS = {
+    'scripts': lambda source, mode: cli_statement_parser.StatementParser(source, mode=mode).parse(),
+    'api': lambda source, mode: api_statement_parser.StatementParser(source, mode=mode).parse(),
+}
+
+COLUMNS = ['date', 'amount_paise', 'description', 'category']
+
+
+def run(parse, source, mode, repeat):
+    """Best wall time of `repeat` parses, plus the last result"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = parse(source, mode)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, df
+
+
+def normalized(df):
+    columns = [column for column in COLUMNS if column in df]
+    return df[columns].sort_values(columns).reset_index(drop=True).astype(str)
+
+
+def main(paths, repeat=3):
+    """Compare the loop and vectorized line parsing of each parser on sample statements"""
+    for path in paths:
+        source = PdfSource(path=path, name=path)
+        # Warm the page cache so both modes time parsing, not extraction
+        api_statement_parser.StatementParser(source).parse()
+
+        print(path)
+        for name, parse in PARSERS.items():
+            results = {mode: run(parse, source, mode, repeat) for mode in LINE_MODES}
+            reference = normalized(results['loop'][1])
+            for mode, (seconds, df) in results.items():
+                same = normalized(df).equals(reference)
+                print(f"  {name:<8} {mode:<11} {seconds * 1000:8.1f} ms  {len(df):6d} rows  "
+                      f"{'ok' if same else 'MISMATCH'}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python benchmark_line_modes.py <statement.pdf> [<statement.pdf> ...]", file=sys.stderr)
+        sys.exit(1)
+
+    main(sys.argv[1:])
@@ -0,0 +1,51 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from statement_core.parsers.paytm import scan_lines
+
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+
+def synthetic_statement(rows, seed=0):
+    """Paytm-style statement text with `rows` transactions.
+
+    Every seventh amount has its sign split from the amount by a line
+    break, and the transaction heading repeats every 50 rows like a page
+    header.
+    """
+    rng = random.Random(seed)
+    lines = ["Paytm Statement", "Rs.1,234.00 + Rs.5,678.00", "Date & Time Transaction Details"]
+    for i in range(rows):
+        lines.append(f"{rng.randint(1, 28)} {rng.choice(MONTHS)}")
+        lines.append(f"{rng.randint(1, 12)}:{rng.randint(10, 59)} PM Paid to Merchant {i}")
+        amount = f"Rs.{rng.randint(1, 99999):,}.{rng.randint(0, 99):02d}"
+        sign = rng.choice('+-')
+        if i % 7 == 0:
+            lines.append(f"UPI Ref No: {rng.randint(10**9, 10**10)} {sign}")
+            lines.append(amount)
+        else:
+            lines.append(f"UPI Ref No: {rng.randint(10**9, 10**10)} {sign} {amount}")
+        if i % 50 == 49:
+            lines.append("Date & Time Transaction Details")
+    return "\n".join(lines)
+
+
+def main(sizes, repeat=3):
+    """Time the Paytm line scanner on growing synthetic statements"""
+    for rows in sizes:
+        lines = synthetic_statement(rows).split('\n')
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            dates, amounts, descriptions = scan_lines(lines)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        assert len(dates) == rows, f"expected {rows} transactions, parsed {len(dates)}"
+        print(f"{rows:7d} rows {len(lines):7d} lines {best * 1000:8.1f} ms  {best / rows * 1e6:6.2f} us/row")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 20000, 40000])
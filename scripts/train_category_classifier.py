@@ -0,0 +1,41 @@
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from statement_core.classifier import CATEGORY_CLASSIFIER_DIR, HASH_BITS, NaiveBayesClassifier
+
+
+def main(csv_path, name, directory, bits, holdout):
+    """Train a category model's classifier on a CSV of labelled descriptions"""
+    history = pd.read_csv(csv_path, usecols=['description', 'category']).dropna()
+    if holdout:
+        # Every holdout-th row is kept back to report accuracy on
+        test = np.arange(len(history)) % holdout == 0
+        classifier = NaiveBayesClassifier.train(history['description'][~test], history['category'][~test], bits=bits)
+        start = time.perf_counter()
+        predicted = classifier.predict(history['description'][test], min_confidence=0)
+        elapsed = time.perf_counter() - start
+        accuracy = np.mean(predicted == history['category'][test].to_numpy(dtype=object))
+        print(f"Held-out accuracy {accuracy:.3f} on {test.sum()} rows, predicted in {elapsed * 1000:.1f} ms")
+
+    classifier = NaiveBayesClassifier.train(history['description'], history['category'], bits=bits)
+    os.makedirs(directory, exist_ok=True)
+    prefix = os.path.join(directory, name)
+    classifier.save(prefix)
+    print(f"Saved {prefix}.npy and {prefix}.json ({len(classifier.classes)} classes, {len(history)} rows)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Train the naive Bayes category classifier for a category model')
+    parser.add_argument('csv_path', help='CSV with description and category columns')
+    parser.add_argument('name', help='Category model the classifier serves (api, cli, app or fixed)')
+    parser.add_argument('--directory', default=CATEGORY_CLASSIFIER_DIR, help='Where the model files are written')
+    parser.add_argument('--bits', type=int, default=HASH_BITS, help='Hash table size as a power of two')
+    parser.add_argument('--holdout', type=int, default=10, help='Report accuracy on every Nth row first; 0 skips')
+    args = parser.parse_args()
+    main(args.csv_path, args.name, args.directory, args.bits, args.holdout)
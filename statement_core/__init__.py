@@ -0,0 +1,8 @@
+"""Shared building blocks for the statement parsers (API, CLI and Streamlit)."""
+import os
+
+# Every on-disk cache lives under this directory. It is resolved from the
+# package rather than the working directory, so the API, the CLI (run from
+# scripts/) and Streamlit share one set of files.
+CACHE_ROOT = os.getenv('STATEMENT_CACHE_DIR',
+                       os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache'))
@@ -0,0 +1,73 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# Amounts are held as whole paise in int64 so sums are exact; they become
+# rupees only when a response is serialized
+PAISE_PER_RUPEE = 100
+
+AMOUNT_PATTERN = re.compile(r'^(?P<sign>[+-]?)(?P<whole>\d*)(?:\.(?P<fraction>\d*))?$')
+
+
+def to_paise(amount, strip=','):
+    """'1,234.5' -> 123450 without going through float.
+
+    Digits past the second decimal place round half up.
+    """
+    match = AMOUNT_PATTERN.match(re.sub(f'[{strip}]', '', amount))
+    if not match or not (match.group('whole') or match.group('fraction')):
+        raise ValueError(f"Not an amount: {amount!r}")
+    fraction = (match.group('fraction') or '').ljust(3, '0')
+    paise = int(match.group('whole') or 0) * PAISE_PER_RUPEE + int(fraction[:2]) + (fraction[2] >= '5')
+    return -paise if match.group('sign') == '-' else paise
+
+
+def parse_paise(amounts, strip=','):
+    """Vectorized to_paise: amount strings to a nullable Int64 Series, <NA> if unparseable"""
+    parts = amounts.str.replace(f'[{strip}]', '', regex=True).str.extract(AMOUNT_PATTERN)
+    whole = parts['whole'].fillna('')
+    fraction = parts['fraction'].fillna('')
+    valid = (whole.str.len() + fraction.str.len()) > 0
+
+    fraction = fraction.str.ljust(3, '0')
+    paise = (whole.replace('', '0').astype('int64') * PAISE_PER_RUPEE
+             + fraction.str[:2].astype('int64')
+             + (fraction.str[2] >= '5').astype('int64'))
+    paise = paise.where(parts['sign'] != '-', -paise)
+    return paise.astype('Int64').where(valid)
+
+
+def rupees_to_paise(rupees):
+    """Float rupee amounts (e.g. from CSV uploads) to int64 paise"""
+    return np.rint(np.asarray(rupees, dtype=float) * PAISE_PER_RUPEE).astype(np.int64)
+
+
+def rupees(paise):
+    """Paise (int, array or Series) to rupees, for serialization and display only"""
+    return paise / PAISE_PER_RUPEE
+
+
+def summarize(paise, categories):
+    """Exact totals over an int64 paise array.
+
+    Returns a dict of paise sums and counts: 'received', 'spent' (negative),
+    'credit_count', 'debit_count' and 'by_category', which maps each
+    category of a debit to (paise spent, count) in order of first debit.
+    """
+    paise = np.asarray(paise, dtype=np.int64)
+    credit = paise > 0
+    debit = paise < 0
+
+    codes, names = pd.factorize(np.asarray(categories, dtype=object)[debit])
+    spent_by = np.zeros(len(names), dtype=np.int64)
+    np.add.at(spent_by, codes, paise[debit])
+    counts = np.bincount(codes, minlength=len(names))
+
+    return {
+        'received': int(paise[credit].sum()),
+        'spent': int(paise[debit].sum()),
+        'credit_count': int(credit.sum()),
+        'debit_count': int(debit.sum()),
+        'by_category': {name: (int(spent), int(count)) for name, spent, count in zip(names, spent_by, counts)},
+    }
@@ -0,0 +1,159 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from statement_core.classifier import load_classifier
+from statement_core.keywords import KeywordCategorizer
+from statement_core.payees import PayeeRules
+
+logger = logging.getLogger(__name__)
+
+# One JSON file per category model: <name>.json
+CATEGORY_MODEL_DIR = os.getenv('CATEGORY_MODEL_DIR', os.path.join(os.path.dirname(__file__), 'categories'))
+
+# Seconds between checks of a model file for edits; 0 checks on every lookup
+CATEGORY_RELOAD_INTERVAL = float(os.getenv('CATEGORY_RELOAD_INTERVAL', 30))
+
+RULES = ('weighted', 'first_match')
+
+
+class CategoryModel:
+    """A category file compiled into a keyword automaton. Never modified after construction.
+
+    version combines the file's declared version with a hash of its
+    contents, so any edit to the file changes it. The file's optional
+    "payees" object holds payee rules (see PayeeRules), applied before
+    the keywords by statement_core.payees.categorize_many.
+
+    Given a trained classifier (statement_core.classifier), the model
+    labels with it and falls back to the keywords for descriptions it is
+    unsure of; the classifier's digest then joins the version.
+    """
+
+    __slots__ = ('name', 'version', 'rule', 'default', 'payees', 'categorize', 'categorize_many')
+
+    def __init__(self, name, data, digest, classifier=None):
+        rule = data.get('rule', 'weighted')
+        if rule not in RULES:
+            raise ValueError(f"Category model {name}: rule must be one of {', '.join(RULES)}")
+        categories = {}
+        for category in data['categories']:
+            if category['name'] in categories:
+                raise ValueError(f"Category model {name}: {category['name']} is defined twice")
+            categories[category['name']] = {'keywords': category['keywords'], 'weight': category.get('weight', 1)}
+
+        categorizer = KeywordCategorizer(categories, default=data['default'])
+        version = f"{name}-v{data['version']}-{digest[:8]}"
+        categorize = categorizer.first_match if rule == 'first_match' else categorizer.categorize
+        categorize_many = partial(categorizer.categorize_many, rule=rule)
+        if classifier is not None:
+            version = f"{version}-nb{classifier.digest[:8]}"
+            categorize_many = partial(classify_many, classifier, categorize_many)
+            categorize = partial(classify_one, categorize_many)
+        for attr, value in (('name', name),
+                            ('version', version),
+                            ('rule', rule),
+                            ('default', data['default']),
+                            ('payees', PayeeRules(data.get('payees'))),
+                            ('categorize', categorize),
+                            ('categorize_many', categorize_many)):
+            object.__setattr__(self, attr, value)
+
+    def __setattr__(self, attr, value):
+        raise AttributeError("CategoryModel is immutable; reload the file to change it")
+
+    @classmethod
+    def load(cls, path, name=None):
+        with open(path, 'rb') as f:
+            raw = f.read()
+        name = name or os.path.splitext(os.path.basename(path))[0]
+        return cls(name, json.loads(raw), hashlib.sha256(raw).hexdigest(), classifier=load_classifier(name))
+
+
+def classify_many(classifier, fallback, descriptions):
+    """The classifier's labels, with fallback's for the descriptions it is unsure of"""
+    labels = classifier.predict(descriptions)
+    unsure = pd.isna(labels)
+    if unsure.any():
+        labels[unsure] = fallback(np.asarray(descriptions, dtype=object)[unsure])
+    return labels
+
+
+def classify_one(categorize_many, description):
+    return categorize_many([description])[0]
+
+
+class CategoryModels:
+    """Compiled category models by name, reloaded when their file changes.
+
+    A reload compiles the new model fully before swapping it in with a
+    single reference assignment, so a lookup sees either the old model or
+    the new one, never a partial one. A file that fails to load keeps the
+    previous model in service. Models loaded before gunicorn forks its
+    workers are shared with them copy-on-write.
+    """
+
+    def __init__(self, directory=CATEGORY_MODEL_DIR, reload_interval=CATEGORY_RELOAD_INTERVAL):
+        self.directory = directory
+        self.reload_interval = reload_interval
+        # name -> (model, file mtime, monotonic time of the last check)
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def _path(self, name):
+        return os.path.join(self.directory, f"{name}.json")
+
+    def get(self, name):
+        """The current model for name, loading or reloading it as needed"""
+        entry = self._models.get(name)
+        if entry is not None and time.monotonic() - entry[2] < self.reload_interval:
+            return entry[0]
+        return self._refresh(name)
+
+    def _refresh(self, name):
+        with self._lock:
+            entry = self._models.get(name)
+            path = self._path(name)
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                if entry is None:
+                    raise
+                logger.warning(f"Category model {path} is missing; keeping version {entry[0].version}")
+                mtime = entry[1]
+
+            if entry is not None and mtime == entry[1]:
+                self._models[name] = (entry[0], mtime, time.monotonic())
+                return entry[0]
+
+            try:
+                model = CategoryModel.load(path, name)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                if entry is None:
+                    raise
+                logger.error(f"Could not reload category model {path}: {str(e)}; keeping version {entry[0].version}")
+                model = entry[0]
+            else:
+                logger.info(f"Loaded category model {model.version}")
+
+            self._models[name] = (model, mtime, time.monotonic())
+            return model
+
+    def reload(self, name=None):
+        """Check the named model (default: every loaded model) for edits now"""
+        for model_name in ([name] if name else list(self._models)):
+            entry = self._models.get(model_name)
+            if entry is not None:
+                self._models[model_name] = (entry[0], entry[1], float('-inf'))
+            self.get(model_name)
+
+
+# Shared by every parser in the process
+category_models = CategoryModels()
@@ -0,0 +1,242 @@
+import os
+import re
+import json
+import hashlib
+import logging
+
+import numpy as np
+import pandas as pd
+
+from statement_core import CACHE_ROOT
+
+logger = logging.getLogger(__name__)
+
+# Trained classifiers, one <category model name>.npy/.json pair each; a missing pair leaves keywords in charge
+CATEGORY_CLASSIFIER_DIR = os.getenv('CATEGORY_CLASSIFIER_DIR', os.path.join(CACHE_ROOT, 'classifiers'))
+
+# Layout of saved weights (bucket-major); files of any other version must be retrained
+WEIGHTS_VERSION = 2
+
+# Character n-gram sizes and hash table size (2**bits buckets) for newly trained models
+NGRAM_SIZES = (3, 4, 5)
+HASH_BITS = 18
+
+DIGITS_PATTERN = re.compile(r'\d+')
+
+# normalize() byte by byte for ASCII: upper case lowered, str.split()'s whitespace to a space, digits to '0'
+ASCII_FOLD = np.arange(256, dtype=np.uint8)
+ASCII_FOLD[ord('A'):ord('Z') + 1] += ord('a') - ord('A')
+ASCII_FOLD[[9, 10, 11, 12, 13, 28, 29, 30, 31]] = ord(' ')
+ASCII_FOLD[ord('0'):ord('9') + 1] = ord('0')
+
+# Below this posterior probability a description is left to the keywords
+MIN_CONFIDENCE = float(os.getenv('CATEGORY_CLASSIFIER_MIN_CONFIDENCE', 0.5))
+
+FNV_OFFSET = np.uint32(2166136261)
+FNV_PRIME = np.uint32(16777619)
+# Fibonacci hashing spreads FNV's low-entropy top bits over the bucket range
+GOLDEN = np.uint32(2654435769)
+
+
+def normalize(text):
+    """Lowercase, single-spaced, every digit run folded to '0' so reference numbers share their n-grams"""
+    return DIGITS_PATTERN.sub('0', ' '.join(text.lower().split()))
+
+
+def normalize_many(texts):
+    """normalize() over many texts, folding them as one string"""
+    texts = list(texts)
+    joined = '\x00'.join(texts)
+    if not joined.isascii():
+        # Only the texts with other characters go one at a time
+        ascii = [text.isascii() for text in texts]
+        folded = iter(normalize_many([text for text, plain in zip(texts, ascii) if plain]))
+        return [next(folded) if plain else normalize(text) for text, plain in zip(texts, ascii)]
+
+    data = ASCII_FOLD[np.frombuffer(joined.encode('ascii'), dtype=np.uint8)]
+    # First of each run of spaces or of zeros only
+    keep = np.ones(len(data), dtype=bool)
+    keep[1:] = (data[1:] != data[:-1]) | ((data[1:] != ord(' ')) & (data[1:] != ord('0')))
+    joined = data[keep].tobytes().decode('ascii').replace(' \x00', '\x00').replace('\x00 ', '\x00').strip(' ')
+    normalized = joined.split('\x00')
+    if len(normalized) != len(texts):
+        # A text held the separator itself
+        return [normalize(text) for text in texts]
+    return normalized
+
+
+def window_buckets(texts, sizes=NGRAM_SIZES, bits=HASH_BITS):
+    """Bucket of the n-gram of each size starting at every byte of the texts laid end to end.
+
+    Texts are padded with a space each side, so n-grams at word edges
+    differ from those inside words. All texts are hashed together as one
+    byte array: FNV-1a over each window, n bytes at a time, in uint32
+    arithmetic that wraps exactly as the scalar hash does; every step is
+    a slice of the array. Returns a (sizes x bytes) array of buckets, -1
+    where the n-gram would run past its text, and each text's first byte
+    and length, padding included.
+    """
+    joined = f" {'  '.join(texts)} ".encode('utf-8') if len(texts) else b''
+    lengths = np.fromiter(map(len, texts), dtype=np.intp, count=len(texts)) + 2
+    if len(joined) != lengths.sum():
+        # Some characters take more than one byte
+        for index, text in enumerate(texts):
+            if not text.isascii():
+                lengths[index] = len(text.encode('utf-8')) + 2
+    data = np.frombuffer(joined, dtype=np.uint8).astype(np.uint32)
+    starts = np.cumsum(lengths) - lengths
+    # Bytes from each one to the end of its text
+    remaining = np.repeat(starts + lengths, lengths) - np.arange(len(data))
+
+    buckets = np.empty((len(sizes), len(data)), dtype=np.intp)
+    for row, size in zip(buckets, sizes):
+        windows = max(len(data) - size + 1, 0)
+        h = np.full(windows, FNV_OFFSET ^ np.uint32(size), dtype=np.uint32)
+        for k in range(size):
+            h ^= data[k:k + windows]
+            h *= FNV_PRIME
+        h *= GOLDEN
+        row[:windows] = h >> np.uint32(32 - bits)
+        row[remaining < size] = -1
+    return buckets, starts, lengths
+
+
+def hashed_ngrams(texts, sizes=NGRAM_SIZES, bits=HASH_BITS):
+    """(text index, bucket) of every character n-gram of every text, size by size and text by text"""
+    buckets, starts, lengths = window_buckets(texts, sizes, bits)
+    rows = np.broadcast_to(np.repeat(np.arange(len(texts)), lengths), buckets.shape)
+    present = buckets >= 0
+    return rows[present], buckets[present]
+
+
+class NaiveBayesClassifier:
+    """Multinomial naive Bayes over hashed character n-grams.
+
+    log_likelihood is a (2**bits x classes) float32 array, bucket-major so
+    an n-gram's weights for every class sit together; a saved model keeps
+    it in <prefix>.npy, memory-mapped on load so workers share the pages,
+    next to <prefix>.json holding the classes, priors, hashing settings
+    and the weights' SHA-256, checked on load. Scoring a statement sums
+    the weights of each distinct set of n-grams starting at a byte once,
+    then each description's bytes, two classes at a time.
+    """
+
+    def __init__(self, classes, log_prior, log_likelihood, sizes=NGRAM_SIZES, bits=HASH_BITS, digest=''):
+        if log_likelihood.shape != (2 ** bits, len(classes)):
+            raise ValueError(f"Classifier weights have shape {log_likelihood.shape}, "
+                             f"expected ({2 ** bits}, {len(classes)})")
+        self.classes = np.array(classes, dtype=object)
+        self.log_prior = np.asarray(log_prior, dtype=np.float64)
+        self.log_likelihood = log_likelihood
+        self.sizes = tuple(sizes)
+        self.bits = bits
+        self.digest = digest
+
+    @classmethod
+    def train(cls, descriptions, categories, sizes=NGRAM_SIZES, bits=HASH_BITS, alpha=1.0):
+        """Fit on labelled descriptions, with Laplace smoothing alpha"""
+        codes, classes = pd.factorize(pd.Series(categories, dtype=object), sort=True)
+        texts = [normalize(text) for text in pd.Series(descriptions, dtype=object).fillna('')]
+        rows, buckets = hashed_ngrams(texts, sizes, bits)
+        counts = np.zeros((2 ** bits, len(classes)), dtype=np.float64)
+        np.add.at(counts, (buckets, codes[rows]), 1)
+
+        counts += alpha
+        log_likelihood = np.log(counts) - np.log(counts.sum(axis=0, keepdims=True))
+        log_prior = np.log(np.bincount(codes, minlength=len(classes)) / len(codes))
+        logger.info(f"Trained classifier on {len(codes)} descriptions in {len(classes)} classes")
+        return cls(list(classes), log_prior, log_likelihood.astype(np.float32), sizes, bits)
+
+    def save(self, prefix):
+        weights = np.ascontiguousarray(self.log_likelihood, dtype=np.float32)
+        np.save(f"{prefix}.npy", weights)
+        meta = {
+            'version': WEIGHTS_VERSION,
+            'classes': list(self.classes),
+            'log_prior': self.log_prior.tolist(),
+            'ngram_sizes': list(self.sizes),
+            'hash_bits': self.bits,
+            'weights_sha256': hashlib.sha256(weights.tobytes()).hexdigest(),
+        }
+        with open(f"{prefix}.json", 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+
+    @classmethod
+    def load(cls, prefix):
+        """Load a saved model, memory-mapping its weights"""
+        with open(f"{prefix}.json", 'rb') as f:
+            raw = f.read()
+        meta = json.loads(raw)
+        if meta.get('version') != WEIGHTS_VERSION:
+            raise ValueError(f"Classifier weights are version {meta.get('version')}, "
+                             f"expected {WEIGHTS_VERSION}; retrain the classifier")
+        log_likelihood = np.load(f"{prefix}.npy", mmap_mode='r')
+        if hashlib.sha256(np.ascontiguousarray(log_likelihood)).hexdigest() != meta['weights_sha256']:
+            raise ValueError(f"Classifier weights {prefix}.npy do not match their checksum")
+        return cls(meta['classes'], meta['log_prior'], log_likelihood, meta['ngram_sizes'], meta['hash_bits'],
+                   digest=hashlib.sha256(raw).hexdigest())
+
+    def predict(self, descriptions, min_confidence=MIN_CONFIDENCE):
+        """Class of each description, or None where the posterior is below min_confidence"""
+        # Exact repeats first, then descriptions differing only in case, spacing or digits
+        codes, uniques = pd.factorize(pd.Series(descriptions, dtype=object).fillna(''))
+        if not len(uniques):
+            return np.full(len(codes), None, dtype=object)
+        normalized_codes, uniques = pd.factorize(np.array(normalize_many(uniques), dtype=object))
+        codes = normalized_codes[codes]
+
+        scores = self._scores(uniques) + self.log_prior
+
+        # Posterior of the winner: 1 / sum(exp(score - best))
+        best = scores.argmax(axis=1)
+        confidence = 1 / np.exp(scores - scores.max(axis=1, keepdims=True)).sum(axis=1)
+        labels = self.classes[best]
+        labels[confidence < min_confidence] = None
+        return labels[codes]
+
+    def _scores(self, texts):
+        """(texts x classes) summed log-likelihood of each text's n-grams"""
+        buckets, starts, lengths = window_buckets(texts, self.sizes, self.bits)
+        # One code per distinct set of n-grams starting at a byte, so a pattern that recurs is summed once
+        radix = 2 ** self.bits + 1
+        keys, span = np.zeros(buckets.shape[1], dtype=np.int64), 1
+        for row in buckets:
+            if span * radix >= 2 ** 63:
+                keys, uniques = pd.factorize(keys)
+                span = len(uniques)
+            keys = keys * radix + row + 1
+            span *= radix
+        codes, uniques = pd.factorize(keys)
+        first = np.empty(len(uniques), dtype=np.intp)
+        first[codes[::-1]] = np.arange(len(codes))[::-1]
+
+        # Each code's weights, padded with a zero class to an even count
+        table = np.zeros((len(uniques), len(self.classes) + len(self.classes) % 2), dtype=np.float32)
+        for row in buckets[:, first]:
+            present = row >= 0
+            table[present, :len(self.classes)] += self.log_likelihood[row[present]]
+        # Two classes per pass: complex64 adds its real and imaginary float32 parts independently
+        pairs = np.ascontiguousarray(table.view(np.complex64).T)
+
+        # Every text's bytes are one run, the padding's empty n-grams included
+        scores = np.empty((len(pairs), len(texts)), dtype=np.complex128)
+        for index, pair in enumerate(pairs):
+            scores[index] = np.add.reduceat(np.take(pair, codes), starts)
+        interleaved = np.empty((len(texts), 2 * len(pairs)))
+        interleaved[:, 0::2] = scores.real.T
+        interleaved[:, 1::2] = scores.imag.T
+        return interleaved[:, :len(self.classes)]
+
+
+def load_classifier(name, directory=CATEGORY_CLASSIFIER_DIR):
+    """The trained classifier for a category model, or None if there is none"""
+    prefix = os.path.join(directory, name)
+    if not directory or not os.path.exists(f"{prefix}.json"):
+        return None
+    try:
+        classifier = NaiveBayesClassifier.load(prefix)
+    except (OSError, ValueError, KeyError) as e:
+        logger.error(f"Could not load classifier {prefix}: {str(e)}; using keywords only")
+        return None
+    logger.info(f"Loaded classifier {prefix} with {len(classifier.classes)} classes")
+    return classifier
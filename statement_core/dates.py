@@ -0,0 +1,148 @@
+import logging
+import re
+from datetime import datetime
+from itertools import islice
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Candidate formats, in order of preference when a date fits several
+DATE_FORMATS = [
+    '%d %b %Y',      # 06 Nov 2024
+    '%b %d %Y',      # Nov 06 2024
+    '%d %B %Y',      # 06 November 2024
+    '%B %d %Y',      # November 06 2024
+    '%m/%d/%Y',      # 11/06/2024
+    '%d/%m/%Y',      # 06/11/2024
+    '%Y-%m-%d',      # 2024-11-06
+    '%d-%m-%Y',      # 06-11-2024
+    '%b %d, %Y',     # Nov 06, 2024
+    '%d %b, %Y',     # 06 Nov, 2024
+    '%d-%b-%Y',      # 06-Nov-2024
+    '%b-%d-%Y'       # Nov-06-2024
+]
+
+# Dates looked at to settle a document's format
+DATE_SAMPLE_SIZE = 20
+
+# A letter glued to a digit or the reverse, as in 'Nov01,2024' or '1Nov 2024'
+GLUED_TOKEN_PATTERN = re.compile(r'(?<=[A-Za-z])(?=\d)|(?<=\d)(?=[A-Za-z])')
+
+
+def normalize_date(date_str):
+    """'Nov01,2024' / 'Nov 1, 2024' / '1Nov 2024' -> single-space separated tokens"""
+    return ' '.join(GLUED_TOKEN_PATTERN.sub(' ', date_str).replace(',', ' ').split())
+
+
+def _strptime(date_str, fmt):
+    try:
+        return datetime.strptime(date_str, fmt)
+    except ValueError:
+        return None
+
+
+def infer_format(samples, formats=DATE_FORMATS):
+    """The format that parses the most sample dates, earlier formats winning ties; None if none fits"""
+    samples = list(dict.fromkeys(sample.strip() for sample in samples if sample and sample.strip()))
+    best, best_count = None, 0
+    for fmt in formats:
+        count = sum(_strptime(sample, fmt) is not None for sample in samples)
+        if count > best_count:
+            best, best_count = fmt, count
+            if count == len(samples):
+                break
+    return best
+
+
+class DateParser:
+    """Parses the dates of one document.
+
+    The document's format is inferred once, from a sample or else from the
+    first date that parses, and tried before the other formats. Results
+    are memoized per date string and the current time is read only once.
+    """
+
+    def __init__(self, formats=DATE_FORMATS, now=None):
+        self.formats = formats
+        self.format = None
+        self.now = now or datetime.now()
+        self._memo = {}
+
+    def infer(self, samples):
+        self.format = infer_format(samples, self.formats)
+        logger.debug(f"Inferred date format {self.format!r}")
+        return self.format
+
+    def inferring(self, items, date_of, size=DATE_SAMPLE_SIZE):
+        """Yield items unchanged, after inferring the format from the dates of the first `size`"""
+        items = iter(items)
+        head = list(islice(items, size))
+        self.infer(date_of(item) for item in head)
+        yield from head
+        yield from items
+
+    def parse(self, date_str):
+        """Date string -> datetime; future years become this year, unparseable dates now"""
+        date_str = date_str.strip() if date_str else ''
+        parsed = self._memo.get(date_str)
+        if parsed is None:
+            parsed = self._memo[date_str] = self._parse(date_str)
+        return parsed
+
+    def parse_many(self, dates):
+        """Series of date strings -> datetime Series with one pd.to_datetime call.
+
+        Dates the document format does not fit, or in a future year, go
+        through parse one by one.
+        """
+        dates = dates.str.strip()
+        if self.format is None:
+            self.infer(dates.drop_duplicates().head(DATE_SAMPLE_SIZE))
+        if self.format is None:
+            parsed = pd.Series(pd.NaT, index=dates.index, dtype='datetime64[ns]')
+        else:
+            parsed = pd.to_datetime(dates, format=self.format, errors='coerce')
+        stragglers = parsed.isna() | (parsed.dt.year > self.now.year)
+        if stragglers.any():
+            parsed[stragglers] = pd.to_datetime(dates[stragglers].map(self.parse))
+        return parsed
+
+    def _parse(self, date_str):
+        if not date_str:
+            return self.now
+
+        parsed = None
+        if self.format is not None:
+            parsed = _strptime(date_str, self.format)
+        if parsed is None:
+            for fmt in self.formats:
+                parsed = _strptime(date_str, fmt)
+                if parsed is not None:
+                    if self.format is None:
+                        self.format = fmt
+                    break
+        if parsed is None:
+            parsed = self._from_components(date_str)
+        if parsed is None:
+            logger.warning(f"Could not parse date: {date_str!r}")
+            return self.now
+
+        if parsed.year > self.now.year:
+            parsed = parsed.replace(year=self.now.year)
+        return parsed
+
+    def _from_components(self, date_str):
+        """Last resort: the first three numbers of the string, tried in a few day/month/year orders"""
+        components = re.findall(r'\d+', date_str)
+        if len(components) < 3:
+            return None
+        first, second, third = (int(part) for part in components[:3])
+        for day, month, year in ((first, second, third), (second, first, third), (third, first, second)):
+            if year < 100:
+                year += 2000 if year < 50 else 1900
+            try:
+                return datetime(year, month, day)
+            except ValueError:
+                continue
+        return None
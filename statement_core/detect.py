@@ -0,0 +1,97 @@
+import re
+import logging
+
+from statement_core.extraction import first_page_text
+
+logger = logging.getLogger(__name__)
+
+# Only this much of the first page is looked at when fingerprinting
+SNIFF_CHARS = 4096
+
+# (pattern, weight) per issuer; strong markers from statement headers weigh
+# more than bare brand names, which also show up as merchants elsewhere
+FINGERPRINTS = {
+    'phonepe': [
+        (r'transaction statement for', 3),
+        (r'phonepe', 2),
+        (r'phone pe', 2),
+    ],
+    'paytm': [
+        (r'paytm payments bank', 3),
+        (r'passbook', 2),
+        (r'date & time transaction details', 3),
+        (r'paytm', 1),
+    ],
+    'kotak': [
+        (r'kotak mahindra bank', 3),
+        (r'kkbk0', 3),
+        (r'withdrawal \(dr\)', 2),
+        (r'kotak', 1),
+    ],
+    'supermoney': [
+        (r'super\.?money', 3),
+    ],
+    'gpay': [
+        (r'google pay', 3),
+        (r'\bgpay\b', 2),
+    ],
+}
+
+# Display names, as used for the platform sections of the app
+ISSUER_LABELS = {
+    'phonepe': 'PhonePe',
+    'paytm': 'Paytm',
+    'kotak': 'Kotak',
+    'supermoney': 'SuperMoney',
+    'gpay': 'Google Pay',
+}
+
+# Another issuer than the expected one only wins on a header-strength score
+# that also beats the expected issuer's by a margin; brand names in a
+# statement's transactions ("Paid to Paytm", "Kotak Mahindra Bank") must not
+MIN_OTHER_SCORE = 3
+MIN_MARGIN = 3
+
+_COMPILED = {
+    issuer: [(re.compile(pattern), weight) for pattern, weight in patterns]
+    for issuer, patterns in FINGERPRINTS.items()
+}
+
+
+class UnsupportedStatementError(ValueError):
+    """Raised when an upload is recognised as a statement this parser cannot handle"""
+
+
+def issuer_scores(text):
+    """Fingerprint score of every issuer for a text sample"""
+    text = text.lower()
+    return {
+        issuer: sum(weight for pattern, weight in patterns if pattern.search(text))
+        for issuer, patterns in _COMPILED.items()
+    }
+
+
+def detect_issuer(text, expected=None):
+    """Return the best matching issuer for a text sample (or a platform name), or None.
+
+    With an expected issuer, any other one must score at least
+    MIN_OTHER_SCORE and beat the expected issuer by MIN_MARGIN.
+    """
+    scores = issuer_scores(text)
+    best_issuer = max(scores, key=scores.get)
+    if not scores[best_issuer]:
+        return None
+    if expected is not None and best_issuer != expected:
+        best_score, expected_score = scores[best_issuer], scores.get(expected, 0)
+        if best_score < MIN_OTHER_SCORE or best_score - expected_score < MIN_MARGIN:
+            logger.info(f"Weak {best_issuer} fingerprint ({best_score} vs {expected_score}); keeping {expected}")
+            return expected if expected_score else None
+    return best_issuer
+
+
+def sniff_issuer(pdf, expected=None):
+    """Fingerprint the issuer from the first page of a PDF"""
+    issuer = detect_issuer(first_page_text(pdf, limit=SNIFF_CHARS), expected)
+    logger.info(f"Detected statement issuer: {issuer or 'unknown'}")
+    return issuer
+
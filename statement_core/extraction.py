@@ -0,0 +1,459 @@
+import os
+import time
+import hashlib
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from importlib import metadata
+
+from statement_core.ingest import as_source
+from statement_core.ocr import ocr_pages, ocr_version
+from statement_core.page_cache import page_cache
+from statement_core.result_cache import code_version
+
+logger = logging.getLogger(__name__)
+
+# Number of processes used to extract pages; 1 keeps everything in-process
+DEFAULT_WORKERS = int(os.getenv('PARSER_WORKERS', os.cpu_count() or 1))
+
+# Pages each pool process must get for the pool to pay off. A process
+# takes ~30 ms to start and open the PDF, while PyMuPDF reads a statement
+# page in ~1.5 ms, so documents under 2 * this many pages (or a single
+# CPU) stay in-process
+MIN_PAGES_PER_WORKER = int(os.getenv('PARSER_MIN_PAGES_PER_WORKER', 50))
+
+# Pages buffered by iter_pages between page cache writes
+_CACHE_BATCH_PAGES = 16
+
+# Part of the page cache key, so extraction changes re-extract text
+_CODE_VERSION = code_version(__file__)
+
+# Words whose baselines are this many points apart or less share a line
+LINE_TOLERANCE = 3
+
+
+class PyMuPDFExtractor:
+    """Text extraction with PyMuPDF, the fastest of the backends"""
+    name = 'pymupdf'
+    package = 'PyMuPDF'
+
+    def __init__(self, source):
+        self.doc = source.open_document()
+
+    def page_count(self):
+        return self.doc.page_count
+
+    def page_text(self, page_num):
+        """One visual line per line, as pdfplumber gives it.
+
+        get_text("text") puts every text block, and so every table cell, on
+        lines of its own, which line parsers cannot use; words are grouped
+        by baseline and read left to right instead.
+        """
+        return words_to_text(self.doc.load_page(page_num).get_text("words"))
+
+    def close(self):
+        self.doc.close()
+
+
+def words_to_text(words):
+    """(x0, y0, x1, y1, text, ...) word boxes -> text with one line per baseline"""
+    lines = []
+    line, baseline = [], None
+    for word in sorted(words, key=lambda word: (word[3], word[0])):
+        if baseline is not None and word[3] - baseline > LINE_TOLERANCE:
+            lines.append(line)
+            line = []
+        if not line:
+            baseline = word[3]
+        line.append(word)
+    if line:
+        lines.append(line)
+    return "\n".join(" ".join(word[4] for word in sorted(line, key=lambda word: word[0])) for line in lines)
+
+
+class PdfplumberExtractor:
+    """Text extraction with pdfplumber"""
+    name = 'pdfplumber'
+    package = 'pdfplumber'
+
+    def __init__(self, source):
+        import pdfplumber
+        self.pdf = pdfplumber.open(source.open_stream())
+
+    def page_count(self):
+        return len(self.pdf.pages)
+
+    def page_text(self, page_num):
+        return self.pdf.pages[page_num].extract_text()
+
+    def close(self):
+        self.pdf.close()
+
+
+class PyPDF2Extractor:
+    """Text extraction with PyPDF2"""
+    name = 'pypdf2'
+    package = 'PyPDF2'
+
+    def __init__(self, source):
+        import PyPDF2
+        self.stream = source.open_stream()
+        self.reader = PyPDF2.PdfReader(self.stream)
+
+    def page_count(self):
+        return len(self.reader.pages)
+
+    def page_text(self, page_num):
+        return self.reader.pages[page_num].extract_text()
+
+    def close(self):
+        self.stream.close()
+
+
+# Registered backends by name; see register_extractor
+EXTRACTORS = {
+    PyMuPDFExtractor.name: PyMuPDFExtractor,
+    PdfplumberExtractor.name: PdfplumberExtractor,
+    PyPDF2Extractor.name: PyPDF2Extractor,
+}
+
+# Order in which backends are tried for each page. The default is what
+# scripts/benchmark_extractors.py ranks fastest among the backends whose
+# records match pdfplumber's; re-run it on sample statements to tune it.
+DEFAULT_ORDER = [name.strip() for name in
+                 os.getenv('PARSER_EXTRACTORS', 'pymupdf,pdfplumber,pypdf2').split(',')
+                 if name.strip()]
+
+
+def register_extractor(extractor_cls):
+    """Register a backend class exposing name, page_count, page_text and close.
+
+    Backends import their library when first opened, so unused ones cost
+    nothing at import time; an optional package attribute names the
+    distribution whose version goes into the page cache key.
+    """
+    EXTRACTORS[extractor_cls.name] = extractor_cls
+    return extractor_cls
+
+
+class _PageSource:
+    """Per-page fallback across backends for one PDF.
+
+    Each backend opens the document at most once, and only when a page
+    actually falls through to it.
+    """
+
+    def __init__(self, source, order=None):
+        self.source = source
+        self.order = list(order or DEFAULT_ORDER)
+        self._opened = {}
+        self._failed = set()
+
+    def _backend(self, name):
+        if name in self._failed:
+            return None
+        backend = self._opened.get(name)
+        if backend is None:
+            try:
+                backend = EXTRACTORS[name](self.source)
+            except Exception as e:
+                logger.error(f"{name} could not open the PDF: {str(e)}")
+                self._failed.add(name)
+                return None
+            self._opened[name] = backend
+        return backend
+
+    def page_count(self):
+        for name in self.order:
+            backend = self._backend(name)
+            if backend is not None:
+                return backend.page_count()
+        raise ValueError("No extractor could open the PDF")
+
+    def page_text(self, page_num):
+        """Extract one page, trying each backend in priority order"""
+        for name in self.order:
+            backend = self._backend(name)
+            if backend is None:
+                continue
+            try:
+                text = backend.page_text(page_num) or ''
+            except Exception as e:
+                logger.info(f"{name} failed to extract text from page {page_num + 1}: {str(e)}")
+                continue
+            if text.strip():
+                return text
+            logger.info(f"No text on page {page_num + 1} from {name}")
+        return ''
+
+    def close(self):
+        for backend in self._opened.values():
+            backend.close()
+        self._opened.clear()
+
+
+def _open_pages(source, order):
+    """The backends first_page_text left open on this source, else a new _PageSource"""
+    pages, source.open_pages = source.open_pages, None
+    if pages is not None and pages.order == list(order or DEFAULT_ORDER):
+        return pages
+    if pages is not None:
+        pages.close()
+    return _PageSource(source, order)
+
+
+# Set once per pool process by _init_worker
+_worker_source = None
+
+
+def _init_worker(source, order):
+    global _worker_source
+    _worker_source = _PageSource(source, order)
+
+
+def _extract_page(page_num):
+    return _worker_source.page_text(page_num)
+
+
+def extractor_version(order=None):
+    """Identifies the text a given backend order produces, for the page cache"""
+    order = list(order or DEFAULT_ORDER)
+    libraries = ';'.join(f"{name}={_package_version(EXTRACTORS.get(name))}" for name in order)
+    # Installing or removing tesseract changes what image-only pages yield
+    key = f"{_CODE_VERSION}|{','.join(order)}|{libraries}|ocr={ocr_version()}"
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+
+
+def _package_version(extractor_cls):
+    package = getattr(extractor_cls, 'package', None)
+    if package is None:
+        return ''
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return 'missing'
+
+
+def extract_pages(pdf, workers=None, page_count=None, order=None, use_cache=True):
+    """Return the text of every page, in page order.
+
+    `pdf` is a PdfSource, a path or raw bytes. Pages already extracted for
+    this document and backend order come from the page cache without
+    opening the PDF. Otherwise pages are fanned out to a process pool when
+    there are at least MIN_PAGES_PER_WORKER pages for each of two or more
+    workers; each worker opens the PDF once per backend and keeps it for
+    all its pages. `order` overrides the backend
+    priority. Pages no backend finds text on are handed to OCR when it is
+    available.
+    """
+    source = as_source(pdf)
+    cache = page_cache if use_cache else None
+    if cache is not None:
+        doc_hash, version = source.content_hash(), extractor_version(order)
+        texts = cache.get_pages(doc_hash, version)
+        if texts is not None:
+            logger.info(f"Loaded {len(texts)} pages from the page cache")
+            return texts
+
+    texts = _fill_with_ocr(source, _extract_pages(source, workers, page_count, order), workers)
+    # Pages still empty after OCR (failed, timed out or unavailable) keep the
+    # document out of the cache, so a later upload tries them again
+    if cache is not None and all(text.strip() for text in texts):
+        cache.put_pages(doc_hash, version, enumerate(texts), page_count=len(texts))
+    return texts
+
+
+def _extract_pages(source, workers, page_count, order):
+    workers = DEFAULT_WORKERS if workers is None else workers
+
+    # Backends open lazily, so this costs nothing if page_count is known
+    pages = _open_pages(source, order)
+    try:
+        if page_count is None:
+            page_count = pages.page_count()
+        if page_count == 0:
+            return []
+
+        workers = max(1, min(workers, page_count // MIN_PAGES_PER_WORKER))
+        if workers == 1:
+            return [pages.page_text(page_num) for page_num in range(page_count)]
+    finally:
+        pages.close()
+
+    logger.info(f"Extracting {page_count} pages with {workers} workers")
+    # A few chunks per worker keeps the pool busy when page costs vary
+    chunksize = max(1, page_count // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=_init_worker,
+                             initargs=(source, order)) as executor:
+        return list(executor.map(_extract_page, range(page_count), chunksize=chunksize))
+
+
+def _fill_with_ocr(source, texts, workers=None):
+    """Replace empty pages with OCR output where OCR finds any text"""
+    missing = [page_num for page_num, text in enumerate(texts) if not text.strip()]
+    if missing:
+        for page_num, text in ocr_pages(source, missing, workers).items():
+            texts[page_num] = text
+    return texts
+
+
+def iter_pages(pdf, order=None, use_cache=True):
+    """Yield page texts one at a time, in page order, in this process"""
+    source = as_source(pdf)
+    cache = page_cache if use_cache else None
+    if cache is not None:
+        doc_hash, version = source.content_hash(), extractor_version(order)
+        texts = cache.get_pages(doc_hash, version)
+        if texts is not None:
+            logger.info(f"Loaded {len(texts)} pages from the page cache")
+            yield from texts
+            return
+
+    pages = _open_pages(source, order)
+    try:
+        page_count = pages.page_count()
+        logger.info(f"PDF opened successfully. Number of pages: {page_count}")
+        pending = []
+        complete = True
+        for page_num in range(page_count):
+            text = pages.page_text(page_num)
+            if not text.strip():
+                text = ocr_pages(source, [page_num]).get(page_num, text)
+                complete = complete and bool(text.strip())
+            if cache is not None:
+                pending.append((page_num, text))
+                # Written in small batches to bound memory and SQLite commits
+                if len(pending) >= _CACHE_BATCH_PAGES:
+                    cache.put_pages(doc_hash, version, pending)
+                    pending = []
+            yield text
+        # Only a fully consumed document with text on every page is served
+        # from the cache later; the pages alone are never read back
+        if cache is not None:
+            cache.put_pages(doc_hash, version, pending, page_count=page_count if complete else None)
+    finally:
+        pages.close()
+
+
+def first_page_text(pdf, limit=None, order=None, use_cache=True):
+    """Text of the first page only, for format sniffing; never touches the rest.
+
+    A cached document is read from the page cache without opening the PDF.
+    Otherwise the backends opened here stay open on a PdfSource passed in,
+    and the next extract_pages or iter_pages call on it reuses them, so
+    sniffing then parsing opens the document once.
+    """
+    source = as_source(pdf)
+    text = None
+    cache = page_cache if use_cache else None
+    if cache is not None:
+        text = cache.get_first_page(source.content_hash(), extractor_version(order))
+    if text is None:
+        pages = _open_pages(source, order)
+        try:
+            text = pages.page_text(0) if pages.page_count() else ''
+        except Exception:
+            pages.close()
+            raise
+        if source is pdf:
+            source.open_pages = pages
+        else:
+            pages.close()
+    return text if limit is None else text[:limit]
+
+
+def split_lines(text):
+    """Split page text into stripped, non-empty lines"""
+    return [line.strip() for line in text.split('\n') if line.strip()]
+
+
+def extract_page_lines(pdf, workers=None, page_count=None, order=None):
+    """Return one list of lines per page, in page order"""
+    return [split_lines(text) for text in extract_pages(pdf, workers, page_count, order)]
+
+
+def extract_text(pdf, workers=None, order=None):
+    """Return the whole document text, one page after another"""
+    return "\n".join(extract_pages(pdf, workers=workers, order=order))
+
+
+def benchmark_extractors(pdf, parse_line=None, reference='pdfplumber', repeat=3):
+    """Time every registered backend on one document.
+
+    A backend counts as correct when it yields the same records as the
+    reference backend (or the same lines if no parse_line is given).
+    Returns (name, seconds, correct) tuples, fastest correct first.
+    """
+    source = as_source(pdf)
+
+    def run(name):
+        best = None
+        lines = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            extractor = EXTRACTORS[name](source)
+            try:
+                lines = [line for page_num in range(extractor.page_count())
+                         for line in split_lines(extractor.page_text(page_num) or '')]
+            finally:
+                extractor.close()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        if parse_line is not None:
+            lines = [record for record in map(parse_line, lines) if record is not None]
+        return best, lines
+
+    _, expected = run(reference)
+    results = []
+    for name in EXTRACTORS:
+        try:
+            seconds, output = run(name)
+        except Exception as e:
+            logger.warning(f"Benchmark of {name} failed: {str(e)}")
+            continue
+        results.append((name, seconds, output == expected))
+        logger.info(f"{name}: {seconds * 1000:.1f} ms, correct={output == expected}")
+
+    results.sort(key=lambda result: (not result[2], result[1]))
+    return results
+
+
+def choose_extractor_order(pdf, parse_line=None, reference='pdfplumber'):
+    """Backend order for PARSER_EXTRACTORS: fastest correct backend first"""
+    return [name for name, _, _ in benchmark_extractors(pdf, parse_line, reference)]
+
+
+# Returned by a stitch_records parse_line for lines to ignore entirely
+SKIP = object()
+
+
+def stitch_records(pages, parse_line, skip_line=None):
+    """Parse per-page line lists in order, yielding every record found.
+
+    A row split by a page break leaves an unparseable last line on one page
+    and an unparseable first line on the next; those two are joined and
+    parsed again as a single line. Lines matched by skip_line, or for which
+    parse_line returns SKIP, are ignored as if absent.
+    """
+    carry = None
+    for lines in pages:
+        trailing = None
+        for line in lines:
+            if skip_line is not None and skip_line(line):
+                continue
+
+            record = parse_line(line)
+            if record is SKIP:
+                continue
+            if carry is not None:
+                if record is None:
+                    record = parse_line(f"{carry} {line}")
+                    if record is SKIP:
+                        record = None
+                carry = None
+
+            if record is not None:
+                yield record
+            trailing = line if record is None else None
+        carry = trailing
@@ -0,0 +1,164 @@
+import io
+import os
+import mmap
+import hashlib
+import shutil
+import logging
+import tempfile
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Uploads larger than this are spooled to disk instead of held in memory
+SPOOL_THRESHOLD = int(os.getenv('UPLOAD_SPOOL_THRESHOLD', 1024 * 1024))
+
+_CHUNK_SIZE = 64 * 1024
+
+
+class PdfSource:
+    """Read-only view of one PDF that every extractor backend shares.
+
+    Holds either the raw bytes (small uploads) or a path on disk (large
+    uploads and CLI files). Backends open their own stream over it, so the
+    document is never copied per backend.
+    """
+
+    def __init__(self, data=None, path=None, name='uploaded_file', owns_path=False):
+        if data is None and path is None:
+            raise ValueError("PdfSource needs either data or a path")
+        self.data = data
+        self.path = str(path) if path is not None else None
+        self.name = name
+        self._owns_path = owns_path
+        self._file = None
+        self._mmap = None
+        self._hash = None
+        # Backends extraction.first_page_text opened, kept for the parse that follows
+        self.open_pages = None
+
+    @property
+    def size(self):
+        if self.data is not None:
+            return len(self.data)
+        return os.path.getsize(self.path)
+
+    def open_stream(self):
+        """Return an independent binary stream positioned at the start"""
+        if self.path is not None:
+            return open(self.path, 'rb')
+        # BytesIO shares the bytes object instead of copying it
+        return io.BytesIO(self.data)
+
+    def open_document(self):
+        """Open the PDF with PyMuPDF, imported on first use"""
+        pymupdf = import_pymupdf()
+        if self.path is not None:
+            return pymupdf.open(self.path, filetype="pdf")
+        return pymupdf.open(stream=self.data, filetype="pdf")
+
+    def buffer(self):
+        """Return a read-only buffer over the whole document (memory-mapped for files)"""
+        if self.data is not None:
+            return memoryview(self.data)
+        if self._mmap is None:
+            self._file = open(self.path, 'rb')
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(self._mmap)
+
+    def content_hash(self):
+        """SHA-256 of the document, computed once over the shared buffer"""
+        if self._hash is None:
+            with self.buffer() as view:
+                self._hash = hashlib.sha256(view).hexdigest()
+        return self._hash
+
+    def read(self):
+        """Compatibility with file objects; this copies the document"""
+        return bytes(self.buffer())
+
+    def getvalue(self):
+        return self.read()
+
+    def close(self):
+        if self.open_pages is not None:
+            self.open_pages.close()
+            self.open_pages = None
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # A caller still holds a view; the mapping goes with it
+                pass
+            self._file.close()
+            self._mmap = None
+            self._file = None
+        if self._owns_path and self.path and os.path.exists(self.path):
+            os.remove(self.path)
+            self._owns_path = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __getstate__(self):
+        # Pool workers get the bytes or the path, never the open mapping
+        state = self.__dict__.copy()
+        state.update(_file=None, _mmap=None, _owns_path=False, open_pages=None)
+        return state
+
+
+def import_pymupdf():
+    """PyMuPDF under its current name; 'fitz' before 1.24, whose import now prints a warning to stdout"""
+    try:
+        import pymupdf
+    except ImportError:
+        import fitz as pymupdf
+    return pymupdf
+
+
+def spool_upload(stream, name='uploaded_file', threshold=None):
+    """Turn an upload stream into a PdfSource.
+
+    Small bodies are read into memory once; anything above the threshold
+    is copied to a temporary file in fixed-size chunks so peak memory does
+    not grow with the upload. The temporary file is removed on close().
+    """
+    threshold = SPOOL_THRESHOLD if threshold is None else threshold
+
+    head = stream.read(threshold + 1)
+    if len(head) <= threshold:
+        return PdfSource(data=head, name=name)
+
+    tmp = tempfile.NamedTemporaryFile(prefix='statement-', suffix='.pdf', delete=False)
+    try:
+        tmp.write(head)
+        del head
+        shutil.copyfileobj(stream, tmp, _CHUNK_SIZE)
+    except BaseException:
+        # A failed read leaves no partial copy behind
+        tmp.close()
+        os.remove(tmp.name)
+        raise
+    tmp.close()
+    logger.info(f"Spooled upload {name} to {tmp.name}")
+    return PdfSource(path=tmp.name, name=name, owns_path=True)
+
+
+def as_source(file_source):
+    """Normalize a path, bytes, PdfSource or file-like object to a PdfSource"""
+    if isinstance(file_source, PdfSource):
+        return file_source
+    if isinstance(file_source, (str, Path)):
+        return PdfSource(path=file_source, name=Path(file_source).name)
+    if isinstance(file_source, (bytes, bytearray, memoryview)):
+        return PdfSource(data=bytes(file_source))
+
+    name = getattr(file_source, 'name', 'uploaded_file')
+    path = getattr(file_source, 'path', None)
+    if isinstance(path, (str, Path)) and os.path.exists(path):
+        return PdfSource(path=path, name=name)
+    if hasattr(file_source, 'seek'):
+        file_source.seek(0)
+    return spool_upload(file_source, name)
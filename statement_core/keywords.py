@@ -0,0 +1,175 @@
+import logging
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton: every keyword occurring in a text, in one pass over it.
+
+    Matching is case-sensitive; lowercase both the keywords and the text
+    for case-insensitive matching.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        # Trie: transitions, failure link and the keywords ending at each node
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for index, keyword in enumerate(self.keywords):
+            node = 0
+            for char in keyword:
+                child = self.goto[node].get(char)
+                if child is None:
+                    child = len(self.goto)
+                    self.goto[node][char] = child
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                node = child
+            self.output[node].append(index)
+
+        # Breadth first, so a node's failure link is set before its children's
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def find(self, text):
+        """Indexes (into keywords) of the keywords found in text"""
+        goto, fail, output = self.goto, self.fail, self.output
+        found = set(output[0])
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if output[node]:
+                found.update(output[node])
+        return found
+
+
+class KeywordCategorizer:
+    """Keyword categories compiled once into a single automaton.
+
+    categories maps a name to {'keywords': [...], 'weight': w} or to a plain
+    list of keywords (weight 1). Keywords are matched as substrings of the
+    lowercased description, so the cost of a lookup depends on the length
+    of the description rather than on the number of keywords.
+    """
+
+    def __init__(self, categories, default):
+        self.names = []
+        self.weights = []
+        self.default = default
+        # Keyword -> category indexes, once per time the category lists it
+        owners = {}
+        for index, (name, data) in enumerate(categories.items()):
+            if isinstance(data, dict):
+                keywords, weight = data['keywords'], data['weight']
+            else:
+                keywords, weight = data, 1
+            self.names.append(name)
+            self.weights.append(weight)
+            for keyword in keywords:
+                owners.setdefault(keyword, []).append(index)
+
+        self.automaton = KeywordAutomaton(owners)
+        self.owners = list(owners.values())
+
+        # Keyword-by-category matrix in CSR form: row k holds the categories
+        # keyword k belongs to, a category repeated if it lists k twice
+        self.keyword_indptr = np.cumsum([0] + [len(indexes) for indexes in self.owners])
+        self.keyword_categories = np.array([index for indexes in self.owners for index in indexes], dtype=np.intp)
+
+        # score_table[c, n]: category c's score with n keyword hits, summed
+        # hit by hit as categorize() does, so both agree to the last bit
+        hits_per_category = np.bincount(self.keyword_categories, minlength=len(self.names))
+        self.score_table = np.zeros((len(self.names), hits_per_category.max(initial=0) + 1))
+        for index, weight in enumerate(self.weights):
+            score = 0
+            for hits in range(1, hits_per_category[index] + 1):
+                score += weight
+                self.score_table[index, hits] = score
+        logger.debug(f"Compiled {len(owners)} keywords in {len(self.names)} categories "
+                     f"into {len(self.automaton.goto)} automaton states")
+
+    def categorize(self, description):
+        """Weighted scoring: a category scores its weight for every listed keyword found,
+        and the highest score wins, earlier categories on ties"""
+        scores = {}
+        for keyword in self.automaton.find(description.lower()):
+            for index in self.owners[keyword]:
+                scores[index] = scores.get(index, 0) + self.weights[index]
+
+        best_category = self.default
+        best_score = 0
+        for index in sorted(scores):
+            if scores[index] > best_score:
+                best_score = scores[index]
+                best_category = self.names[index]
+        return best_category
+
+    def first_match(self, description):
+        """The first category with any of its keywords in the description"""
+        found = self.automaton.find(description.lower())
+        if not found:
+            return self.default
+        return self.names[min(min(self.owners[keyword]) for keyword in found)]
+
+    def categorize_many(self, descriptions, rule='weighted'):
+        """Categories for a sequence of descriptions, each distinct description scored once.
+
+        Descriptions are lowercased and stripped, which cannot change which
+        keywords they contain, then factorized. Only the unique values are
+        run through the automaton; their hits are counted per category
+        through the keyword-by-category matrix and scored together. rule is
+        'weighted' (as categorize) or 'first_match'. Returns an array
+        aligned with descriptions.
+        """
+        normalized = pd.Series(descriptions, dtype=object).fillna('').str.lower().str.strip()
+        codes, uniques = pd.factorize(normalized)
+        if not self.names or not len(uniques):
+            return np.full(len(codes), self.default, dtype=object)
+
+        counts = self._count_hits(uniques)
+        if rule == 'first_match':
+            matched = counts > 0
+            best = matched.argmax(axis=1)
+            best[~matched.any(axis=1)] = len(self.names)
+        else:
+            scores = self.score_table[np.arange(len(self.names)), counts]
+            # argmax takes the first of equal scores, as categorize() does
+            best = scores.argmax(axis=1)
+            best[scores.max(axis=1) <= 0] = len(self.names)
+
+        labels = np.array(self.names + [self.default], dtype=object)
+        return labels[best][codes]
+
+    def _count_hits(self, texts):
+        """(texts x categories) matrix: how many of each category's keywords occur in each text"""
+        rows, keywords = [], []
+        for row, text in enumerate(texts):
+            for keyword in self.automaton.find(text):
+                rows.append(row)
+                keywords.append(keyword)
+        rows = np.array(rows, dtype=np.intp)
+        keywords = np.array(keywords, dtype=np.intp)
+
+        # Expand each (text, keyword) hit to the keyword's row of the matrix
+        starts = self.keyword_indptr[keywords]
+        lengths = self.keyword_indptr[keywords + 1] - starts
+        entries = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        counts = np.zeros((len(texts), len(self.names)), dtype=np.intp)
+        np.add.at(counts, (np.repeat(rows, lengths), self.keyword_categories[entries]), 1)
+        return counts
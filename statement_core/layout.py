@@ -0,0 +1,168 @@
+import re
+import logging
+
+from statement_core.ingest import as_source
+
+logger = logging.getLogger(__name__)
+
+# Header labels that identify each column, matched as whole words
+COLUMN_ALIASES = {
+    'date': ['date', 'txn date', 'transaction date'],
+    'description': ['transaction details', 'details', 'narration', 'description', 'particulars'],
+    'reference': ['chq/ref no', 'chq/ref no.', 'ref no', 'ref no.', 'reference'],
+    'type': ['type', 'dr/cr', 'cr/dr'],
+    'amount': ['amount'],
+    'debit': ['withdrawal', 'withdrawal (dr)', 'debit'],
+    'credit': ['deposit', 'deposit (cr)', 'credit'],
+    'balance': ['balance'],
+}
+
+# Words whose vertical centres are this close (in points) share a row
+ROW_TOLERANCE = 3
+
+# Rows after the dated one that still belong to the same record; keeps page
+# footers from being glued onto the last row of a page
+MAX_CONTINUATION_ROWS = 4
+
+# A value in the date column that opens a new table row
+DATE_CELL_PATTERN = re.compile(
+    r'(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{1,2},?\s+\d{4}'
+    r'|\d{1,2}[\s-](?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*[\s-]\d{2,4}'
+    r'|\d{1,2}[/-]\d{1,2}[/-]\d{2,4}',
+    re.IGNORECASE
+)
+
+
+def _pymupdf_words(source):
+    doc = source.open_document()
+    try:
+        for page in doc:
+            yield [(w[0], w[1], w[2], w[3], w[4]) for w in page.get_text("words")]
+    finally:
+        doc.close()
+
+
+def _pdfplumber_words(source):
+    import pdfplumber
+    with pdfplumber.open(source.open_stream()) as pdf:
+        for page in pdf.pages:
+            yield [(w['x0'], w['top'], w['x1'], w['bottom'], w['text'])
+                   for w in page.extract_words(x_tolerance=3, y_tolerance=3)]
+
+
+WORD_BACKENDS = {
+    'pymupdf': _pymupdf_words,
+    'pdfplumber': _pdfplumber_words,
+}
+
+
+def iter_page_words(pdf, backend='pymupdf'):
+    """Yield, per page, a list of (x0, top, x1, bottom, text) word boxes"""
+    yield from WORD_BACKENDS[backend](as_source(pdf))
+
+
+def cluster_rows(words, tolerance=ROW_TOLERANCE):
+    """Group word boxes into rows by vertical centre, each row sorted left to right"""
+    rows = []
+    current = []
+    current_y = None
+    for word in sorted(words, key=lambda w: ((w[1] + w[3]) / 2, w[0])):
+        y = (word[1] + word[3]) / 2
+        if current and y - current_y > tolerance:
+            rows.append(sorted(current, key=lambda w: w[0]))
+            current = []
+        if not current:
+            current_y = y
+        current.append(word)
+    if current:
+        rows.append(sorted(current, key=lambda w: w[0]))
+    return rows
+
+
+def _find_phrase(texts, phrase):
+    """(start index, word count) of phrase within texts, or None"""
+    target = phrase.split()
+    for i in range(len(texts) - len(target) + 1):
+        if texts[i:i + len(target)] == target:
+            return i, len(target)
+    return None
+
+
+def detect_columns(row):
+    """Return column spans [(name, left, right)] if row is a table header, else None"""
+    texts = [w[4].lower() for w in row]
+    found = {}
+    for name, aliases in COLUMN_ALIASES.items():
+        # Longest alias first so 'transaction details' beats 'details'
+        for alias in sorted(aliases, key=len, reverse=True):
+            hit = _find_phrase(texts, alias)
+            if hit is not None:
+                start, length = hit
+                found[name] = (row[start][0], row[start + length - 1][2])
+                break
+
+    has_amount = 'amount' in found or ('debit' in found and 'credit' in found)
+    if 'date' not in found or not has_amount or len(found) < 3:
+        return None
+
+    # Boundaries sit halfway between neighbouring headers, which copes with
+    # right-aligned amounts starting left of their header
+    ordered = sorted(found.items(), key=lambda item: item[1][0])
+    columns = []
+    for i, (name, (x0, x1)) in enumerate(ordered):
+        left = float('-inf') if i == 0 else (ordered[i - 1][1][1] + x0) / 2
+        right = float('inf') if i == len(ordered) - 1 else (x1 + ordered[i + 1][1][0]) / 2
+        columns.append((name, left, right))
+    return columns
+
+
+def _split_row(row, columns):
+    cells = {name: [] for name, _, _ in columns}
+    for word in row:
+        centre = (word[0] + word[2]) / 2
+        for name, left, right in columns:
+            if left <= centre < right:
+                cells[name].append(word[4])
+                break
+    return {name: ' '.join(parts) for name, parts in cells.items()}
+
+
+def iter_table_records(pages_words, tolerance=ROW_TOLERANCE):
+    """Turn per-page word boxes into table records.
+
+    Each record maps a column name to the non-empty cell texts of its rows.
+    A record opens on a row whose date cell holds a date; following rows
+    without one (time, reference numbers, wrapped narration) are appended
+    to the open record's cells. Pages without a header reuse the previous
+    page's columns; on pages with one, the rows above it (titles, account
+    details) are skipped rather than appended to the last record.
+    """
+    columns = None
+    record = None
+    continuation_rows = 0
+    for words in pages_words:
+        rows = cluster_rows(words, tolerance)
+        headers = [detect_columns(row) for row in rows]
+        above_header = any(header is not None for header in headers)
+        for row, header in zip(rows, headers):
+            if header is not None:
+                columns = header
+                above_header = False
+                continue
+            if columns is None or above_header:
+                continue
+
+            cells = _split_row(row, columns)
+            if DATE_CELL_PATTERN.search(cells.get('date', '')):
+                if record is not None:
+                    yield record
+                record = {name: [text] if text else [] for name, text in cells.items()}
+                continuation_rows = 0
+            elif record is not None and continuation_rows < MAX_CONTINUATION_ROWS:
+                continuation_rows += 1
+                for name, text in cells.items():
+                    if text:
+                        record[name].append(text)
+
+    if record is not None:
+        yield record
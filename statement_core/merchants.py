@@ -0,0 +1,309 @@
+import os
+import re
+import time
+import atexit
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from statement_core import CACHE_ROOT
+
+logger = logging.getLogger(__name__)
+
+# SQLite file holding memo key -> category; empty disables the memo
+MERCHANT_MEMO_PATH = os.getenv('MERCHANT_MEMO_PATH', os.path.join(CACHE_ROOT, 'merchants.db'))
+# Keys kept, over all model versions; the least recently seen go first
+MERCHANT_MEMO_MAX_ENTRIES = int(os.getenv('MERCHANT_MEMO_MAX_ENTRIES', 100000))
+
+# Distinct descriptions whose outcome each worker keeps in memory
+MERCHANT_MEMO_MAX_DESCRIPTIONS = int(os.getenv('MERCHANT_MEMO_MAX_DESCRIPTIONS', 50000))
+# Seconds between writes of known keys' hits and the counters
+MERCHANT_MEMO_FLUSH_INTERVAL = float(os.getenv('MERCHANT_MEMO_FLUSH_INTERVAL', 60))
+
+# Counters kept in the memo file, summed over every process that uses it
+MEMO_COUNTERS = ('hits', 'misses', 'evictions')
+
+# "Paid to", "Received from" and similar lead-ins name the direction, not the merchant
+DIRECTION_PREFIX_PATTERN = re.compile(
+    r'^[\s/|,:#_()-]*(?:paid\s+to|received\s+from|payment\s+(?:to|from)|sent\s+to|money\s+sent\s+to'
+    r'|transfer(?:red)?\s+(?:to|from)|refund\s+from)\b[\s:-]*',
+    re.IGNORECASE
+)
+# UPI handles such as swiggy@ybl or 9876543210@paytm
+UPI_HANDLE_PATTERN = re.compile(r'[\w.-]+@[a-z][\w.]*', re.IGNORECASE)
+# Reference numbers, with the label in front of them if any ("UTR No 4012...", "Txn ID T2401...")
+REFERENCE_PATTERN = re.compile(
+    r'(?:\b(?:transaction|txn|utr|upi|ref(?:erence)?|rrn)(?:\s+(?:id|no|number))?\.?\s*[:#/-]?\s*)?'
+    r'\b\w*\d{4,}\w*\b',
+    re.IGNORECASE
+)
+# Separators that never occur in category keywords
+SEPARATOR_PATTERN = re.compile(r'[\s/|,:#_()]+')
+# Digit runs with no letter or digit either side: amounts, dates, reference
+# numbers, phone-number handles. Every digit in a category keyword has a
+# letter next to it ('zee5', 'd2h') and the classifier folds all digit runs
+# to '0', so folding these cannot change a category.
+STANDALONE_DIGITS_PATTERN = re.compile(r'(?<![^\W_])\d+(?![^\W_])')
+
+
+def merchant_key(description):
+    """'Paid to SWIGGY (swiggy@ybl) UTR No 401234567890' -> 'swiggy'"""
+    text = UPI_HANDLE_PATTERN.sub(' ', description)
+    text = REFERENCE_PATTERN.sub(' ', text)
+    text = DIRECTION_PREFIX_PATTERN.sub('', text)
+    return SEPARATOR_PATTERN.sub(' ', text).strip(' .-').lower()
+
+
+def memo_key(description):
+    """'Nov 01, 2024 Paid to SWIGGY DEBIT INR 349.00' -> 'nov 0, 0 paid to swiggy debit inr 0.0'"""
+    return STANDALONE_DIGITS_PATTERN.sub('0', description).strip().lower()
+
+
+def merchant_keys(descriptions):
+    """merchant_key over a Series of descriptions, one regex pass per step"""
+    text = descriptions.str.replace(UPI_HANDLE_PATTERN, ' ', regex=True)
+    text = text.str.replace(REFERENCE_PATTERN, ' ', regex=True)
+    text = text.str.replace(DIRECTION_PREFIX_PATTERN, '', regex=True)
+    return text.str.replace(SEPARATOR_PATTERN, ' ', regex=True).str.strip(' .-').str.lower()
+
+
+class MerchantMemo:
+    """Memo key -> category, learned from the category model and kept in SQLite.
+
+    Entries are per category model version, so editing a category file
+    starts a fresh memo. The key (memo_key) is the description without its
+    amounts, dates and reference numbers, which the model never looks at,
+    so a key's category is exactly what the model gives any description
+    with that key: the memo never changes a category, whatever order
+    statements arrive in. Direction and payee stay in the key, so 'Paid to
+    SWIGGY' of any amount on any day is one entry. Each worker holds the
+    memo for its model in an LRU dict of at most max_entries keys, so a
+    known key costs one lookup, and remembers the outcome for up to
+    max_descriptions distinct descriptions, so a description seen before
+    costs no regex work at all.
+
+    The file holds at most max_entries keys, evicting the least
+    recently seen once inserts take it past the bound. Only newly learned keys are written straight away;
+    the hits and last-seen times of known ones, and the counters, are
+    written with them or at most every flush_interval seconds. Hits and
+    misses (one per distinct key in a statement) and evictions are counted
+    in the file itself, so get_stats() covers every worker and CLI run
+    sharing it.
+    """
+
+    def __init__(self, path=MERCHANT_MEMO_PATH, max_entries=MERCHANT_MEMO_MAX_ENTRIES,
+                 max_descriptions=MERCHANT_MEMO_MAX_DESCRIPTIONS, flush_interval=MERCHANT_MEMO_FLUSH_INTERVAL):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_descriptions = max_descriptions
+        self.flush_interval = flush_interval
+        self._initialized = False
+        # model version -> {memo key: category}, least recently seen first
+        self._known = {}
+        # model version -> {description: (memo key, category)}, least recently seen first
+        self._described = {}
+        # (model version, memo key) -> [rows, last seen] and counters not yet written
+        self._pending = {}
+        self._counters = dict.fromkeys(MEMO_COUNTERS, 0)
+        self._flushed_at = time.monotonic()
+        # Merchants in the file as last counted plus those this process has added since; None until counted
+        self._entries = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if not self._initialized:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10)
+        if not self._initialized:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''CREATE TABLE IF NOT EXISTS merchants
+                            (model_version TEXT NOT NULL,
+                             merchant TEXT NOT NULL,
+                             category TEXT NOT NULL,
+                             hits INTEGER NOT NULL,
+                             source TEXT NOT NULL,
+                             last_used REAL NOT NULL DEFAULT 0,
+                             PRIMARY KEY (model_version, merchant))''')
+            conn.execute('CREATE INDEX IF NOT EXISTS merchants_last_used ON merchants (last_used)')
+            conn.execute('''CREATE TABLE IF NOT EXISTS memo_stats
+                            (name TEXT PRIMARY KEY,
+                             value INTEGER NOT NULL)''')
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def warm(self, model_version):
+        """Load every key known for a model version into memory; call at worker start"""
+        with self._lock:
+            known = self._known.get(model_version)
+            if known is not None:
+                return known
+            known = OrderedDict()
+            try:
+                conn = self._connect()
+                try:
+                    rows = conn.execute('SELECT merchant, category FROM merchants WHERE model_version = ? '
+                                        'ORDER BY last_used DESC LIMIT ?', (model_version, self.max_entries)).fetchall()
+                finally:
+                    conn.close()
+                known.update(reversed(rows))
+                logger.info(f"Merchant memo warmed with {len(known)} keys for {model_version}")
+            except sqlite3.Error as e:
+                logger.warning(f"Merchant memo read failed: {str(e)}")
+            self._known[model_version] = known
+            return known
+
+    def categorize_many(self, descriptions, model):
+        """model.categorize_many(descriptions), with known descriptions and keys resolved from memory"""
+        descriptions = pd.Series(np.asarray(descriptions, dtype=object), dtype=object).fillna('')
+        codes, uniques = pd.factorize(descriptions)
+        known = self.warm(model.version)
+
+        with self._lock:
+            described = self._described.setdefault(model.version, OrderedDict())
+            resolved = [described.get(description) for description in uniques]
+            for description, entry in zip(uniques, resolved):
+                if entry is not None:
+                    described.move_to_end(description)
+
+        unseen = [description for description, entry in zip(uniques, resolved) if entry is None]
+        learned = {}
+        if unseen:
+            outcomes, learned = self._resolve(unseen, known, model)
+            resolved = [entry or outcomes[description] for description, entry in zip(uniques, resolved)]
+            with self._lock:
+                described.update(outcomes)
+                while len(described) > self.max_descriptions:
+                    described.popitem(last=False)
+
+        keys, categories = zip(*resolved) if resolved else ((), ())
+        self._count(model.version, keys, np.bincount(codes, minlength=len(uniques)), learned)
+        return np.array(categories, dtype=object)[codes]
+
+    def _resolve(self, descriptions, known, model):
+        """{description: (memo key, category)} for descriptions not seen before, and the keys learned"""
+        keys = [memo_key(description) for description in descriptions]
+        with self._lock:
+            found = {key: known[key] for key in keys if key in known}
+        new = list(dict.fromkeys(key for key in keys if key not in found))
+        learned = dict(zip(new, model.categorize_many(new))) if new else {}
+        found.update(learned)
+        return {description: (key, found[key]) for description, key in zip(descriptions, keys)}, learned
+
+    def _count(self, model_version, keys, rows, learned):
+        """Note a statement's keys as recently seen, learning the new ones, and add its counts to those pending.
+
+        Pending hits and counters are written out with any new keys.
+        """
+        seen = {}
+        for key, count in zip(keys, rows):
+            seen[key] = seen.get(key, 0) + int(count)
+        now = time.time()
+        with self._lock:
+            known = self._known[model_version]
+            known.update(learned)
+            for key in seen:
+                if key in known:
+                    known.move_to_end(key)
+            while len(known) > self.max_entries:
+                known.popitem(last=False)
+            for key, count in seen.items():
+                pending = self._pending.setdefault((model_version, key), [0, 0])
+                pending[0] += count
+                pending[1] = now
+            self._counters['hits'] += len(seen) - len(learned)
+            self._counters['misses'] += len(learned)
+            due = time.monotonic() - self._flushed_at >= self.flush_interval
+        if learned or due:
+            self.flush([(model_version, key, category, 'keywords', now) for key, category in learned.items()])
+
+    def flush(self, new_rows=()):
+        """Write newly learned keys, then the hits, last-seen times and counters gathered since the last flush"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            counters, self._counters = self._counters, dict.fromkeys(MEMO_COUNTERS, 0)
+            self._flushed_at = time.monotonic()
+        if not new_rows and not pending and not any(counters.values()):
+            return
+        try:
+            conn = self._connect()
+            try:
+                inserted = conn.executemany('INSERT INTO merchants '
+                                            '(model_version, merchant, category, hits, source, last_used) '
+                                            'VALUES (?, ?, ?, 0, ?, ?) ON CONFLICT (model_version, merchant) DO NOTHING',
+                                            new_rows).rowcount
+                conn.executemany('UPDATE merchants SET hits = hits + ?, last_used = MAX(last_used, ?) '
+                                 'WHERE model_version = ? AND merchant = ?',
+                                 [(hits, last_used, model_version, merchant)
+                                  for (model_version, merchant), (hits, last_used) in pending.items()])
+                if inserted > 0:
+                    counters['evictions'] = self._evict(conn, inserted)
+                conn.executemany('INSERT INTO memo_stats VALUES (?, ?) '
+                                 'ON CONFLICT (name) DO UPDATE SET value = value + excluded.value',
+                                 [(name, value) for name, value in counters.items() if value])
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Merchant memo write failed: {str(e)}")
+
+    def _evict(self, conn, inserted):
+        """Delete the least recently seen keys once inserts take the file past max_entries; returns how many.
+
+        The file is counted once, then the count follows this process's own
+        inserts. It is counted again before evicting, which also picks up
+        keys other processes added.
+        """
+        if self._entries is None:
+            self._entries = conn.execute('SELECT COUNT(*) FROM merchants').fetchone()[0]
+        else:
+            self._entries += inserted
+        if self._entries <= self.max_entries:
+            return 0
+        self._entries = conn.execute('SELECT COUNT(*) FROM merchants').fetchone()[0]
+        excess = self._entries - self.max_entries
+        if excess <= 0:
+            return 0
+        self._entries -= excess
+        conn.execute('DELETE FROM merchants WHERE rowid IN '
+                     '(SELECT rowid FROM merchants ORDER BY last_used LIMIT ?)', (excess,))
+        logger.info(f"Merchant memo evicted {excess} keys")
+        return excess
+
+    def get_stats(self):
+        """Counters summed over every process using the memo file, with its current size"""
+        self.flush()
+        stats = dict.fromkeys(MEMO_COUNTERS, 0)
+        stats['entries'] = 0
+        try:
+            conn = self._connect()
+            try:
+                stats.update(conn.execute('SELECT name, value FROM memo_stats').fetchall())
+                stats['entries'] = conn.execute('SELECT COUNT(*) FROM merchants').fetchone()[0]
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Merchant memo read failed: {str(e)}")
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+
+# Shared instance used by the parsers' categorizers
+merchant_memo = MerchantMemo() if MERCHANT_MEMO_PATH else None
+if merchant_memo is not None:
+    # Hits and counters still pending when the process ends
+    atexit.register(merchant_memo.flush)
+
+
+def categorize_many(descriptions, model):
+    """Categories for descriptions under a category model, through the memo when it is enabled"""
+    if merchant_memo is None:
+        return model.categorize_many(descriptions)
+    return merchant_memo.categorize_many(descriptions, model)
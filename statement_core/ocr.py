@@ -0,0 +1,155 @@
+import os
+import hashlib
+import logging
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+
+from statement_core.page_cache import page_cache
+
+logger = logging.getLogger(__name__)
+
+# OCR only runs when enabled and the tesseract binary can be executed
+OCR_ENABLED = os.getenv('PARSER_OCR', '1') == '1'
+TESSERACT_CMD = os.getenv('TESSERACT_CMD', 'tesseract')
+OCR_LANG = os.getenv('OCR_LANG', 'eng')
+
+# Upper bound on concurrent tesseract processes, whatever the caller asks for
+OCR_WORKERS = int(os.getenv('OCR_WORKERS', min(2, os.cpu_count() or 1)))
+
+# Seconds one page may take before its tesseract process is killed
+OCR_PAGE_TIMEOUT = int(os.getenv('OCR_PAGE_TIMEOUT', 60))
+
+# Pages are rasterized at the highest DPI in this range that stays within the
+# pixel budget: about 300 DPI for A4, less for oversized pages, more for slips
+OCR_MIN_DPI = 150
+OCR_MAX_DPI = 400
+OCR_MAX_PIXELS = 9_000_000
+
+_tesseract_version = None
+
+
+def tesseract_version():
+    """First line of `tesseract --version`, or None if it cannot run"""
+    global _tesseract_version
+    if _tesseract_version is None:
+        try:
+            result = subprocess.run([TESSERACT_CMD, '--version'], capture_output=True, timeout=10, check=True)
+            output = (result.stdout or result.stderr).decode('utf-8', errors='replace')
+            _tesseract_version = output.splitlines()[0] if output else 'tesseract'
+        except (OSError, subprocess.SubprocessError):
+            _tesseract_version = ''
+    return _tesseract_version or None
+
+
+def ocr_available():
+    return OCR_ENABLED and tesseract_version() is not None
+
+
+def ocr_version():
+    """Identifies the OCR output for caching, or None when OCR is unavailable"""
+    if not ocr_available():
+        return None
+    return f"{tesseract_version()}|{OCR_LANG}|{OCR_MIN_DPI}-{OCR_MAX_DPI}|{OCR_MAX_PIXELS}"
+
+
+def adaptive_dpi(rect):
+    """Resolution for a page of the given size (in points)"""
+    area = (rect.width / 72) * (rect.height / 72)
+    if area <= 0:
+        return OCR_MIN_DPI
+    dpi = int((OCR_MAX_PIXELS / area) ** 0.5)
+    return max(OCR_MIN_DPI, min(OCR_MAX_DPI, dpi))
+
+
+def page_hash(doc, page):
+    """Hash of what a page draws: its content stream, images and size.
+
+    The same scanned page inside a different PDF hashes the same, so a
+    re-exported or re-uploaded statement reuses earlier OCR text.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{page.rect.width:.1f}x{page.rect.height:.1f}".encode('utf-8'))
+    digest.update(page.read_contents())
+    for image in page.get_images(full=True):
+        digest.update(doc.xref_stream_raw(image[0]) or b'')
+    return digest.hexdigest()
+
+
+def _open(source):
+    return source.open_document()
+
+
+def run_tesseract(image):
+    """OCR one PNG image; returns '' on failure or timeout"""
+    command = [TESSERACT_CMD, 'stdin', 'stdout', '-l', OCR_LANG, '--psm', '6']
+    try:
+        result = subprocess.run(command, input=image, capture_output=True,
+                                timeout=OCR_PAGE_TIMEOUT, check=True)
+    except subprocess.TimeoutExpired:
+        logger.warning(f"OCR timed out after {OCR_PAGE_TIMEOUT}s")
+        return ''
+    except (OSError, subprocess.CalledProcessError) as e:
+        logger.warning(f"OCR failed: {str(e)}")
+        return ''
+    return result.stdout.decode('utf-8', errors='replace')
+
+
+def _ocr_page(doc, page_num):
+    page = doc.load_page(page_num)
+    pixmap = page.get_pixmap(dpi=adaptive_dpi(page.rect), colorspace='gray')
+    return run_tesseract(pixmap.tobytes('png'))
+
+
+# Set once per pool process by _init_worker
+_worker_doc = None
+
+
+def _init_worker(source):
+    global _worker_doc
+    _worker_doc = _open(source)
+
+
+def _ocr_worker(page_num):
+    return _ocr_page(_worker_doc, page_num)
+
+
+def ocr_pages(source, page_nums, workers=None):
+    """OCR the given pages of a PdfSource, returning {page_num: text}.
+
+    Only meant for pages without a text layer. Cached pages are served by
+    page hash; the rest go to a process pool of at most OCR_WORKERS, each
+    page bounded by OCR_PAGE_TIMEOUT. Returns {} when OCR is unavailable.
+    """
+    if not page_nums or not ocr_available():
+        return {}
+    version = ocr_version()
+
+    doc = _open(source)
+    try:
+        hashes = {page_num: page_hash(doc, doc.load_page(page_num)) for page_num in page_nums}
+        cached = page_cache.get_ocr_texts(list(hashes.values()), version) if page_cache is not None else {}
+        texts = {page_num: cached[h] for page_num, h in hashes.items() if h in cached}
+        pending = [page_num for page_num in page_nums if page_num not in texts]
+
+        recognized = {}
+        workers = max(1, min(workers or OCR_WORKERS, OCR_WORKERS, len(pending) or 1))
+        if len(pending) == 1 or workers == 1:
+            recognized = {page_num: _ocr_page(doc, page_num) for page_num in pending}
+            pending = []
+    finally:
+        doc.close()
+
+    if pending:
+        logger.info(f"Running OCR on {len(pending)} pages with {workers} workers")
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_init_worker,
+                                 initargs=(source,)) as executor:
+            recognized = dict(zip(pending, executor.map(_ocr_worker, pending)))
+
+    # Failed or timed out pages are left uncached so a later upload retries them
+    found = {page_num: text for page_num, text in recognized.items() if text.strip()}
+    if page_cache is not None and found:
+        page_cache.put_ocr_texts(version, [(hashes[page_num], text) for page_num, text in found.items()])
+    texts.update(found)
+    logger.info(f"OCR produced text for {len(texts)} of {len(page_nums)} pages")
+    return texts
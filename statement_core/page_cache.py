@@ -0,0 +1,186 @@
+import os
+import time
+import zlib
+import sqlite3
+import logging
+
+from statement_core import CACHE_ROOT
+
+logger = logging.getLogger(__name__)
+
+# SQLite file holding extracted page text; empty disables the cache
+PAGE_CACHE_PATH = os.getenv('PAGE_CACHE_PATH', os.path.join(CACHE_ROOT, 'pages.db'))
+# Documents and OCR'd pages kept; the least recently used go first
+PAGE_CACHE_MAX_DOCUMENTS = int(os.getenv('PAGE_CACHE_MAX_DOCUMENTS', 2000))
+PAGE_CACHE_MAX_OCR_PAGES = int(os.getenv('PAGE_CACHE_MAX_OCR_PAGES', 10000))
+
+
+class PageTextCache:
+    """Extracted page text keyed by (document hash, page index, extractor version).
+
+    Text is stored zlib-compressed in SQLite so every worker and CLI run
+    shares it. A document only counts as cached once all of its pages have
+    been written, which lets parsers skip opening the PDF entirely. OCR
+    output is kept separately by page hash, since scanned pages recur
+    across otherwise different uploads.
+
+    At most max_documents documents and max_ocr_pages OCR'd pages are
+    kept; completing a document or storing OCR output past the bound
+    evicts the least recently read. Pages of no complete document (a
+    stream abandoned part way) go with the first eviction after them.
+    """
+
+    def __init__(self, path=PAGE_CACHE_PATH, max_documents=PAGE_CACHE_MAX_DOCUMENTS,
+                 max_ocr_pages=PAGE_CACHE_MAX_OCR_PAGES):
+        self.path = path
+        self.max_documents = max_documents
+        self.max_ocr_pages = max_ocr_pages
+        self._initialized = False
+
+    def _connect(self):
+        if not self._initialized:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10)
+        if not self._initialized:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''CREATE TABLE IF NOT EXISTS pages
+                            (doc_hash TEXT NOT NULL,
+                             page_num INTEGER NOT NULL,
+                             version TEXT NOT NULL,
+                             text BLOB NOT NULL,
+                             PRIMARY KEY (doc_hash, version, page_num))''')
+            conn.execute('''CREATE TABLE IF NOT EXISTS documents
+                            (doc_hash TEXT NOT NULL,
+                             version TEXT NOT NULL,
+                             page_count INTEGER NOT NULL,
+                             last_used REAL NOT NULL DEFAULT 0,
+                             PRIMARY KEY (doc_hash, version))''')
+            conn.execute('''CREATE TABLE IF NOT EXISTS ocr_pages
+                            (page_hash TEXT NOT NULL,
+                             version TEXT NOT NULL,
+                             text BLOB NOT NULL,
+                             last_used REAL NOT NULL DEFAULT 0,
+                             PRIMARY KEY (page_hash, version))''')
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def get_pages(self, doc_hash, version):
+        """Return every page's text in order, or None if the document is not fully cached"""
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute('SELECT page_count FROM documents WHERE doc_hash = ? AND version = ?',
+                                   (doc_hash, version)).fetchone()
+                if row is None:
+                    return None
+                rows = conn.execute('SELECT page_num, text FROM pages WHERE doc_hash = ? AND version = ? '
+                                    'ORDER BY page_num', (doc_hash, version)).fetchall()
+                if len(rows) != row[0]:
+                    return None
+                conn.execute('UPDATE documents SET last_used = ? WHERE doc_hash = ? AND version = ?',
+                             (time.time(), doc_hash, version))
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Page cache read failed: {str(e)}")
+            return None
+        return [zlib.decompress(text).decode('utf-8') for _, text in rows]
+
+    def get_first_page(self, doc_hash, version):
+        """First page's text if the whole document is cached, else None; for sniffing"""
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute('SELECT documents.page_count, COUNT(pages.page_num) FROM documents '
+                                   'JOIN pages USING (doc_hash, version) '
+                                   'WHERE documents.doc_hash = ? AND documents.version = ?',
+                                   (doc_hash, version)).fetchone()
+                if row is None or row[0] is None or row[0] != row[1]:
+                    return None
+                text = conn.execute('SELECT text FROM pages WHERE doc_hash = ? AND version = ? AND page_num = 0',
+                                    (doc_hash, version)).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Page cache read failed: {str(e)}")
+            return None
+        return zlib.decompress(text[0]).decode('utf-8') if text is not None else None
+
+    def put_pages(self, doc_hash, version, pages, page_count=None):
+        """Store (page_num, text) pairs; pass page_count to mark the document complete"""
+        try:
+            conn = self._connect()
+            try:
+                conn.executemany('INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)',
+                                 [(doc_hash, page_num, version, zlib.compress(text.encode('utf-8')))
+                                  for page_num, text in pages])
+                if page_count is not None:
+                    conn.execute('INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?)',
+                                 (doc_hash, version, page_count, time.time()))
+                    self._evict_documents(conn)
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Page cache write failed: {str(e)}")
+
+    def get_ocr_texts(self, page_hashes, version):
+        """Return {page_hash: text} for the pages OCR has already been run on"""
+        if not page_hashes:
+            return {}
+        try:
+            conn = self._connect()
+            try:
+                placeholders = ','.join('?' * len(page_hashes))
+                rows = conn.execute(f'SELECT page_hash, text FROM ocr_pages WHERE version = ? '
+                                    f'AND page_hash IN ({placeholders})', [version, *page_hashes]).fetchall()
+                if rows:
+                    conn.executemany('UPDATE ocr_pages SET last_used = ? WHERE page_hash = ? AND version = ?',
+                                     [(time.time(), page_hash, version) for page_hash, _ in rows])
+                    conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"OCR cache read failed: {str(e)}")
+            return {}
+        return {page_hash: zlib.decompress(text).decode('utf-8') for page_hash, text in rows}
+
+    def put_ocr_texts(self, version, items):
+        """Store (page_hash, text) pairs produced by OCR"""
+        try:
+            conn = self._connect()
+            try:
+                now = time.time()
+                conn.executemany('INSERT OR REPLACE INTO ocr_pages VALUES (?, ?, ?, ?)',
+                                 [(page_hash, version, zlib.compress(text.encode('utf-8')), now)
+                                  for page_hash, text in items])
+                self._evict(conn, 'ocr_pages', self.max_ocr_pages)
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"OCR cache write failed: {str(e)}")
+
+    def _evict_documents(self, conn):
+        """Drop the least recently used documents past max_documents, with every page they left behind"""
+        if self._evict(conn, 'documents', self.max_documents):
+            conn.execute('DELETE FROM pages WHERE NOT EXISTS (SELECT 1 FROM documents '
+                         'WHERE documents.doc_hash = pages.doc_hash AND documents.version = pages.version)')
+
+    def _evict(self, conn, table, limit):
+        """Delete a table's least recently used rows beyond limit; returns how many"""
+        excess = conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0] - limit
+        if excess <= 0:
+            return 0
+        conn.execute(f'DELETE FROM {table} WHERE rowid IN '
+                     f'(SELECT rowid FROM {table} ORDER BY last_used LIMIT ?)', (excess,))
+        logger.info(f"Page cache evicted {excess} rows from {table}")
+        return excess
+
+
+# Shared instance used by the extraction engine
+page_cache = PageTextCache() if PAGE_CACHE_PATH else None
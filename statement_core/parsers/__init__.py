@@ -0,0 +1,64 @@
+"""Per-issuer statement parsers, each imported only when it is first needed.
+
+Every issuer module exposes parse(source, categorize=None, **options),
+returning a DataFrame with at least the columns in COLUMNS. categorize
+maps a sequence of descriptions to their categories and is called once
+per statement (e.g. CategoryModel.categorize_many). The text-based
+parsers (paytm, kotak, supermoney) also expose parse_text(text,
+categorize=None) for callers already holding the text. Non-empty results
+also carry the payee stage's columns (statement_core.payees). The entry
+points (Flask API, CLI, Streamlit pages) only adapt its result to their
+output; none of these modules import streamlit or plotting libraries.
+"""
+import importlib
+import logging
+
+from statement_core.detect import UnsupportedStatementError, sniff_issuer
+from statement_core.ingest import as_source
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ['date', 'amount_paise', 'description', 'category']
+
+# Issuer -> module holding its parser, imported on first use
+PARSER_MODULES = {
+    'phonepe': 'statement_core.parsers.phonepe',
+    'paytm': 'statement_core.parsers.paytm',
+    'kotak': 'statement_core.parsers.kotak',
+    'supermoney': 'statement_core.parsers.supermoney',
+}
+
+# Statements whose issuer is not recognised are attempted with this parser
+DEFAULT_ISSUER = 'phonepe'
+
+
+def uncategorized(descriptions):
+    """Default categorizer for parsers given none"""
+    return ['Others'] * len(descriptions)
+
+
+def issuers():
+    return list(PARSER_MODULES)
+
+
+def parser_module(issuer):
+    """The parser module for an issuer, imported on the first call"""
+    try:
+        name = PARSER_MODULES[issuer]
+    except KeyError:
+        raise UnsupportedStatementError(f"No parser for {issuer} statements") from None
+    return importlib.import_module(name)
+
+
+def parse_statement(pdf, issuer=None, **options):
+    """Parse a statement with its issuer's parser, fingerprinting the issuer if not given"""
+    source = as_source(pdf)
+    try:
+        # Weak mentions of another issuer (e.g. a Paytm payee) keep the default
+        issuer = issuer or sniff_issuer(source, expected=DEFAULT_ISSUER) or DEFAULT_ISSUER
+        logger.info(f"Parsing with the {issuer} parser")
+        return parser_module(issuer).parse(source, **options)
+    finally:
+        # Only clean up what this function created (e.g. a spooled temp file)
+        if source is not pdf:
+            source.close()
@@ -0,0 +1,87 @@
+import re
+import logging
+
+import pandas as pd
+
+from statement_core.amounts import rupees, to_paise
+from statement_core.dates import DateParser
+from statement_core.extraction import extract_text
+from statement_core.parsers import COLUMNS, uncategorized
+from statement_core.payees import PAYEE_COLUMNS, add_payees
+
+logger = logging.getLogger(__name__)
+
+# Statement rows: date, narration/cheque ref, amount(Cr|Dr), balance(Cr|Dr)
+KOTAK_ROW_START = re.compile(r'^\d{2}-\d{2}-\d{4}')
+KOTAK_ROW_PATTERN = re.compile(
+    r'^(\d{2}-\d{2}-\d{4})\s+(.+?)\s+([\d,]+\.\d{2})\((Cr|Dr)\)\s+([\d,]+\.\d{2})\((Cr|Dr)\)$'
+)
+
+
+def parse(source, categorize=None, workers=None):
+    """Parse a Kotak statement into a DataFrame with balance and balance_ok columns"""
+    return parse_text(extract_text(source, workers=workers), categorize=categorize)
+
+
+def parse_text(text, categorize=None):
+    if not text:
+        raise ValueError("No text content found in PDF")
+
+    transactions = list(iter_transactions(text.splitlines()))
+    if not transactions:
+        return pd.DataFrame(columns=COLUMNS + ['balance_paise', 'balance_ok'])
+
+    df = pd.DataFrame(transactions)
+    df['date'] = DateParser().parse_many(df['date'])
+    df['category'] = (categorize or uncategorized)(df['description'])
+    return add_payees(df)[COLUMNS + ['balance_paise', 'balance_ok'] + PAYEE_COLUMNS]
+
+
+def iter_transactions(lines):
+    """Yield transactions as each row closes, checking the running balance.
+
+    A row's balance should equal the previous balance plus its signed
+    amount; in paise the check is exact. Rows where it does not hold are
+    flagged with balance_ok=False and the check resumes from the row's
+    own balance.
+    """
+    previous_balance = None
+    for row in iter_rows(lines):
+        match = KOTAK_ROW_PATTERN.search(row)
+        if not match:
+            continue
+        date, narration_chqref, amount, typ, balance, bal_type = match.groups()
+        amount = to_paise(amount)
+        if typ == 'Dr':
+            amount = -amount
+        balance = to_paise(balance)
+        if bal_type == 'Dr':
+            balance = -balance
+
+        balance_ok = previous_balance is None or previous_balance + amount == balance
+        if not balance_ok:
+            logger.warning(f"Kotak row on {date} does not reconcile: "
+                           f"{rupees(previous_balance):.2f} + {rupees(amount):.2f} != {rupees(balance):.2f}")
+        previous_balance = balance
+
+        yield {
+            'date': date,
+            'description': narration_chqref.strip(),
+            'amount_paise': amount,
+            'balance_paise': balance,
+            'balance_ok': balance_ok
+        }
+
+
+def iter_rows(lines):
+    """Join each dated line with its continuation lines, in linear time"""
+    parts = []
+    for line in lines:
+        if KOTAK_ROW_START.match(line):
+            if parts:
+                yield " ".join(parts).strip()
+            parts = [line]
+        elif parts:
+            parts.append(line)
+    if parts:
+        yield " ".join(parts).strip()
@@ -0,0 +1,112 @@
+import re
+import logging
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from statement_core.amounts import to_paise
+from statement_core.extraction import extract_text
+from statement_core.parsers import COLUMNS
+from statement_core.payees import add_payees
+
+logger = logging.getLogger(__name__)
+
+# First transaction heading, day + month date, signed amount
+PAYTM_HEADING = "Date & Time Transaction Details"
+PAYTM_DATE_PATTERN = re.compile(r'(\d{1,2})\s+(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)', re.IGNORECASE)
+PAYTM_AMOUNT_PATTERN = re.compile(r'([+-])\s*Rs\.(\d+(?:,\d+)*\.\d{2})')
+
+
+def parse(source, categorize=None, workers=None):
+    """Parse a Paytm statement into a DataFrame, newest first"""
+    return parse_text(extract_text(source, workers=workers), categorize=categorize)
+
+
+def parse_text(text, categorize=None):
+    """Paytm statement text -> DataFrame.
+
+    Without a categorizer, transactions are labelled 'Debit' or 'Credit'.
+    """
+    if not text:
+        raise ValueError("No text content found in PDF")
+
+    dates, amounts, descriptions = scan_lines(text.split('\n'))
+    if not dates:
+        return pd.DataFrame(columns=COLUMNS)
+
+    df = pd.DataFrame({
+        'date': dates,
+        'amount_paise': np.array(amounts, dtype=np.int64),
+        'description': descriptions,
+    })
+    if categorize is None:
+        df['category'] = np.where(df['amount_paise'] < 0, 'Debit', 'Credit')
+    else:
+        df['category'] = categorize(df['description'])
+    return add_payees(df).sort_values('date', ascending=False)
+
+
+def scan_lines(lines):
+    """Single pass over Paytm statement lines, returning (dates, paise amounts, descriptions).
+
+    A dated line opens a transaction and following lines extend it. The
+    amount is taken from each line as it arrives, looking back only at
+    the previous line for a sign split off by a line break, so each line
+    is examined a fixed number of times. Rows before the first
+    "Date & Time Transaction Details" heading are discarded when it is seen.
+    """
+    dates, amounts, descriptions = [], [], []
+    seen_heading = False
+    # State of the open transaction
+    date = None
+    parts = []
+    amount = None
+    previous = ''
+
+    def close():
+        if date is not None and amount is not None:
+            dates.append(date)
+            amounts.append(amount)
+            descriptions.append(' '.join(parts))
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        if not seen_heading and PAYTM_HEADING in line:
+            # Everything so far was statement header
+            seen_heading = True
+            dates, amounts, descriptions = [], [], []
+            date, parts, amount, previous = None, [], None, ''
+            continue
+
+        date_match = PAYTM_DATE_PATTERN.search(line)
+        if date_match:
+            try:
+                transaction_date = datetime.strptime(f"{date_match.group(1)} {date_match.group(2)} 2024", "%d %b %Y")
+            except ValueError:
+                # An impossible date is just another description line
+                transaction_date = None
+            if transaction_date is not None:
+                close()
+                date, parts, amount, previous = transaction_date, [], None, ''
+
+        if date is None:
+            continue
+        parts.append(line)
+        if amount is None:
+            amount_match = None
+            if previous.endswith(('+', '-')):
+                amount_match = PAYTM_AMOUNT_PATTERN.search(f"{previous} {line}")
+            if amount_match is None:
+                amount_match = PAYTM_AMOUNT_PATTERN.search(line)
+            if amount_match:
+                amount = to_paise(amount_match.group(2))
+                if amount_match.group(1) == '-':
+                    amount = -amount
+        previous = line
+
+    close()
+    return dates, amounts, descriptions
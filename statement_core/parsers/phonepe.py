@@ -0,0 +1,432 @@
+import re
+import logging
+import traceback
+from itertools import islice
+
+import pandas as pd
+
+from statement_core.amounts import parse_paise, rupees, to_paise
+from statement_core.dates import DateParser, normalize_date
+from statement_core.extraction import SKIP, extract_page_lines, iter_pages, split_lines, stitch_records
+from statement_core.ingest import as_source
+from statement_core.layout import DATE_CELL_PATTERN, iter_page_words, iter_table_records
+from statement_core.parsers import COLUMNS, uncategorized
+from statement_core.payees import add_payees, extract_payee
+from statement_core.tokenizer import MAX_DESCRIPTION_CHARS, RecordTokenizer
+from statement_core.vectorized import check_line_mode, coalesce, normalize_dates
+
+logger = logging.getLogger(__name__)
+
+# Record layout: patterns applied to one bounded, date-anchored record at a time
+TRANSACTION_PATTERNS = [
+    # Pattern 1: PhonePe standard format
+    re.compile(
+        r'(?P<date>(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s*\d{1,2},\s*\d{4})\s*'
+        r'(?P<time>\d{2}:\d{2}\s*[AP]M)?\s*'
+        rf'(?P<description>.{{0,{MAX_DESCRIPTION_CHARS}}}?)\s*'
+        r'(?P<type>Credit|Debit)?\s*'
+        r'(?:INR|₹|Rs\.?)\s*(?P<amount>[\d,]+\.?\d*)',
+        re.IGNORECASE | re.MULTILINE | re.DOTALL
+    ),
+    # Pattern 2: Alternative PhonePe format
+    re.compile(
+        r'(?P<date>\d{1,2}\s*(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s*\d{4})\s*'
+        r'(?P<time>\d{2}:\d{2}\s*[AP]M)?\s*'
+        rf'(?P<description>.{{0,{MAX_DESCRIPTION_CHARS}}}?)\s*'
+        r'(?P<amount>[-+]?₹?\s*[\d,]+\.?\d*)',
+        re.IGNORECASE | re.MULTILINE | re.DOTALL
+    )
+]
+
+# Line layout: transaction line formats, tried as one alternation. Each
+# alternative ends with its own amount group: a date with a type keyword,
+# a date and time followed by details, or a dd/mm/yyyy date.
+_MONTH_DATE = r'(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{1,2},?\s+\d{4}'
+_AMOUNT = r'(?:₹|Rs|INR)\s*(?P<amount_{}>\d+(?:,\d+)*(?:\.\d{{2}})?)'
+LINE_PATTERN = re.compile(
+    rf'(?P<date_typed>{_MONTH_DATE}).*?(?:CREDIT|DEBIT|Paid|Received).*?{_AMOUNT.format("typed")}'
+    rf'|(?P<date_timed>{_MONTH_DATE})\s+\d{{1,2}}:\d{{2}}\s*(?:AM|PM)?\s*(?P<details>.*?){_AMOUNT.format("timed")}'
+    rf'|(?P<date_numeric>\d{{1,2}}/\d{{1,2}}/\d{{4}}).*?{_AMOUNT.format("numeric")}',
+    re.IGNORECASE
+)
+
+# Lowercase literals a line must contain before LINE_PATTERN is tried
+CURRENCY_MARKERS = ('₹', 'rs', 'inr')
+DATE_MARKERS = ('/', 'jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec')
+
+HEADER_WORDS = ('statement', 'page', 'date', 'time', 'transaction id')
+DEBIT_WORDS = ('debit', 'paid', 'payment', 'withdraw')
+
+# The same word lists as single case-insensitive patterns for the vectorized mode
+HEADER_PATTERN = re.compile('|'.join(map(re.escape, HEADER_WORDS)), re.IGNORECASE)
+DEBIT_PATTERN = re.compile('|'.join(map(re.escape, DEBIT_WORDS)), re.IGNORECASE)
+
+# Table layout: numeric part of an amount cell such as "₹1,250.00" or "Rs.499"
+AMOUNT_CELL_PATTERN = re.compile(r'\d[\d,]*(?:\.\d+)?')
+
+# Continuation rows of a table record that carry references rather than narration
+REFERENCE_ROW_PATTERN = re.compile(r'(?:Transaction ID|UTR No|Paid by|Credited to|Debited from)', re.IGNORECASE)
+
+LAYOUTS = ('records', 'lines', 'table')
+
+# Transactions per categorizer call in PhonePeParser.iter_transactions
+ITER_CHUNK_SIZE = 256
+
+
+def parse(source, layout='records', categorize=None, mode=None, workers=None):
+    """Parse a PhonePe statement into a DataFrame.
+
+    'records' matches payee and amount within date-anchored records (the
+    API's output); 'lines' takes one transaction per line and keeps the
+    whole line as its description (the CLI's output); 'table' reads table
+    columns from word positions and returns None if there is no table.
+    """
+    if layout == 'records':
+        return PhonePeParser(source, mode=mode, categorize=categorize).parse()
+    if layout == 'lines':
+        return PhonePeLineParser(mode=mode, categorize=categorize).transactions(
+            extract_page_lines(source, workers=workers))
+    if layout == 'table':
+        return PhonePeTableParser(categorize=categorize).parse(source)
+    raise ValueError(f"layout must be one of {', '.join(LAYOUTS)}")
+
+
+class PhonePeParser:
+    """Record layout: a date, optional time, payee and amount, possibly over several lines"""
+
+    def __init__(self, file_source, mode=None, categorize=None):
+        # file_source can be a file path (string or Path object), a PdfSource or a file-like object
+        self.file_source = file_source
+        self.tokenizer = RecordTokenizer(TRANSACTION_PATTERNS)
+        # One date format per document, inferred from its first dates
+        self.dates = DateParser()
+        # 'loop' or 'vectorized' record parsing; None uses PARSER_LINE_MODE
+        self.mode = check_line_mode(mode)
+        self.categorize = categorize or uncategorized
+
+    @property
+    def truncated(self):
+        """True if the last parse hit the CPU budget and returned a partial result"""
+        return self.tokenizer.truncated
+
+    def parse(self):
+        """Handle PDF parsing with comprehensive extraction"""
+        try:
+            logger.info("Starting transaction extraction")
+            if self.mode == 'vectorized':
+                transactions = self._parse_records_vectorized()
+            else:
+                transactions = list(self._iter_records())
+
+            if len(transactions):
+                logger.info(f"Successfully extracted {len(transactions)} transactions")
+                df = pd.DataFrame(transactions)
+                # Both modes return the same dtypes, whatever each built its columns from
+                df = df[df['amount_paise'] != 0].astype({'date': 'datetime64[ns]', 'amount_paise': 'int64',
+                                                         'description': object})
+                # One categorizer call for the statement, not one per row
+                df['category'] = self.categorize(df['description'])
+                df = add_payees(df)
+                # The tokenizer never matches a span twice, so rows need no dedup;
+                # identical rows are genuine repeat payments
+                df = df.sort_values('date', kind='stable')
+                return df
+            else:
+                logger.warning("No transactions found in the PDF")
+                return pd.DataFrame(columns=COLUMNS)
+
+        except Exception as e:
+            logger.error(f"PDF parsing error: {str(e)}")
+            logger.error(traceback.format_exc())
+            return pd.DataFrame(columns=COLUMNS)
+
+    def iter_transactions(self):
+        """Yield transactions one at a time, reading pages only as they are needed.
+
+        Transactions are categorized ITER_CHUNK_SIZE at a time, one
+        categorizer call per chunk rather than one per row, so at most a
+        chunk of them and a page of text are held. Stops early if the
+        document exceeds the tokenizer's CPU budget, in which case
+        `truncated` is True afterwards.
+        """
+        records = self._iter_records()
+        while True:
+            chunk = list(islice(records, ITER_CHUNK_SIZE))
+            if not chunk:
+                return
+            categories = self.categorize([transaction['description'] for transaction in chunk])
+            for transaction, category in zip(chunk, categories):
+                transaction['category'] = category
+                transaction['vpa'], transaction['payee'] = extract_payee(transaction['description'])
+                yield transaction
+
+    def _iter_records(self):
+        """Transactions without categories, in statement order"""
+        source = as_source(self.file_source)
+        try:
+            matches = self.tokenizer.matches(self._iter_lines(iter_pages(source)))
+            for match in self.dates.inferring(matches, lambda match: normalize_date(match.group('date'))):
+                transaction = self._match_to_transaction(match)
+                if transaction is not None:
+                    yield transaction
+        finally:
+            # Only clean up what this parser created (e.g. a spooled temp file)
+            if source is not self.file_source:
+                source.close()
+
+    def _iter_lines(self, pages):
+        """Pages -> stripped, non-empty lines"""
+        for page_num, text in enumerate(pages, 1):
+            if not text or not text.strip():
+                continue
+            logger.debug(f"Extracted text from page {page_num}")
+            yield from split_lines(text)
+
+    def _match_to_transaction(self, match):
+        try:
+            # 'Nov01,2024' and 'Nov 01, 2024' normalize to one document format
+            date = self.dates.parse(normalize_date(match.group('date')))
+            description = match.group('description').strip()
+            amount = to_paise(match.group('amount'), strip='₹,\\s')
+
+            transaction_type = match.group('type') if 'type' in match.groupdict() else None
+            if transaction_type:
+                transaction_type = transaction_type.upper()
+                if transaction_type in ['DEBIT', 'Dr']:
+                    amount = -abs(amount)
+
+            logger.debug(f"Processed transaction: {date} - {rupees(amount)} - {description}")
+            return {
+                'date': date,
+                'amount_paise': amount,
+                'description': description
+            }
+        except Exception as e:
+            logger.warning(f"Could not process transaction: {e}")
+            logger.debug(f"Problematic match: {match.groupdict()}")
+            return None
+
+    def _parse_records_vectorized(self):
+        """Derive the columns of every match in bulk.
+
+        Records are matched exactly as in the loop mode, under the same CPU
+        budget and span arbitration; amounts, signs and dates are then
+        computed column-wise, dates with the document's format in one call.
+        """
+        source = as_source(self.file_source)
+        try:
+            matches = self.tokenizer.matches(self._iter_lines(iter_pages(source)))
+            found = pd.DataFrame([match.groupdict() for match in matches],
+                                 columns=['date', 'description', 'type', 'amount'], dtype=object)
+        finally:
+            if source is not self.file_source:
+                source.close()
+        if found.empty:
+            return found
+
+        amount = parse_paise(found['amount'], strip='₹,\\s')
+        is_debit = found['type'].fillna('').str.upper().eq('DEBIT')
+        amount = amount.where(~is_debit, -amount.abs())
+
+        # 'Nov01,2024' and 'Nov 01, 2024' normalize to one document format
+        date = self.dates.parse_many(normalize_dates(found['date'].str.strip()))
+
+        df = pd.DataFrame({
+            'date': date,
+            'amount_paise': amount,
+            'description': found['description'].str.strip(),
+        })
+        return df[df['amount_paise'].notna()]
+
+
+class PhonePeLineParser:
+    """Line layout: one transaction per line, rows split by a page break joined back"""
+
+    def __init__(self, mode=None, categorize=None):
+        # 'loop' or 'vectorized' line parsing; None uses PARSER_LINE_MODE
+        self.mode = check_line_mode(mode)
+        self.categorize = categorize or uncategorized
+
+    def transactions(self, pages):
+        """Lines of each page -> DataFrame of transactions, in statement order"""
+        if self.mode == 'vectorized':
+            df = self._parse_lines_vectorized(pages)
+        else:
+            df = pd.DataFrame(list(stitch_records(pages, self.parse_line)))
+        if df.empty:
+            return pd.DataFrame(columns=COLUMNS)
+        df.insert(3, 'category', self.categorize(df['description']))
+        return add_payees(df).astype({'amount_paise': 'int64'})
+
+    def parse_line(self, line):
+        """Parse one statement line, lowercasing it only once.
+
+        Returns SKIP for headers, page footers and column titles so they do
+        not take part in page-break stitching, and None for other lines
+        that hold no transaction.
+        """
+        lower = line.lower()
+        if any(header in lower for header in HEADER_WORDS):
+            return SKIP
+        try:
+            return self.extract_transaction(line, lower)
+        except Exception as e:
+            logger.error(f"Error processing line '{line}': {str(e)}")
+            return None
+
+    def extract_transaction(self, line, lower=None):
+        """Extract transaction details from a single line of text"""
+        lower = line.lower() if lower is None else lower
+
+        # Cheap literal checks first: no currency marker or date, no regex
+        if not any(marker in lower for marker in CURRENCY_MARKERS):
+            return None
+        if not any(marker in lower for marker in DATE_MARKERS):
+            return None
+
+        match = LINE_PATTERN.search(line)
+        if not match:
+            return None
+
+        # The amount group closes every alternative, so it names the one that matched
+        kind = match.lastgroup
+        amount_str = match.group(kind)
+        if kind == 'amount_typed':
+            date_str = match.group('date_typed')
+            description = line
+        elif kind == 'amount_timed':
+            date_str = match.group('date_timed')
+            description = match.group('details')
+        else:
+            date_str = match.group('date_numeric')
+            description = line
+
+        # Clean amount string
+        amount = to_paise(amount_str)
+
+        # Determine transaction type
+        is_debit = any(word in lower for word in DEBIT_WORDS)
+        if is_debit:
+            amount = -amount
+
+        # Parse date
+        if '/' in date_str:
+            date = pd.to_datetime(date_str, format='%d/%m/%Y')
+        else:
+            date = pd.to_datetime(date_str)
+
+        return {
+            'date': date,
+            'amount_paise': amount,
+            'description': description.strip() if description else 'Transaction',
+            'type': 'DEBIT' if is_debit else 'CREDIT'
+        }
+
+    def _parse_lines_vectorized(self, pages):
+        """Vectorized equivalent of stitching parse_line over every page.
+
+        All lines go into one Series and LINE_PATTERN runs once through
+        Series.str.extract; sign, date, amount and description are then
+        derived column-wise. Only page-break joins are handled in Python.
+        """
+        lines = pd.Series([line for page in pages for line in page], dtype=object)
+        page_of = pd.Series([page_num for page_num, page in enumerate(pages) for _ in page], dtype='int64')
+        keep = ~lines.str.contains(HEADER_PATTERN)
+        lines, page_of = lines[keep], page_of[keep]
+        found = lines.str.extract(LINE_PATTERN)
+        matched = found['amount_typed'].notna() | found['amount_timed'].notna() | found['amount_numeric'].notna()
+
+        # A row split by a page break: the last line of one page and the first
+        # of the next both fail to match, so match them joined instead
+        firsts = lines.index[~page_of.duplicated(keep='first')]
+        lasts = lines.index[~page_of.duplicated(keep='last')]
+        joins = []
+        for prev_idx, next_idx in zip(lasts, firsts[1:]):
+            if (page_of[next_idx] == page_of[prev_idx] + 1
+                    and not matched[prev_idx] and not matched[next_idx]):
+                joins.append((next_idx, f"{lines[prev_idx]} {lines[next_idx]}"))
+        if joins:
+            joined = pd.Series([text for _, text in joins], index=[idx for idx, _ in joins], dtype=object)
+            joined_found = joined.str.extract(LINE_PATTERN)
+            lines.update(joined)
+            found.update(joined_found)
+            matched = found['amount_typed'].notna() | found['amount_timed'].notna() | found['amount_numeric'].notna()
+
+        lines, found = lines[matched], found[matched]
+        if lines.empty:
+            return pd.DataFrame()
+
+        amount = parse_paise(coalesce(found, ['amount_typed', 'amount_timed', 'amount_numeric']))
+        is_debit = lines.str.contains(DEBIT_PATTERN)
+        amount = amount.where(~is_debit, -amount)
+
+        numeric = found['date_numeric'].notna()
+        date = pd.Series(pd.NaT, index=lines.index, dtype='datetime64[ns]')
+        date[numeric] = pd.to_datetime(found.loc[numeric, 'date_numeric'], format='%d/%m/%Y', errors='coerce')
+        month_dates = normalize_dates(coalesce(found, ['date_typed', 'date_timed'])[~numeric])
+        date[~numeric] = pd.to_datetime(month_dates, format='%b %d %Y', errors='coerce')
+
+        raw_description = found['details'].where(found['amount_timed'].notna(), lines).fillna('')
+
+        df = pd.DataFrame({
+            'date': date,
+            'amount_paise': amount,
+            'description': raw_description.str.strip().replace('', 'Transaction'),
+            'type': is_debit.map({True: 'DEBIT', False: 'CREDIT'}),
+        })
+        # Rows whose date does not parse are dropped, as the loop does
+        return df[df['date'].notna()].reset_index(drop=True)
+
+
+class PhonePeTableParser:
+    """Table layout: columns found from word positions on each page"""
+
+    def __init__(self, categorize=None):
+        self.dates = DateParser()
+        self.categorize = categorize or uncategorized
+
+    def parse(self, source):
+        """Read transactions from table columns; None if no table header was found"""
+        transactions = []
+        for record in iter_table_records(iter_page_words(source)):
+            transaction = self.record_to_transaction(record)
+            if transaction is not None:
+                transactions.append(transaction)
+
+        if not transactions:
+            return None
+
+        df = pd.DataFrame(transactions)
+        df = df[df['amount_paise'] != 0]
+        df = add_payees(df.assign(category=self.categorize(df['description'])))
+        # Same-day rows keep their statement order
+        df = df.sort_values('date', kind='stable')
+        return df
+
+    def record_to_transaction(self, record):
+        """Convert one table record ({column: [cell per row]}) into a transaction"""
+        try:
+            cell = lambda name: ' '.join(record.get(name, []))
+            date_match = DATE_CELL_PATTERN.search(cell('date'))
+            amount_text = cell('amount') or cell('debit') or cell('credit')
+            amount_match = AMOUNT_CELL_PATTERN.search(amount_text)
+            if not date_match or not amount_match:
+                return None
+
+            amount = to_paise(amount_match.group(0))
+            txn_type = cell('type').upper()
+            is_debit_column = not cell('amount') and cell('debit')
+            if is_debit_column or 'DEBIT' in txn_type or txn_type == 'DR' or '(DR)' in amount_text.upper():
+                amount = -abs(amount)
+
+            # Wrapped narration is kept, PhonePe's ID/UTR rows are not
+            description = ' '.join(part for part in record.get('description', [])
+                                   if not REFERENCE_ROW_PATTERN.match(part)).strip()
+            return {
+                'date': self.dates.parse(date_match.group(0)),
+                'amount_paise': amount,
+                'description': description
+            }
+        except Exception as e:
+            logger.warning(f"Could not process table row: {e}")
+            return None
@@ -0,0 +1,54 @@
+import re
+import logging
+
+import numpy as np
+import pandas as pd
+
+from statement_core.amounts import to_paise
+from statement_core.extraction import extract_text
+from statement_core.parsers import COLUMNS, uncategorized
+from statement_core.payees import add_payees
+
+logger = logging.getLogger(__name__)
+
+# One row per transaction: DD/MM/YYYY date, details, optionally signed INR/Rs./₹ amount
+SUPERMONEY_ROW_PATTERN = re.compile(
+    r'(?P<date>\d{2}/\d{2}/\d{4})\s+(?P<description>.*?)\s*(?P<sign>[+-])?\s*(?:INR|Rs\.?|₹)\s*(?P<amount>\d[\d,]*(?:\.\d+)?)',
+    re.IGNORECASE
+)
+DEBIT_PATTERN = re.compile(r'\b(?:debit(?:ed)?|dr|paid|sent|withdrawal)\b', re.IGNORECASE)
+
+
+def parse(source, categorize=None, workers=None):
+    """Parse a SuperMoney statement into a DataFrame, newest first"""
+    return parse_text(extract_text(source, workers=workers), categorize=categorize)
+
+
+def parse_text(text, categorize=None):
+    if not text:
+        raise ValueError("No text content found in PDF")
+
+    categorize = categorize or uncategorized
+    dates, amounts, descriptions = [], [], []
+    for line in text.split('\n'):
+        match = SUPERMONEY_ROW_PATTERN.search(line)
+        if not match:
+            continue
+        amount = to_paise(match.group('amount'))
+        if match.group('sign') == '-' or (match.group('sign') is None and DEBIT_PATTERN.search(line)):
+            amount = -amount
+        dates.append(match.group('date'))
+        amounts.append(amount)
+        descriptions.append(match.group('description').strip() or 'Transaction')
+
+    if not dates:
+        logger.warning("No SuperMoney transactions found")
+        return pd.DataFrame(columns=COLUMNS)
+
+    df = pd.DataFrame({
+        'date': pd.to_datetime(dates, format='%d/%m/%Y', errors='coerce'),
+        'amount_paise': np.array(amounts, dtype=np.int64),
+        'description': descriptions,
+    })
+    df = df[df['date'].notna()]
+    return add_payees(df.assign(category=categorize(df['description']))).sort_values('date', ascending=False)
@@ -0,0 +1,160 @@
+import re
+import logging
+
+import numpy as np
+import pandas as pd
+
+from statement_core import merchants
+
+logger = logging.getLogger(__name__)
+
+# UPI virtual payment address: username@handle, e.g. swiggy@ybl or 9876543210@okaxis.
+# Handles carry no dot, which keeps e-mail addresses (name@gmail.com) out.
+VPA_PATTERN = re.compile(r'(?<![\w.-])([a-z0-9][\w.-]*@[a-z][a-z0-9]*)(?![\w@]|\.\w)', re.IGNORECASE)
+
+# Columns the payee stage adds to a parsed statement
+PAYEE_COLUMNS = ['vpa', 'payee']
+
+
+def extract_vpa(description):
+    """'Paid to SWIGGY (Swiggy@YBL)' -> 'swiggy@ybl'; None without a VPA"""
+    match = VPA_PATTERN.search(description or '')
+    return match.group(1).lower() if match else None
+
+
+def extract_vpas(descriptions):
+    """extract_vpa over a Series of descriptions, in one regex pass"""
+    descriptions = pd.Series(descriptions, dtype=object).fillna('')
+    return descriptions.str.extract(VPA_PATTERN, expand=False).str.lower()
+
+
+def add_payees(df):
+    """Parse stage: add each row's UPI VPA and payee.
+
+    The payee is the VPA where the description has one, otherwise its
+    merchant key ('Paid to SWIGGY' -> 'swiggy'); rows naming neither get
+    no payee.
+    """
+    descriptions = pd.Series(df['description'], dtype=object).fillna('')
+    vpas = extract_vpas(descriptions)
+    keys = merchants.merchant_keys(descriptions).replace('', np.nan)
+    return df.assign(vpa=vpas, payee=vpas.fillna(keys))
+
+
+def extract_payee(description):
+    """(vpa, payee) of one description, as add_payees gives them"""
+    vpa = extract_vpa(description)
+    return vpa, vpa or merchants.merchant_key(description or '') or None
+
+
+class PayeeRules:
+    """User rules mapping payees to categories, matched before any keyword.
+
+    Rules are keyed by
+      'landlord@okaxis'   one VPA,
+      'paytmqr*'          every VPA starting with the prefix,
+      '@okaxis'           every VPA on a UPI handle.
+    The most specific rule wins: an exact VPA, then the longest prefix,
+    then the handle. Exact VPAs and handles are dict lookups and prefixes
+    sit in a trie, so a lookup walks the VPA once whatever the number of
+    rules.
+    """
+
+    def __init__(self, rules=None):
+        self.exact = {}
+        self.handles = {}
+        # Prefix trie: transitions and the category of the rule ending at each node
+        self.goto = [{}]
+        self.category = [None]
+        for pattern, category in (rules or {}).items():
+            rule = pattern.strip().lower()
+            if rule.startswith('@') and re.fullmatch(r'@[a-z][a-z0-9]*', rule):
+                self.handles[rule[1:]] = category
+            elif rule.endswith('*') and len(rule) > 1 and '*' not in rule[:-1]:
+                self._add_prefix(rule[:-1], category)
+            elif VPA_PATTERN.fullmatch(rule):
+                self.exact[rule] = category
+            else:
+                raise ValueError(f"Payee rule {pattern!r} is not a VPA, a VPA prefix ending in * or an @handle")
+
+    def _add_prefix(self, prefix, category):
+        node = 0
+        for char in prefix:
+            child = self.goto[node].get(char)
+            if child is None:
+                child = len(self.goto)
+                self.goto[node][char] = child
+                self.goto.append({})
+                self.category.append(None)
+            node = child
+        self.category[node] = category
+
+    def __len__(self):
+        return len(self.exact) + len(self.handles) + sum(category is not None for category in self.category)
+
+    def match(self, vpa):
+        """The category a rule gives a (lowercase) VPA, or None"""
+        if not isinstance(vpa, str) or not vpa:
+            return None
+        category = self.exact.get(vpa)
+        if category is not None:
+            return category
+
+        goto, node = self.goto, 0
+        for char in vpa:
+            node = goto[node].get(char)
+            if node is None:
+                break
+            if self.category[node] is not None:
+                category = self.category[node]
+        if category is not None:
+            return category
+        return self.handles.get(vpa.rpartition('@')[2])
+
+    def match_many(self, vpas):
+        """match over a sequence of VPAs, each distinct VPA looked up once; None where no rule applies"""
+        codes, uniques = pd.factorize(pd.Series(vpas, dtype=object))
+        # Code -1 (no VPA) picks the trailing None
+        found = np.array([self.match(vpa) for vpa in uniques] + [None], dtype=object)
+        return found[codes]
+
+
+def categorize_many(descriptions, model):
+    """Categories for descriptions under a category model.
+
+    The model's payee rules decide first, for rows whose VPA one matches;
+    the rest go through the merchant memo and the keywords.
+    """
+    descriptions = pd.Series(np.asarray(descriptions, dtype=object), dtype=object).fillna('')
+    if not len(model.payees):
+        return merchants.categorize_many(descriptions, model)
+
+    categories = model.payees.match_many(extract_vpas(descriptions))
+    rest = pd.isna(categories)
+    if rest.any():
+        categories[rest] = merchants.categorize_many(descriptions[rest], model)
+    return categories
+
+
+def payee_totals(df):
+    """Per-payee totals of a statement with the payee stage's columns.
+
+    One groupby over int64 paise; returns a DataFrame indexed by payee
+    with its VPA, row count, paise received, paise spent (negative) and
+    net, the biggest spends first.
+    """
+    paise = df['amount_paise'].to_numpy(dtype=np.int64)
+    rows = pd.DataFrame({
+        'payee': df['payee'].to_numpy(dtype=object),
+        'vpa': df['vpa'].to_numpy(dtype=object),
+        'received_paise': np.where(paise > 0, paise, 0),
+        'spent_paise': np.where(paise < 0, paise, 0),
+    })
+    totals = rows.groupby('payee', sort=False).agg(
+        vpa=('vpa', 'first'),
+        count=('received_paise', 'size'),
+        received_paise=('received_paise', 'sum'),
+        spent_paise=('spent_paise', 'sum'),
+    )
+    totals['net_paise'] = totals['received_paise'] + totals['spent_paise']
+    return totals.sort_values('spent_paise', kind='stable')
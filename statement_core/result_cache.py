@@ -0,0 +1,138 @@
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+
+from statement_core import CACHE_ROOT
+
+logger = logging.getLogger(__name__)
+
+# On-disk tier, shared by every gunicorn worker and CLI run on the box
+CACHE_DIR = os.getenv('RESULT_CACHE_DIR', os.path.join(CACHE_ROOT, 'results'))
+MAX_MEMORY_ENTRIES = int(os.getenv('RESULT_CACHE_MEMORY_ENTRIES', 128))
+MAX_DISK_BYTES = int(os.getenv('RESULT_CACHE_DISK_BYTES', 256 * 1024 * 1024))
+
+
+def code_version(*paths):
+    """Short hash of source files, so a code change invalidates old results"""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+class ResultCache:
+    """Two-tier cache of parsed statements keyed by content hash and version.
+
+    The memory tier is a per-process LRU; the disk tier holds one JSON
+    file per result and evicts least recently used files once the
+    directory grows past max_disk_bytes.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_entries=MAX_MEMORY_ENTRIES, max_disk_bytes=MAX_DISK_BYTES):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'memory_evictions': 0,
+            'disk_evictions': 0,
+        }
+
+    def key(self, source, version):
+        return f"{source.content_hash()}-{version}"
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        """Return the cached result for key, or None"""
+        with self._lock:
+            payload = self._memory.get(key)
+            if payload is not None:
+                self._memory.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return json.loads(payload)
+
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                payload = f.read()
+            # Touch so disk eviction sees this entry as recently used
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self.stats['misses'] += 1
+            return None
+
+        with self._lock:
+            self.stats['disk_hits'] += 1
+            self._remember(key, payload)
+        return json.loads(payload)
+
+    def put(self, key, result):
+        """Store a JSON-serializable result in both tiers"""
+        payload = json.dumps(result)
+        with self._lock:
+            self._remember(key, payload)
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Write then rename so other workers never read a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(payload)
+            os.replace(tmp_path, self._path(key))
+            self._evict_disk()
+        except OSError as e:
+            logger.warning(f"Could not write result cache entry: {str(e)}")
+
+    def _remember(self, key, payload):
+        self._memory[key] = payload
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats['memory_evictions'] += 1
+
+    def _evict_disk(self):
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith('.json'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                # Another worker already evicted it
+                pass
+            total -= size
+            with self._lock:
+                self.stats['disk_evictions'] += 1
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats['memory_entries'] = len(self._memory)
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['memory_hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+        return stats
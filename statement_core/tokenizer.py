@@ -0,0 +1,102 @@
+import os
+import re
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# A line containing either date form opens a new candidate record
+RECORD_START_PATTERN = re.compile(
+    r'(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s*\d{1,2},\s*\d{4}'
+    r'|\d{1,2}\s*(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s*\d{4}',
+    re.IGNORECASE
+)
+
+# Longest record (in lines) before it is closed regardless of what follows
+MAX_RECORD_LINES = 12
+
+# Longest record (in characters); longer records are cut, which bounds the
+# work any single pattern attempt can do however malformed the text is
+MAX_RECORD_CHARS = 2000
+
+# Most characters a pattern's free-text group may span; substitute it for
+# `.*?` so a failing match attempt gives up after a fixed amount of text
+MAX_DESCRIPTION_CHARS = 400
+
+# CPU seconds one document may spend matching before parsing stops early;
+# keep well under the gunicorn worker timeout
+PARSE_CPU_BUDGET = float(os.getenv('PARSE_CPU_BUDGET', 30))
+
+
+class RecordTokenizer:
+    """Splits statement lines into bounded records and matches them.
+
+    A record opens on a line where record_start matches, starting at the
+    match, and takes following lines until the next such line, up to
+    max_lines lines and max_chars characters. Patterns only ever see one
+    record, so total work is linear in the document size. Within a record
+    patterns are tried in priority order and each span of text is claimed
+    by at most one match.
+
+    Matching stops once cpu_budget seconds of CPU have been used; the
+    matches found so far are still yielded and `truncated` is set.
+    """
+
+    def __init__(self, patterns, record_start=RECORD_START_PATTERN,
+                 max_lines=MAX_RECORD_LINES, max_chars=MAX_RECORD_CHARS, cpu_budget=PARSE_CPU_BUDGET):
+        self.patterns = patterns
+        self.record_start = record_start
+        self.max_lines = max_lines
+        self.max_chars = max_chars
+        self.cpu_budget = cpu_budget
+        self.truncated = False
+
+    def records(self, lines):
+        """Lines -> candidate records: a dated line plus its continuation lines"""
+        record = []
+        size = 0
+        for line in lines:
+            start = self.record_start.search(line)
+            if start is not None or len(record) >= self.max_lines:
+                if record:
+                    yield "\n".join(record)[:self.max_chars]
+                record = [line[start.start():]] if start is not None else []
+                size = len(record[0]) if record else 0
+            elif record and size < self.max_chars:
+                record.append(line)
+                size += len(line) + 1
+        if record:
+            yield "\n".join(record)[:self.max_chars]
+
+    def matches(self, lines):
+        """Yield non-overlapping pattern matches record by record, within the CPU budget"""
+        self.truncated = False
+        deadline = time.process_time() + self.cpu_budget
+        for record in self.records(lines):
+            if time.process_time() > deadline:
+                self.truncated = True
+                logger.warning(f"Parsing stopped after {self.cpu_budget}s CPU budget; result is partial")
+                return
+            yield from self._arbitrate(record)
+
+    def _arbitrate(self, record):
+        """Single pass over a record in which each span is claimed by one pattern.
+
+        The earliest match wins, with ties going to the pattern listed first;
+        scanning resumes after the claimed span, so no text is matched twice.
+        """
+        pos = 0
+        # Next match of each pattern at or after pos (None once exhausted)
+        pending = [pattern.search(record) for pattern in self.patterns]
+        while True:
+            best = None
+            for i, match in enumerate(pending):
+                if match is not None and match.start() < pos:
+                    match = pending[i] = self.patterns[i].search(record, pos)
+                if match is not None and (best is None or match.start() < best.start()):
+                    best = match
+            if best is None:
+                return
+            yield best
+            # An empty match must still move the scan forward
+            pos = max(best.end(), best.start() + 1)
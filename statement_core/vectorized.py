@@ -0,0 +1,33 @@
+import os
+
+import pandas as pd
+
+from statement_core.dates import GLUED_TOKEN_PATTERN
+
+# How parsers turn lines into transactions: 'loop' matches one line at a
+# time in Python, 'vectorized' runs pandas string operations on all of them
+LINE_MODES = ('loop', 'vectorized')
+DEFAULT_LINE_MODE = os.getenv('PARSER_LINE_MODE', 'loop')
+
+
+def check_line_mode(mode):
+    mode = mode or DEFAULT_LINE_MODE
+    if mode not in LINE_MODES:
+        raise ValueError(f"mode must be one of {', '.join(LINE_MODES)}")
+    return mode
+
+
+def coalesce(frame, columns):
+    """First non-null value across columns, row by row"""
+    result = frame[columns[0]]
+    for column in columns[1:]:
+        result = result.fillna(frame[column])
+    return result
+
+
+def normalize_dates(dates):
+    """Series form of dates.normalize_date"""
+    return (dates.str.replace(GLUED_TOKEN_PATTERN, ' ', regex=True)
+                 .str.replace(',', ' ', regex=False)
+                 .str.split()
+                 .str.join(' '))
@@ -0,0 +1,36 @@
+import random
+
+import pandas as pd
+
+from statement_core.amounts import parse_paise, rupees, summarize, to_paise
+
+
+def test_to_paise():
+    cases = {'1,234.56': 123456, '99': 9900, '.5': 50, '-12.345': -1235, '+0.01': 1, '1,00,000.00': 10000000}
+    for text, paise in cases.items():
+        assert to_paise(text) == paise, text
+    try:
+        to_paise('abc')
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("'abc' parsed as an amount")
+
+
+def test_parse_paise_matches_scalar():
+    texts = ['₹ 1,234.56', '99', '-12.345', '.5']
+    parsed = parse_paise(pd.Series(texts + ['abc', '']), strip='₹,\\s')
+    assert parsed[:4].tolist() == [to_paise(text, strip='₹,\\s') for text in texts]
+    assert parsed[4:].isna().all()
+
+
+def test_sums_are_exact():
+    rng = random.Random(0)
+    texts = [f"{rng.choice('+-')}{rng.randint(0, 99999)}.{rng.randint(0, 99):02d}" for _ in range(10000)]
+    paise = [to_paise(text) for text in texts]
+    totals = summarize(paise, ['Others'] * len(paise))
+
+    exact = sum(paise)
+    assert totals['received'] + totals['spent'] == exact
+    assert rupees(exact) == round(sum(float(text) for text in texts), 2)
+    assert totals['by_category'].get('Others', (0, 0))[1] == totals['debit_count']
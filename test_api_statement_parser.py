@@ -0,0 +1,79 @@
+import os
+import sys
+import json
+import subprocess
+from unittest import mock
+
+import api_statement_parser
+from api_statement_parser import StatementParser
+from statement_core import extraction
+from statement_core.ingest import import_pymupdf
+from statement_core.parsers import phonepe
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+PDF_BACKENDS = ('fitz', 'pymupdf', 'pdfplumber', 'PyPDF2')
+
+
+def statement(pages=3, rows=10):
+    doc = import_pymupdf().open()
+    for page_num in range(pages):
+        page = doc.new_page()
+        page.insert_text((30, 40), "PhonePe Transaction Statement", fontsize=9)
+        for row in range(rows):
+            page.insert_text((30, 60 + 14 * row), f"Nov {row + 1:02d}, 2024 Paid to Merchant {page_num}-{row} "
+                                                  f"DEBIT INR {row + 1}.00", fontsize=8)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def test_iter_transactions_matches_parse():
+    pdf = statement()
+    df = StatementParser(pdf).parse()
+    transactions = list(api_statement_parser.iter_transactions(pdf))
+    assert len(transactions) == len(df) == 30
+    # In statement order, where parse() sorts by date
+    assert [t['description'] for t in transactions[:2]] == ['Paid to Merchant 0-0', 'Paid to Merchant 0-1']
+    columns = ['date', 'description', 'amount_paise', 'category']
+    assert sorted(tuple(t[column] for column in columns) for t in transactions) == \
+        sorted(df[columns].itertuples(index=False, name=None))
+
+
+def test_iter_transactions_reads_pages_as_consumed(monkeypatch):
+    pdf = statement(pages=6)
+    monkeypatch.setattr(phonepe, 'ITER_CHUNK_SIZE', 8)
+    read = []
+    page_text = extraction._PageSource.page_text
+    with mock.patch.object(extraction._PageSource, 'page_text', autospec=True,
+                           side_effect=lambda pages, page_num: read.append(page_num) or page_text(pages, page_num)):
+        transactions = api_statement_parser.iter_transactions(pdf)
+        # Nothing is opened until the first transaction is asked for
+        assert read == []
+        assert next(transactions)['description'] == 'Paid to Merchant 0-0'
+        # The date format is settled from the first 20 records; the 20th ends page 1
+        # and is only closed by the first line of page 2
+        assert read == [0, 1, 2]
+        assert len(list(transactions)) == 59
+    assert read == list(range(6))
+
+
+def run_python(*args):
+    """Run Python from the repo root; the cache directory comes from the environment"""
+    return subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True, text=True, timeout=120)
+
+
+def test_import_loads_no_pdf_backend():
+    result = run_python('-c', 'import sys, api_statement_parser; '
+                              f'print([name for name in {PDF_BACKENDS!r} if name in sys.modules])')
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == '[]'
+
+
+def test_cli_stdout_is_only_json(tmp_path):
+    path = tmp_path / 'statement.pdf'
+    path.write_bytes(statement())
+    result = run_python(os.path.join(ROOT, 'api_statement_parser.py'), str(path))
+    assert result.returncode == 0, result.stderr
+    response = json.loads(result.stdout)
+    assert len(response['transactions']) == 30
+    assert response['totalSpent'] == -sum(range(1, 11)) * 3
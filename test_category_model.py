@@ -0,0 +1,63 @@
+import os
+import json
+import tempfile
+
+from statement_core.category_model import CategoryModels
+
+
+def write_model(directory, keywords, version=1):
+    path = os.path.join(directory, 'test.json')
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump({'version': version, 'rule': 'first_match', 'default': 'Others',
+                   'categories': [{'name': 'Food', 'keywords': keywords}]}, f)
+    # Replace, and move the mtime on even within the filesystem's timestamp resolution
+    os.replace(path + '.tmp', path)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9 * version))
+
+
+def test_reload_swaps_model():
+    with tempfile.TemporaryDirectory() as directory:
+        write_model(directory, ['swiggy'])
+        models = CategoryModels(directory, reload_interval=0)
+        old = models.get('test')
+        assert old.categorize('Swiggy order') == 'Food'
+        assert old.categorize('Zomato order') == 'Others'
+
+        write_model(directory, ['swiggy', 'zomato'], version=2)
+        new = models.get('test')
+        assert new.version != old.version
+        assert new.categorize('Zomato order') == 'Food'
+        # A model already handed out keeps its categories
+        assert old.categorize('Zomato order') == 'Others'
+
+
+def test_bad_file_keeps_current_model():
+    with tempfile.TemporaryDirectory() as directory:
+        write_model(directory, ['swiggy'])
+        models = CategoryModels(directory, reload_interval=0)
+        current = models.get('test')
+
+        path = os.path.join(directory, 'test.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('{"version": 3, "categories": [')
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 5 * 10 ** 9))
+        assert models.get('test') is current
+
+
+def test_model_is_immutable():
+    with tempfile.TemporaryDirectory() as directory:
+        write_model(directory, ['swiggy'])
+        model = CategoryModels(directory).get('test')
+        try:
+            model.version = 'edited'
+        except AttributeError:
+            pass
+        else:
+            raise AssertionError("CategoryModel accepted an attribute change")
+
+
+def test_shipped_models_load():
+    models = CategoryModels()
+    for name in ('api', 'cli', 'app', 'fixed'):
+        assert models.get(name).version
@@ -0,0 +1,128 @@
+import os
+import json
+import time
+import random
+import tempfile
+
+import numpy as np
+import pytest
+
+from statement_core.category_model import CATEGORY_MODEL_DIR, CategoryModel
+from statement_core.classifier import NaiveBayesClassifier, hashed_ngrams, load_classifier, normalize, normalize_many
+
+HISTORY = [
+    ('Paid to Home Centre furniture', 'Shopping'),
+    ('Paid to HomeTown store', 'Shopping'),
+    ('Home loan EMI payment', 'Bills & Utilities'),
+    ('Electricity bill payment', 'Bills & Utilities'),
+    ('Car service centre', 'Transport'),
+    ('Uber trip payment', 'Transport'),
+    ('Swiggy order 4012345', 'Food & Dining'),
+    ('Zomato order 4098765', 'Food & Dining'),
+]
+
+
+def fnv_buckets(text, size, bits):
+    """Scalar FNV-1a, to check the vectorized hash against"""
+    data = f" {text} ".encode('utf-8')
+    buckets = []
+    for start in range(len(data) - size + 1):
+        h = 2166136261 ^ size
+        for byte in data[start:start + size]:
+            h = ((h ^ byte) * 16777619) & 0xFFFFFFFF
+        buckets.append(((h * 2654435769) & 0xFFFFFFFF) >> (32 - bits))
+    return buckets
+
+
+def test_hash_matches_scalar():
+    rows, buckets = hashed_ngrams(['swiggy order', 'ab'], sizes=(3,), bits=16)
+    assert rows.tolist() == [0] * 12 + [1] * 2
+    assert buckets.tolist() == fnv_buckets('swiggy order', 3, 16) + fnv_buckets('ab', 3, 16)
+
+
+def test_train_save_load():
+    descriptions, categories = zip(*HISTORY)
+    classifier = NaiveBayesClassifier.train(descriptions, categories, bits=14)
+    with tempfile.TemporaryDirectory() as directory:
+        classifier.save(os.path.join(directory, 'test'))
+        loaded = load_classifier('test', directory)
+        assert isinstance(loaded.log_likelihood, np.memmap)
+        predicted = loaded.predict(['Swiggy order 4011111', 'Home loan EMI', 'Uber trip'], min_confidence=0)
+        assert predicted.tolist() == ['Food & Dining', 'Bills & Utilities', 'Transport']
+        # Nothing like the history: not confident enough to answer
+        assert loaded.predict(['qqqq'], min_confidence=0.9).tolist() == [None]
+        assert load_classifier('missing', directory) is None
+
+        # Weights that no longer match their checksum are refused
+        weights = np.load(os.path.join(directory, 'test.npy'))
+        weights[0, 0] += 1
+        np.save(os.path.join(directory, 'test.npy'), weights)
+        with pytest.raises(ValueError, match='checksum'):
+            NaiveBayesClassifier.load(os.path.join(directory, 'test'))
+        assert load_classifier('test', directory) is None
+
+
+def test_model_falls_back_to_keywords():
+    with open(os.path.join(CATEGORY_MODEL_DIR, 'app.json'), encoding='utf-8') as f:
+        data = json.load(f)
+    descriptions, categories = zip(*HISTORY)
+    classifier = NaiveBayesClassifier.train(descriptions, categories, bits=14)
+    keywords_only = CategoryModel('app', data, 'digest')
+    model = CategoryModel('app', data, 'digest', classifier=classifier)
+    assert model.version != keywords_only.version
+
+    labels = model.categorize_many(['Swiggy order 4011111', 'qqqq'])
+    assert labels[0] == 'Food & Dining'
+    assert labels[1] == keywords_only.categorize('qqqq')
+    assert model.categorize('Uber trip') == 'Transport'
+
+
+def class_by_class(classifier, descriptions):
+    """Labels scored one class at a time from class-major weights, to compare predict() with"""
+    texts = [normalize(text) for text in descriptions]
+    rows, buckets = hashed_ngrams(texts, classifier.sizes, classifier.bits)
+    weights = np.ascontiguousarray(np.asarray(classifier.log_likelihood).T)
+    scores = np.empty((len(texts), len(classifier.classes)))
+    for index, class_weights in enumerate(weights):
+        scores[:, index] = np.bincount(rows, weights=class_weights[buckets], minlength=len(texts))
+    return classifier.classes[(scores + classifier.log_prior).argmax(axis=1)]
+
+
+def best_time(func, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def test_normalize_many():
+    texts = ['Swiggy  order 4012345', 'UPI\tRef 12 34', '', 'Café 99 बिल 5', 'a\x00b 7']
+    assert normalize_many(texts) == [normalize(text) for text in texts]
+
+
+def test_predict_speed():
+    rng = random.Random(0)
+    words = ['swiggy', 'zomato', 'uber', 'rent', 'airtel', 'salary', 'ramesh', 'store', 'cafe', 'pharmacy', 'fuel']
+    classes = [f"Class {index}" for index in range(18)]
+
+    def description():
+        return f"Paid to {' '.join(rng.sample(words, rng.randint(1, 3)))} UPI Ref {rng.randint(10 ** 9, 10 ** 10)}"
+
+    history = [description() for _ in range(5000)]
+    labels = [rng.choice(classes) for _ in history]
+    descriptions = [f"{description()} {rng.choice(words)}{index}" for index in range(10000)]
+
+    classifier = NaiveBayesClassifier.train(history, labels, bits=16)
+    assert classifier.predict(descriptions, min_confidence=0).tolist() == \
+        class_by_class(classifier, descriptions).tolist()
+    bucket_major = best_time(lambda: classifier.predict(descriptions, min_confidence=0))
+    reference = best_time(lambda: class_by_class(classifier, descriptions))
+    assert bucket_major < reference
+
+    # 10k distinct descriptions at the default table size
+    classifier = NaiveBayesClassifier.train(history, labels)
+    assert classifier.predict(descriptions, min_confidence=0).tolist() == \
+        class_by_class(classifier, descriptions).tolist()
+    assert best_time(lambda: classifier.predict(descriptions, min_confidence=0), repeat=5) < 0.05
@@ -0,0 +1,55 @@
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from statement_core.dates import DATE_FORMATS, DateParser, infer_format
+
+NOW = datetime(2025, 6, 1)
+
+
+def test_infer_format():
+    assert infer_format(['Nov 01, 2024', 'Nov 28, 2024']) == '%b %d, %Y'
+    # 13/11 only fits day-first, which settles 06/11 for the whole document
+    assert infer_format(['06/11/2024', '13/11/2024', '14/11/2024']) == '%d/%m/%Y'
+    assert infer_format(['06/11/2024']) == '%m/%d/%Y'
+    assert infer_format(['no date here']) is None
+
+
+def test_document_format_is_used():
+    dates = DateParser(now=NOW)
+    dates.infer(['13/11/2024', '14/11/2024'])
+    assert dates.parse('06/11/2024') == datetime(2024, 11, 6)
+    assert dates.parse(' 2024-11-06 ') == datetime(2024, 11, 6)
+    assert dates.parse('Nov 06, 2030') == datetime(2025, 11, 6)
+    assert dates.parse('garbage') == NOW
+
+
+def test_parse_many_matches_parse():
+    texts = pd.Series(['Nov 01 2024', 'Nov 28 2024', '01 Nov 2024', 'Dec 31 2030', 'nonsense'])
+    parsed = DateParser(now=NOW).parse_many(texts)
+    single = DateParser(now=NOW)
+    assert parsed.tolist() == [pd.Timestamp(single.parse(text)) for text in texts]
+
+
+def test_memoized_parse_is_faster():
+    texts = [f"Nov {day:02d}, 2024" for day in range(1, 29)] * 200
+
+    def old_parse(date_str):
+        for fmt in DATE_FORMATS:
+            try:
+                return datetime.strptime(date_str, fmt)
+            except ValueError:
+                continue
+
+    start = time.perf_counter()
+    expected = [old_parse(text) for text in texts]
+    old = time.perf_counter() - start
+
+    dates = DateParser(now=NOW)
+    start = time.perf_counter()
+    parsed = list(map(dates.parse, dates.inferring(texts, lambda text: text)))
+    new = time.perf_counter() - start
+
+    assert parsed == expected
+    assert new < old
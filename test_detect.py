@@ -0,0 +1,80 @@
+import io
+from unittest import mock
+
+from statement_core.detect import detect_issuer, sniff_issuer
+from statement_core.ingest import PdfSource, import_pymupdf
+
+TRANSACTIONS = [
+    'Nov 01, 2024 Paid to Paytm Payments Bank wallet DEBIT INR 500.00',
+    'Nov 02, 2024 Received from Ramesh Kumar Kotak Mahindra Bank CREDIT INR 1200.00',
+    'Nov 03, 2024 Paid to SWIGGY DEBIT INR 349.00',
+]
+
+
+def phonepe_statement():
+    """PhonePe statement whose transactions name other issuers"""
+    doc = import_pymupdf().open()
+    page = doc.new_page()
+    page.insert_text((30, 40), "PhonePe Transaction Statement", fontsize=9)
+    y = 60
+    for line in TRANSACTIONS:
+        page.insert_text((30, y), line, fontsize=8)
+        y += 14
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def test_detect_issuer():
+    assert detect_issuer('Paytm Payments Bank Passbook') == 'paytm'
+    assert detect_issuer('Paid to Paytm via PhonePe') == 'phonepe'
+    assert detect_issuer('nothing to see here') is None
+    # A brand name alone does not overrule the expected issuer...
+    assert detect_issuer('PhonePe: Paid to Paytm Payments Bank', expected='phonepe') == 'phonepe'
+    assert detect_issuer('Paid to Paytm', expected='phonepe') is None
+    # ...a real statement header does
+    assert detect_issuer('Paytm Payments Bank Passbook', expected='phonepe') == 'paytm'
+    assert detect_issuer('Kotak Mahindra Bank KKBK0001234 Withdrawal (Dr)', expected='phonepe') == 'kotak'
+
+
+def test_phonepe_statement_mentioning_other_issuers():
+    from api_statement_parser import parse_statement_from_file
+
+    pdf = phonepe_statement()
+    assert sniff_issuer(pdf) == 'paytm'
+    assert sniff_issuer(pdf, expected='phonepe') == 'phonepe'
+    response = parse_statement_from_file(pdf)
+    assert len(response['transactions']) == len(TRANSACTIONS)
+
+
+def test_parse_statement_keeps_the_phonepe_parser():
+    from statement_core.parsers import parse_statement
+
+    df = parse_statement(phonepe_statement())
+    assert len(df) == len(TRANSACTIONS)
+
+
+def test_streamlit_parser_keeps_the_phonepe_parser():
+    from statement_parser import StatementParser
+
+    upload = io.BytesIO(phonepe_statement())
+    upload.name = 'statement.pdf'
+    df = StatementParser(upload)._parse_pdf()
+    assert df['description'].str.contains('Paytm').any()
+    assert len(df) == len(TRANSACTIONS)
+
+
+def test_sniffing_and_parsing_open_the_pdf_once():
+    from api_statement_parser import parse_statement_from_file
+
+    source = PdfSource(data=phonepe_statement())
+    open_document = PdfSource.open_document
+    with mock.patch.object(PdfSource, 'open_document', autospec=True, side_effect=open_document) as opened:
+        response = parse_statement_from_file(source)
+    assert len(response['transactions']) == len(TRANSACTIONS)
+    assert opened.call_count == 1
+
+    # Once its pages are cached, the document is sniffed without opening it
+    with mock.patch.object(PdfSource, 'open_document', side_effect=AssertionError('PDF opened')):
+        assert sniff_issuer(PdfSource(data=phonepe_statement()), expected='phonepe') == 'phonepe'
+    source.close()
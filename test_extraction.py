@@ -0,0 +1,208 @@
+import os
+import tempfile
+import subprocess
+from unittest import mock
+
+from statement_core import extraction, ocr
+from statement_core.extraction import EXTRACTORS, extract_pages, iter_pages, split_lines, stitch_records
+from statement_core.ingest import as_source, import_pymupdf
+from statement_core.page_cache import PageTextCache
+from statement_core.parsers.phonepe import PhonePeLineParser
+
+PAGES = 20
+ROWS_PER_PAGE = 15
+
+
+def tabular_statement():
+    """PhonePe-style statement whose date, details, type and amount sit in separate table cells"""
+    doc = import_pymupdf().open()
+    for page_num in range(PAGES):
+        page = doc.new_page()
+        page.insert_text((30, 40), "PhonePe Transaction Statement", fontsize=9)
+        for x, title in [(30, 'Date'), (120, 'Transaction Details'), (380, 'Type'), (450, 'Amount')]:
+            page.insert_text((x, 60), title, fontsize=9)
+        y = 80
+        for row in range(ROWS_PER_PAGE):
+            index = page_num * ROWS_PER_PAGE + row
+            kind = 'DEBIT' if index % 3 else 'CREDIT'
+            page.insert_text((30, y), f"Nov {1 + index % 28:02d}, 2024", fontsize=8)
+            page.insert_text((120, y), ('Paid to ' if kind == 'DEBIT' else 'Received from ') + 'SWIGGY', fontsize=8)
+            page.insert_text((380, y), kind, fontsize=8)
+            page.insert_text((450, y), f"INR {100 + index}.50", fontsize=8)
+            y += 30
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def test_line_parser_on_every_backend():
+    pdf = tabular_statement()
+    parser = PhonePeLineParser(mode='loop')
+    results = {}
+    for name in EXTRACTORS:
+        pages = [split_lines(text) for text in extract_pages(pdf, workers=1, order=[name], use_cache=False)]
+        df = parser.transactions(pages)
+        results[name] = (len(df), int(df['amount_paise'].sum()))
+    assert results['pdfplumber'][0] == PAGES * ROWS_PER_PAGE
+    for name, result in results.items():
+        assert result == results['pdfplumber'], name
+
+
+def test_pool_matches_one_worker():
+    pdf = tabular_statement()
+    expected = extract_pages(pdf, workers=1, use_cache=False)
+    with mock.patch.object(extraction, 'MIN_PAGES_PER_WORKER', 5):
+        assert extract_pages(pdf, workers=3, use_cache=False) == expected
+
+
+def test_small_document_stays_in_process():
+    pdf = tabular_statement()
+    with mock.patch.object(extraction, 'ProcessPoolExecutor', side_effect=AssertionError('pool started')):
+        assert len(extract_pages(pdf, workers=4, use_cache=False)) == PAGES
+
+
+class FlakyExtractor:
+    """Backend that raises on odd pages and finds no text on the others but the first"""
+    name = 'flaky'
+
+    def __init__(self, source):
+        doc = source.open_document()
+        self.pages = doc.page_count
+        doc.close()
+
+    def page_count(self):
+        return self.pages
+
+    def page_text(self, page_num):
+        if page_num % 2:
+            raise RuntimeError('broken page')
+        return 'flaky text' if page_num == 0 else ' '
+
+    def close(self):
+        pass
+
+
+def test_pages_fall_back_to_the_next_backend():
+    pdf = tabular_statement()
+    expected = extract_pages(pdf, workers=1, order=['pymupdf'], use_cache=False)
+    with mock.patch.dict(EXTRACTORS, {'flaky': FlakyExtractor}):
+        pages = extract_pages(pdf, workers=1, order=['flaky', 'pymupdf'], use_cache=False)
+    assert pages == ['flaky text'] + expected[1:]
+
+
+def test_record_split_by_a_page_break_is_joined():
+    pages = [
+        ['Nov 01, 2024 Paid to SWIGGY DEBIT INR 100.00', 'Nov 02, 2024 Paid to Zomato'],
+        ['Page 2 of 2', 'DEBIT INR 250.00', 'Nov 03, 2024 Received from Ramesh CREDIT INR 75.00'],
+    ]
+    parser = PhonePeLineParser(mode='loop')
+    records = list(stitch_records(pages, parser.parse_line))
+    assert [record['amount_paise'] for record in records] == [-10000, -25000, 7500]
+    assert records[1]['description'] == 'Nov 02, 2024 Paid to Zomato DEBIT INR 250.00'
+
+
+def scanned_statement(title="PhonePe Transaction Statement", scans=1):
+    """One page with a text layer and others with only a drawing, as a scan has"""
+    doc = import_pymupdf().open()
+    doc.new_page().insert_text((30, 40), title, fontsize=9)
+    for _ in range(scans):
+        doc.new_page().draw_rect((30, 40, 300, 80), fill=(0, 0, 0))
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def tesseract_run(failing):
+    def run(command, **kwargs):
+        if failing:
+            raise subprocess.CalledProcessError(1, command)
+        return subprocess.CompletedProcess(command, 0, stdout=b'Nov 01, 2024 Paid to SWIGGY DEBIT INR 100.00')
+    return run
+
+
+def test_failed_ocr_is_not_cached():
+    pdf = scanned_statement()
+    for extract in (lambda: extract_pages(pdf, workers=1), lambda: list(iter_pages(pdf))):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = PageTextCache(os.path.join(directory, 'pages.db'))
+            with mock.patch('statement_core.extraction.page_cache', cache), \
+                    mock.patch.object(ocr, 'page_cache', cache), \
+                    mock.patch.object(ocr, 'OCR_ENABLED', True), \
+                    mock.patch.object(ocr, '_tesseract_version', 'tesseract 5.3.0'):
+                with mock.patch.object(ocr.subprocess, 'run', tesseract_run(failing=True)):
+                    assert extract()[1] == ''
+                # The failed page was not cached, so the next upload runs OCR again
+                with mock.patch.object(ocr.subprocess, 'run', tesseract_run(failing=False)):
+                    assert 'SWIGGY' in extract()[1]
+                # Once every page has text the document comes from the cache
+                with mock.patch.object(ocr.subprocess, 'run', tesseract_run(failing=True)):
+                    assert 'SWIGGY' in extract()[1]
+
+
+def ocr_installed():
+    return mock.patch.multiple(ocr, OCR_ENABLED=True, _tesseract_version='tesseract 5.3.0')
+
+
+def test_ocr_text_is_reused_by_page_hash():
+    with ocr_installed():
+        with mock.patch.object(ocr.subprocess, 'run', tesseract_run(failing=False)):
+            assert 'SWIGGY' in extract_pages(scanned_statement(), workers=1)[1]
+        # Another document holding the same scanned page needs no OCR
+        with mock.patch.object(ocr.subprocess, 'run', side_effect=AssertionError('tesseract ran')):
+            pages = extract_pages(scanned_statement(title="Re-exported statement"), workers=1)
+    assert pages[0] == 'Re-exported statement' and 'SWIGGY' in pages[1]
+
+
+class InlineExecutor:
+    """ProcessPoolExecutor stand-in that runs in this process"""
+
+    def __init__(self, max_workers, initializer, initargs):
+        initializer(*initargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def map(self, func, items):
+        return map(func, items)
+
+
+def test_ocr_pool_is_bounded():
+    pdf = scanned_statement(scans=4)
+    with ocr_installed(), mock.patch.object(ocr, 'OCR_WORKERS', 2), \
+            mock.patch.object(ocr, 'ProcessPoolExecutor', side_effect=InlineExecutor) as pool, \
+            mock.patch.object(ocr.subprocess, 'run', tesseract_run(failing=False)):
+        texts = ocr.ocr_pages(as_source(pdf), [1, 2, 3, 4], workers=8)
+    assert pool.call_args.kwargs['max_workers'] == 2
+    assert sorted(texts) == [1, 2, 3, 4] and all('SWIGGY' in text for text in texts.values())
+
+
+def test_ocr_page_timeout():
+    calls = []
+
+    def run(command, **kwargs):
+        calls.append(kwargs['timeout'])
+        raise subprocess.TimeoutExpired(command, kwargs['timeout'])
+
+    with mock.patch.object(ocr.subprocess, 'run', run):
+        assert ocr.run_tesseract(b'png') == ''
+    assert calls == [ocr.OCR_PAGE_TIMEOUT]
+
+
+def test_adaptive_dpi():
+    rect = import_pymupdf().Rect
+    a4 = ocr.adaptive_dpi(rect(0, 0, 595, 842))
+    assert ocr.OCR_MIN_DPI < a4 < ocr.OCR_MAX_DPI
+    assert (595 / 72 * a4) * (842 / 72 * a4) <= ocr.OCR_MAX_PIXELS
+    # Small slips get the most detail, oversized pages the least
+    assert ocr.adaptive_dpi(rect(0, 0, 200, 300)) == ocr.OCR_MAX_DPI
+    assert ocr.adaptive_dpi(rect(0, 0, 2000, 3000)) == ocr.OCR_MIN_DPI
+
+
+def test_ocr_is_skipped_when_disabled():
+    with mock.patch.object(ocr, 'OCR_ENABLED', False), \
+            mock.patch.object(ocr.subprocess, 'run', side_effect=AssertionError('tesseract ran')):
+        assert ocr.ocr_pages(as_source(scanned_statement()), [1]) == {}
+        assert extract_pages(scanned_statement(), workers=1)[1] == ''
@@ -0,0 +1,95 @@
+import io
+import os
+import tempfile
+
+import pytest
+
+from api_statement_parser import StatementParser, parse_statement_from_file
+from statement_core import ingest
+from statement_core.ingest import PdfSource, as_source, import_pymupdf, spool_upload
+
+
+def statement(pages=1):
+    doc = import_pymupdf().open()
+    for page_num in range(pages):
+        page = doc.new_page()
+        page.insert_text((30, 40), "PhonePe Transaction Statement", fontsize=9)
+        page.insert_text((30, 60), f"Nov {page_num + 1:02d}, 2024 Paid to SWIGGY DEBIT INR 349.00", fontsize=8)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+class FailingStream(io.BytesIO):
+    """Upload whose connection drops after the first read"""
+
+    def read(self, size=-1):
+        if self.tell():
+            raise ConnectionError('client went away')
+        return super().read(size)
+
+
+@pytest.fixture
+def spool_dir(tmp_path, monkeypatch):
+    directory = tmp_path / 'spool'
+    directory.mkdir()
+    monkeypatch.setattr(tempfile, 'tempdir', str(directory))
+    return directory
+
+
+def test_small_upload_stays_in_memory(spool_dir):
+    data = statement()
+    source = spool_upload(io.BytesIO(data), name='statement.pdf', threshold=len(data))
+    assert source.data == data and source.path is None
+    assert not os.listdir(spool_dir)
+
+
+def test_large_upload_is_spooled_and_removed_on_close(spool_dir):
+    data = statement()
+    source = spool_upload(io.BytesIO(data), name='statement.pdf', threshold=16)
+    assert source.data is None and os.path.dirname(source.path) == str(spool_dir)
+    with open(source.path, 'rb') as spooled:
+        assert spooled.read() == data
+    source.close()
+    assert not os.listdir(spool_dir)
+
+
+def test_failed_spool_leaves_no_file(spool_dir):
+    with pytest.raises(ConnectionError):
+        spool_upload(FailingStream(statement()), threshold=16)
+    assert not os.listdir(spool_dir)
+
+
+def test_as_source(tmp_path):
+    data = statement()
+    path = tmp_path / 'statement.pdf'
+    path.write_bytes(data)
+    source = PdfSource(data=data)
+    assert as_source(source) is source
+    assert as_source(str(path)).path == str(path)
+    assert as_source(path).name == 'statement.pdf'
+    assert as_source(bytearray(data)).data == data
+
+    upload = io.BytesIO(data)
+    upload.read()
+    # A file object is read from the start whatever its position
+    assert as_source(upload).data == data
+    # A file object already on disk is used in place
+    upload.path = str(path)
+    assert as_source(upload).path == str(path)
+
+
+def test_parse_removes_spooled_upload(spool_dir, monkeypatch):
+    monkeypatch.setattr(ingest, 'SPOOL_THRESHOLD', 16)
+    response = parse_statement_from_file(io.BytesIO(statement()))
+    assert len(response['transactions']) == 1
+    assert not os.listdir(spool_dir)
+
+    with pytest.raises(Exception):
+        parse_statement_from_file(io.BytesIO(b'not a pdf' * 10))
+    assert not os.listdir(spool_dir)
+
+
+def test_statement_parser_accepts_bytes():
+    df = StatementParser(statement(pages=2)).parse()
+    assert df['amount_paise'].tolist() == [-34900, -34900]
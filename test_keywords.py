@@ -0,0 +1,83 @@
+import os
+import json
+import random
+import time
+
+from statement_core.category_model import CATEGORY_MODEL_DIR
+from statement_core.keywords import KeywordAutomaton, KeywordCategorizer
+
+with open(os.path.join(CATEGORY_MODEL_DIR, 'app.json'), encoding='utf-8') as f:
+    CATEGORIES = {category['name']: category for category in json.load(f)['categories']}
+
+
+def scan_categorize(categories, description, default):
+    """The substring scan the automaton replaces: every keyword tested against the description"""
+    description = description.lower()
+    best_category = default
+    best_score = 0
+    for category, data in categories.items():
+        score = 0
+        for keyword in data['keywords']:
+            if keyword in description:
+                score += data['weight']
+        if score > best_score:
+            best_score = score
+            best_category = category
+    return best_category
+
+
+def descriptions(count, seed=0):
+    rng = random.Random(seed)
+    keywords = [keyword for data in CATEGORIES.values() for keyword in data['keywords']]
+    filler = ['paid to', 'UPI/', 'ref', '9876', 'received from', 'ltd', '@ybl', 'xyz']
+    return [' '.join(rng.choice(keywords).upper() if rng.random() < 0.3 else rng.choice(filler)
+                     for _ in range(rng.randint(1, 6)))
+            for _ in range(count)]
+
+
+def test_automaton_finds_overlapping_keywords():
+    automaton = KeywordAutomaton(['he', 'she', 'his', 'hers', 'upi', 'upi id'])
+    found = {automaton.keywords[index] for index in automaton.find('ushers via upi id')}
+    assert found == {'she', 'he', 'hers', 'upi', 'upi id'}
+
+
+def test_matches_keyword_scan():
+    categorizer = KeywordCategorizer(CATEGORIES, default='Other')
+    texts = descriptions(3000)
+
+    start = time.perf_counter()
+    expected = [scan_categorize(CATEGORIES, text, 'Other') for text in texts]
+    scan_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = [categorizer.categorize(text) for text in texts]
+    automaton_time = time.perf_counter() - start
+
+    assert actual == expected
+
+
+def test_categorize_many_matches_categorize():
+    categorizer = KeywordCategorizer(CATEGORIES, default='Other')
+    # A statement's worth of rows over a few dozen payees
+    payees = descriptions(40, seed=1)
+    rng = random.Random(2)
+    rows = [rng.choice(payees) + rng.choice(['', ' ', '  ']) for _ in range(5000)]
+
+    start = time.perf_counter()
+    expected = [categorizer.categorize(text) for text in rows]
+    one_by_one = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = categorizer.categorize_many(rows)
+    batched = time.perf_counter() - start
+
+    assert list(actual) == expected
+    assert list(categorizer.categorize_many(rows, rule='first_match')) == [categorizer.first_match(text) for text in rows]
+    assert len(categorizer.categorize_many([])) == 0
+
+
+def test_first_match():
+    categorizer = KeywordCategorizer({'Food': ['swiggy', 'food'], 'Transfer': ['upi', 'sent']}, default='Others')
+    assert categorizer.first_match('UPI sent to Swiggy') == 'Food'
+    assert categorizer.first_match('UPI sent') == 'Transfer'
+    assert categorizer.first_match('cash') == 'Others'
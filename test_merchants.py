@@ -0,0 +1,179 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import tempfile
+from functools import partial
+from unittest import mock
+
+from statement_core import merchants, payees
+from statement_core.category_model import CATEGORY_MODEL_DIR, CategoryModels
+from statement_core.merchants import MerchantMemo, memo_key, merchant_key
+from statement_core.parsers import phonepe
+from test_phonepe import RECORD_LINES, records_statement, table_statement
+
+DESCRIPTIONS = [
+    'Paid to SWIGGY',
+    'Received from SWIGGY',
+    'Paid to SWIGGY (swiggy@ybl) UTR No 401234567890',
+    'Paid to Ramesh Kumar',
+    'Received from Ramesh Kumar',
+    'Paid to 9876543210@ybl',
+]
+
+
+def test_merchant_key():
+    keys = [merchant_key(description) for description in DESCRIPTIONS]
+    assert keys == ['swiggy', 'swiggy', 'swiggy', 'ramesh kumar', 'ramesh kumar', '']
+    assert merchant_key('UPI/401234567890/Zomato Ltd/zomato.order@icici') == 'zomato ltd'
+
+
+def test_memo_key():
+    keys = [memo_key(description) for description in DESCRIPTIONS]
+    assert keys == ['paid to swiggy', 'received from swiggy', 'paid to swiggy (swiggy@ybl) utr no 0',
+                    'paid to ramesh kumar', 'received from ramesh kumar', 'paid to 0@ybl']
+    # Dates and amounts of a whole statement line fold away; digits inside words stay
+    assert memo_key('Nov 01, 2024 Paid to SWIGGY DEBIT INR 349.00') == 'nov 0, 0 paid to swiggy debit inr 0.0'
+    assert memo_key('ZEE5 renewal 199') == 'zee5 renewal 0'
+
+
+def test_keywords_keep_their_digits_next_to_letters():
+    # memo_key folds digit runs with no letter beside them, so no keyword may hold one
+    for name in ('api', 'cli', 'app', 'fixed'):
+        with open(os.path.join(CATEGORY_MODEL_DIR, f'{name}.json')) as f:
+            categories = json.load(f)['categories']
+        for category in categories:
+            for keyword in category['keywords']:
+                assert not re.search(r'(?<![^\W_])\d+(?![^\W_])', keyword), (name, keyword)
+
+
+def sample_descriptions():
+    """Descriptions of the sample statements in every PhonePe layout, and some odd ones"""
+    descriptions = list(DESCRIPTIONS) + [
+        'Received from Salary ACME',
+        'UPI/401234567890/Zomato Ltd/zomato.order@icici',
+        'Paid to ZEE5 subscription 199',
+        'Paid to 5paisa Capital 1,200.00',
+        'D2H Recharge 299',
+        'Transfer to 4012 3456 7890',
+        '',
+    ]
+    for layout, statement in (('records', records_statement()), ('lines', records_statement()),
+                              ('table', table_statement())):
+        descriptions += phonepe.parse(statement, layout=layout)['description'].tolist()
+    return descriptions
+
+
+def test_memo_never_changes_a_category():
+    descriptions = sample_descriptions()
+    models = CategoryModels()
+    with tempfile.TemporaryDirectory() as directory:
+        for name in ('api', 'cli', 'app', 'fixed'):
+            model = models.get(name)
+            expected = list(model.categorize_many(descriptions))
+            path = os.path.join(directory, f'{name}.db')
+            assert list(MerchantMemo(path).categorize_many(descriptions, model)) == expected, name
+            # A new process answers from the file alone
+            assert list(MerchantMemo(path).categorize_many(descriptions[::-1], model)) == expected[::-1], name
+
+
+def test_memo_matches_model_and_persists():
+    model = CategoryModels().get('api')
+    expected = list(model.categorize_many(DESCRIPTIONS))
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'merchants.db')
+        first = list(MerchantMemo(path).categorize_many(DESCRIPTIONS, model))
+        # A new process starts from what the first one learned
+        memo = MerchantMemo(path)
+        known = memo.warm(model.version)
+        assert known == dict(zip(map(memo_key, DESCRIPTIONS), expected))
+        assert first == expected
+        assert list(memo.categorize_many(DESCRIPTIONS, model)) == expected
+        # The direction stays in the key, so a transfer from a person is still one
+        assert expected[3:5] == ['Others', 'Transfer']
+
+
+def test_memo_is_bounded_and_counts():
+    model = CategoryModels().get('api')
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'merchants.db')
+        MerchantMemo(path, max_entries=1).categorize_many(['Paid to SWIGGY'], model)
+        # Another process finds swiggy, learns two more and sees the first one's counters
+        memo = MerchantMemo(path, max_entries=1)
+        memo.categorize_many(['Paid to SWIGGY', 'Paid to Zomato', 'Paid to Ramesh Kumar'], model)
+        stats = memo.get_stats()
+        assert stats['entries'] == 1
+        assert stats['evictions'] == 2
+        assert (stats['hits'], stats['misses']) == (1, 3)
+        assert stats['hit_rate'] == 0.25
+
+
+def test_recently_seen_merchant_survives_eviction():
+    model = CategoryModels().get('api')
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'merchants.db')
+        memo = MerchantMemo(path, max_entries=2)
+        for description in ['Paid to SWIGGY', 'Paid to Zomato', 'Paid to SWIGGY', 'Paid to Uber India']:
+            memo.categorize_many([description], model)
+            time.sleep(0.01)
+        # Swiggy was seen after Zomato, so Zomato is the one to go, in memory and on disk
+        assert list(memo.warm(model.version)) == ['paid to swiggy', 'paid to uber india']
+        conn = sqlite3.connect(path)
+        try:
+            stored = {merchant for merchant, in conn.execute('SELECT merchant FROM merchants')}
+        finally:
+            conn.close()
+        assert stored == {'paid to swiggy', 'paid to uber india'}
+        assert memo.get_stats()['evictions'] == 1
+
+
+def test_known_statement_does_not_write():
+    model = CategoryModels().get('api')
+    with tempfile.TemporaryDirectory() as directory:
+        memo = MerchantMemo(os.path.join(directory, 'merchants.db'))
+        expected = list(memo.categorize_many(DESCRIPTIONS, model))
+        # Nothing new to learn: hits wait in memory for the next flush
+        with mock.patch.object(memo, '_connect', side_effect=AssertionError("memo touched SQLite")):
+            assert list(memo.categorize_many(DESCRIPTIONS[::-1], model)) == expected[::-1]
+        stats = memo.get_stats()
+        assert (stats['hits'], stats['misses']) == (6, 6)
+
+
+def test_line_layout_statements_share_keys():
+    # The CLI keeps whole lines as descriptions; another month's statement
+    # with new days and amounts still finds its payees in the memo
+    categorize = partial(payees.categorize_many, model=CategoryModels().get('cli'))
+    first = phonepe.parse(records_statement(), layout='lines', categorize=categorize)
+    stats = merchants.merchant_memo.get_stats()
+    later = [re.sub(r'\d+', lambda match: str(int(match.group()) + 1), line) for line in RECORD_LINES]
+    second = phonepe.parse(records_statement(later), layout='lines', categorize=categorize)
+    after = merchants.merchant_memo.get_stats()
+    assert len(second) == len(first)
+    assert second['description'].tolist() != first['description'].tolist()
+    assert after['misses'] == stats['misses']
+    assert after['hits'] - stats['hits'] == second['description'].map(memo_key).nunique() > 0
+
+
+def best_time(func, repeat=20):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def test_memo_beats_model():
+    model = CategoryModels().get('api')
+    payees = ['SWIGGY', 'Zomato Ltd', 'Uber India', 'Airtel Prepaid', 'Ramesh Kumar'] + [f'Shop {i}' for i in range(40)]
+    descriptions = [f"{'Paid to' if i % 4 else 'Received from'} {payees[i * 7 % len(payees)]}" for i in range(500)]
+    with tempfile.TemporaryDirectory() as directory:
+        memo = MerchantMemo(os.path.join(directory, 'merchants.db'))
+        memo.categorize_many(descriptions, model)
+        plain = best_time(lambda: model.categorize_many(descriptions))
+        memoized = best_time(lambda: memo.categorize_many(descriptions, model))
+        single = best_time(lambda: memo.categorize_many(descriptions[:1], model))
+        single_plain = best_time(lambda: model.categorize_many(descriptions[:1]))
+    assert memoized < plain
+    assert single < single_plain
@@ -0,0 +1,62 @@
+import time
+from unittest import mock
+
+from statement_core import extraction
+from statement_core.extraction import extract_pages
+from statement_core.ingest import import_pymupdf
+from statement_core.page_cache import PageTextCache
+
+
+def statement(pages=3):
+    doc = import_pymupdf().open()
+    for page_num in range(pages):
+        doc.new_page().insert_text((30, 40), f"Nov {page_num + 1:02d}, 2024 Paid to SWIGGY DEBIT INR 100.00", fontsize=8)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def test_least_recently_used_document_is_evicted(cache_dir):
+    cache = PageTextCache(str(cache_dir / 'pages.db'), max_documents=2, max_ocr_pages=2)
+    cache.put_pages('old', 'v1', enumerate(['old page']), page_count=1)
+    time.sleep(0.01)
+    cache.put_pages('recent', 'v1', enumerate(['recent page']), page_count=1)
+    time.sleep(0.01)
+    # Reading the older document makes it the most recently used
+    assert cache.get_pages('old', 'v1') == ['old page']
+    time.sleep(0.01)
+    cache.put_pages('new', 'v1', enumerate(['new page', 'second']), page_count=2)
+
+    assert cache.get_pages('old', 'v1') == ['old page']
+    assert cache.get_pages('new', 'v1') == ['new page', 'second']
+    assert cache.get_pages('recent', 'v1') is None
+    conn = cache._connect()
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM pages WHERE doc_hash = 'recent'").fetchone()[0] == 0
+    finally:
+        conn.close()
+
+
+def test_ocr_pages_are_bounded(cache_dir):
+    cache = PageTextCache(str(cache_dir / 'pages.db'), max_ocr_pages=2)
+    cache.put_ocr_texts('v1', [('a', 'text a'), ('b', 'text b')])
+    time.sleep(0.01)
+    assert cache.get_ocr_texts(['a'], 'v1') == {'a': 'text a'}
+    time.sleep(0.01)
+    cache.put_ocr_texts('v1', [('c', 'text c')])
+    assert cache.get_ocr_texts(['a', 'b', 'c'], 'v1') == {'a': 'text a', 'c': 'text c'}
+
+
+def test_partial_document_is_not_cached(cache_dir):
+    cache = PageTextCache(str(cache_dir / 'pages.db'))
+    cache.put_pages('doc', 'v1', enumerate(['first page']))
+    assert cache.get_pages('doc', 'v1') is None
+    cache.put_pages('doc', 'v1', [(1, 'second page')], page_count=2)
+    assert cache.get_pages('doc', 'v1') == ['first page', 'second page']
+
+
+def test_cached_document_is_not_reopened():
+    pdf = statement()
+    pages = extract_pages(pdf, workers=1)
+    with mock.patch.object(extraction, '_PageSource', side_effect=AssertionError('PDF reopened')):
+        assert extract_pages(pdf, workers=1) == pages
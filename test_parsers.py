@@ -0,0 +1,89 @@
+import sys
+from datetime import datetime
+
+from statement_core.detect import UnsupportedStatementError
+from statement_core.parsers import COLUMNS, issuers, parser_module
+from statement_core.payees import PAYEE_COLUMNS
+
+
+def test_parsers_load_lazily():
+    for name in ('paytm', 'kotak', 'supermoney'):
+        sys.modules.pop(f'statement_core.parsers.{name}', None)
+    parser_module('paytm')
+    loaded = [name for name in issuers() if f'statement_core.parsers.{name}' in sys.modules]
+    assert 'paytm' in loaded and 'kotak' not in loaded and 'supermoney' not in loaded
+    try:
+        parser_module('hdfc')
+    except UnsupportedStatementError:
+        pass
+    else:
+        raise AssertionError("parser_module accepted an unknown issuer")
+
+
+def test_supermoney_lines():
+    text = "\n".join([
+        "SuperMoney statement",
+        "03/02/2024 Swiggy order debited ₹ 249.50",
+        "04/02/2024 Refund from Amazon + Rs. 1,000.00",
+        "05/02/2024 Coffee - INR 120",
+    ])
+    df = parser_module('supermoney').parse_text(text, categorize=lambda descriptions: ['Food'] * len(descriptions))
+    assert list(df.columns) == COLUMNS + PAYEE_COLUMNS
+    assert df['payee'].tolist() == ['coffee', 'amazon', 'swiggy order debited']
+    assert sorted(df['amount_paise'].tolist()) == [-24950, -12000, 100000]
+    assert (df['category'] == 'Food').all()
+
+
+def test_kotak_reconciles_in_paise():
+    lines = [
+        "01-02-2024 Opening 100.10(Cr) 100.10(Cr)",
+        "02-02-2024 UPI/Swiggy 0.20(Dr) 99.90(Cr)",
+        "03-02-2024 UPI/Refund 0.10(Cr) 100.00(Cr)",
+        "04-02-2024 Missing row 5.00(Dr) 90.00(Cr)",
+    ]
+    rows = list(parser_module('kotak').iter_transactions(lines))
+    assert [row['balance_ok'] for row in rows] == [True, True, True, False]
+
+    df = parser_module('kotak').parse_text('\n'.join(lines))
+    assert df['amount_paise'].tolist() == [row['amount_paise'] for row in rows]
+
+
+PAYTM_LINES = [
+    "Paytm Statement for 01 Nov - 30 Nov",
+    "Total received + Rs.1,234.00",
+    "Date & Time Transaction Details",
+    "02 Nov",
+    "10:15 PM Paid to Swiggy",
+    "UPI Ref No: 4312345678 - Rs.349.00",
+    "03 Nov",
+    "9:00 AM Received from Ramesh Kumar",
+    "UPI Ref No: 4312345679 +",
+    "Rs.1,200.50",
+    "04 Nov",
+    "Paid to Airtel for plan valid till 31 Feb",
+    "- Rs.499.00",
+    "05 Nov",
+    "Pending request, no amount",
+]
+
+
+def test_paytm_scanner():
+    dates, amounts, descriptions = parser_module('paytm').scan_lines(PAYTM_LINES)
+    # The header's total is not a transaction, nor is the row without an amount
+    assert dates == [datetime(2024, 11, 2), datetime(2024, 11, 3), datetime(2024, 11, 4)]
+    # A sign split from its amount by a line break still applies
+    assert amounts == [-34900, 120050, -49900]
+    assert descriptions == [
+        "02 Nov 10:15 PM Paid to Swiggy UPI Ref No: 4312345678 - Rs.349.00",
+        "03 Nov 9:00 AM Received from Ramesh Kumar UPI Ref No: 4312345679 + Rs.1,200.50",
+        # '31 Feb' is no date, so it does not open a transaction
+        "04 Nov Paid to Airtel for plan valid till 31 Feb - Rs.499.00",
+    ]
+
+
+def test_paytm_labels_without_categorizer():
+    df = parser_module('paytm').parse_text('\n'.join(PAYTM_LINES))
+    assert list(df.columns) == COLUMNS + PAYEE_COLUMNS
+    # Newest first
+    assert df['amount_paise'].tolist() == [-49900, 120050, -34900]
+    assert df['category'].tolist() == ['Debit', 'Credit', 'Debit']
@@ -0,0 +1,67 @@
+import os
+import json
+
+import pandas as pd
+
+from statement_core.category_model import CATEGORY_MODEL_DIR, CategoryModel
+from statement_core.payees import PayeeRules, add_payees, categorize_many, extract_vpa, payee_totals
+
+DESCRIPTIONS = [
+    'Paid to SWIGGY (Swiggy@YBL) UTR No 401234567890',
+    'Paid to Ramesh Kumar 9876543210@okaxis',
+    'Paid to PAYTMQR281005050101@paytm',
+    'Paid to Ramesh Kumar',
+    'Received from ramesh.k@gmail.com',
+]
+
+
+def test_extract_vpa():
+    vpas = [extract_vpa(description) for description in DESCRIPTIONS]
+    assert vpas == ['swiggy@ybl', '9876543210@okaxis', 'paytmqr281005050101@paytm', None, None]
+
+
+def test_rules_most_specific_wins():
+    rules = PayeeRules({
+        '@okaxis': 'Transfer',
+        '9876543210@okaxis': 'Rent',
+        'paytmqr*': 'Shopping',
+        'paytm*': 'Wallet',
+    })
+    assert len(rules) == 4
+    assert rules.match('9876543210@okaxis') == 'Rent'
+    assert rules.match('1234567890@okaxis') == 'Transfer'
+    assert rules.match('paytmqr281005050101@paytm') == 'Shopping'
+    assert rules.match('paytm.s1x@paytm') == 'Wallet'
+    assert rules.match('swiggy@ybl') is None
+    assert list(rules.match_many(['swiggy@ybl', None, '9876543210@okaxis'])) == [None, None, 'Rent']
+    try:
+        PayeeRules({'swiggy': 'Food'})
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("PayeeRules accepted a rule that is not a VPA")
+
+
+def test_rules_before_keywords():
+    with open(os.path.join(CATEGORY_MODEL_DIR, 'api.json'), encoding='utf-8') as f:
+        data = json.load(f)
+    expected = list(categorize_many(DESCRIPTIONS, CategoryModel('test', data, 'nopayees')))
+    assert expected[0] == 'Food'
+    # Payee rules ride along in the model file
+    data['payees'] = {'swiggy@ybl': 'Groceries', '@okaxis': 'Rent'}
+    model = CategoryModel('test', data, 'payees')
+    categories = list(categorize_many(DESCRIPTIONS, model))
+    assert categories[:2] == ['Groceries', 'Rent']
+    assert categories[2:] == expected[2:]
+
+
+def test_payee_totals():
+    df = add_payees(pd.DataFrame({
+        'amount_paise': [-25000, -12000, 50000, -1000, 0],
+        'description': DESCRIPTIONS,
+    }))
+    assert list(df['payee'][:4]) == ['swiggy@ybl', '9876543210@okaxis', 'paytmqr281005050101@paytm', 'ramesh kumar']
+    totals = payee_totals(df)
+    assert totals.loc['swiggy@ybl', 'spent_paise'] == -25000
+    assert totals.loc['paytmqr281005050101@paytm', 'net_paise'] == 50000
+    assert totals.index[0] == 'swiggy@ybl'
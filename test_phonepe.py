@@ -0,0 +1,193 @@
+from unittest import mock
+
+import pandas as pd
+
+from statement_core import extraction
+from statement_core.ingest import import_pymupdf
+from statement_core.parsers import COLUMNS, parser_module
+from statement_core.parsers import phonepe
+from statement_core.extraction import SKIP
+from statement_core.parsers.phonepe import LINE_PATTERN, PhonePeLineParser, PhonePeParser
+from statement_core.payees import PAYEE_COLUMNS
+
+RECORD_LINES = [
+    'PhonePe Transaction Statement',
+    'Nov 01, 2024 10:30 AM Paid to SWIGGY Debit INR 349.00',
+    '02 Nov 2024 Received from Ramesh Kumar 1,200.50',
+    'Nov 03, 2024 Paid to Uber India',
+    'Debit INR 140',
+    'Nov04,2024 Paid to Airtel Debit INR 499',
+    # Both patterns match this record; each span goes to the earliest match
+    '06 Nov 2024 Cashback 25 Nov 07, 2024 Paid to Zomato Debit INR 300',
+    'Nov 08, 2024 Received from Amazon Credit INR 1,000.00',
+]
+
+HEADER = [(30, 'Date'), (120, 'Transaction Details'), (380, 'Type'), (450, 'Amount')]
+
+# (date, narration rows, type, amount)
+TABLE_ROWS = [
+    ('Nov 02, 2024', ['Paid to SWIGGY'], 'DEBIT', 'Rs.349.00'),
+    ('Nov 01, 2024', ['Received from Ramesh', 'Kumar'], 'CREDIT', 'Rs.1,200.50'),
+    ('Nov 03, 2024', ['Paid to Uber India'], 'DEBIT', '₹140'),
+]
+
+
+def table_statement(rows=TABLE_ROWS):
+    """PhonePe table statement: a dated row, wrapped narration, then ID and UTR rows"""
+    doc = import_pymupdf().open()
+    y = None
+    for index, (date, narration, kind, amount) in enumerate(rows):
+        if y is None or y > 760:
+            page = doc.new_page()
+            page.insert_text((30, 40), "Transaction Statement for 98xxxxxx", fontsize=9)
+            for x, label in HEADER:
+                page.insert_text((x, 60), label, fontsize=9)
+            y = 78
+        page.insert_text((30, y), date, fontsize=8)
+        page.insert_text((380, y), kind, fontsize=8)
+        page.insert_text((450, y), amount, fontsize=8)
+        for part in narration:
+            page.insert_text((120, y), part, fontsize=8)
+            y += 11
+        page.insert_text((30, y), "10:30 am", fontsize=8)
+        page.insert_text((120, y), f"Transaction ID T24110{index:06d}", fontsize=8)
+        y += 11
+        page.insert_text((120, y), f"UTR No. 4312{index:08d}", fontsize=8)
+        y += 16
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def test_table_layout():
+    df = parser_module('phonepe').parse(table_statement(), layout='table',
+                                        categorize=lambda descriptions: ['Others'] * len(descriptions))
+    assert list(df.columns) == COLUMNS + PAYEE_COLUMNS
+    assert df['date'].tolist() == list(pd.to_datetime(['2024-11-01', '2024-11-02', '2024-11-03']))
+    # Wrapped narration is joined; the ID and UTR rows are not part of it
+    assert df['description'].tolist() == ['Received from Ramesh Kumar', 'Paid to SWIGGY', 'Paid to Uber India']
+    assert df['amount_paise'].tolist() == [120050, -34900, -14000]
+
+
+def test_table_layout_without_a_table():
+    doc = import_pymupdf().open()
+    doc.new_page().insert_text((30, 40), "Nov 01, 2024 Paid to SWIGGY DEBIT INR 349.00", fontsize=8)
+    data = doc.tobytes()
+    doc.close()
+    assert parser_module('phonepe').parse(data, layout='table') is None
+
+
+def test_table_layout_over_several_pages():
+    rows = [(f'Nov {index % 28 + 1:02d}, 2024', [f'Paid to Merchant {index}'], 'DEBIT', 'Rs.10.00')
+            for index in range(60)]
+    df = parser_module('phonepe').parse(table_statement(rows), layout='table')
+    assert len(df) == len(rows)
+    # The next page's title is not appended to the last row of a page
+    assert sorted(df['description']) == sorted(f'Paid to Merchant {index}' for index in range(60))
+
+
+def test_table_layout_keeps_same_day_order():
+    rows = [(f'Nov {day:02d}, 2024', [f'Paid to Merchant {index}'], 'DEBIT', f'Rs.{index + 1}.00')
+            for index, day in enumerate([2, 1] + [3] * 40)]
+    df = parser_module('phonepe').parse(table_statement(rows), layout='table')
+    assert df['description'].tolist() == [f'Paid to Merchant {index}' for index in [1, 0] + list(range(2, 42))]
+
+
+def records_statement(lines=RECORD_LINES):
+    doc = import_pymupdf().open()
+    page = doc.new_page()
+    for index, line in enumerate(lines):
+        page.insert_text((30, 40 + 14 * index), line, fontsize=8)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def test_record_modes_match_row_for_row():
+    pdf = records_statement()
+    loop = PhonePeParser(pdf, mode='loop').parse()
+    vectorized = PhonePeParser(pdf, mode='vectorized').parse()
+    pd.testing.assert_frame_equal(loop, vectorized)
+    assert loop['amount_paise'].tolist() == [-34900, 120050, -14000, -49900, 2500, -30000, 100000]
+    assert loop['date'].dtype == 'datetime64[ns]'
+
+
+def test_record_modes_share_the_cpu_budget():
+    for mode in ('loop', 'vectorized'):
+        parser = PhonePeParser(records_statement(), mode=mode)
+        parser.tokenizer.cpu_budget = 0
+        assert parser.parse().empty
+        assert parser.truncated, mode
+
+
+def test_first_transaction_is_yielded_before_the_statement_is_read(monkeypatch):
+    doc = import_pymupdf().open()
+    for page_num in range(5):
+        page = doc.new_page()
+        for row in range(20):
+            page.insert_text((30, 40 + 14 * row), f"Nov {row + 1:02d}, 2024 Paid to Merchant {page_num}-{row} "
+                                                  f"DEBIT INR {row + 1}.00", fontsize=8)
+    pdf = doc.tobytes()
+    doc.close()
+    monkeypatch.setattr(phonepe, 'ITER_CHUNK_SIZE', 8)
+    calls = []
+    categorize = lambda descriptions: calls.append(len(descriptions)) or ['Others'] * len(descriptions)
+
+    read = []
+    page_text = extraction._PageSource.page_text
+    with mock.patch.object(extraction._PageSource, 'page_text', autospec=True,
+                           side_effect=lambda pages, page_num: read.append(page_num) or page_text(pages, page_num)):
+        transactions = PhonePeParser(pdf, categorize=categorize).iter_transactions()
+        first = next(transactions)
+        assert first['description'] == 'Paid to Merchant 0-0' and first['category'] == 'Others'
+        # The date format is settled from the first 20 dates, which reach into page 1
+        assert read == [0, 1] and calls == [8]
+        rest = list(transactions)
+    assert len(rest) == 99 and read == [0, 1, 2, 3, 4]
+    assert calls == [8] * 12 + [4]
+
+
+# (line, LINE_PATTERN alternative, amount in paise, description)
+LINE_FORMATS = [
+    ('Nov 01, 2024 Paid to SWIGGY DEBIT INR 349.00', 'amount_typed', -34900,
+     'Nov 01, 2024 Paid to SWIGGY DEBIT INR 349.00'),
+    ('Nov 02, 2024 10:30 AM Netflix Rs 199.00', 'amount_timed', 19900, 'Netflix'),
+    ('05/11/2024 Transfer ₹1,000.00', 'amount_numeric', 100000, '05/11/2024 Transfer ₹1,000.00'),
+]
+
+
+def test_line_pattern_names_each_format():
+    parser = PhonePeLineParser(mode='loop')
+    for line, kind, paise, description in LINE_FORMATS:
+        assert LINE_PATTERN.search(line).lastgroup == kind
+        record = parser.parse_line(line)
+        assert (record['amount_paise'], record['description']) == (paise, description)
+    # The vectorized mode runs the same alternation over every line at once
+    pages = [[line for line, *_ in LINE_FORMATS]]
+    pd.testing.assert_frame_equal(PhonePeLineParser(mode='loop').transactions(pages),
+                                  PhonePeLineParser(mode='vectorized').transactions(pages), check_dtype=False)
+
+
+def test_lines_that_cannot_match_skip_the_regex():
+    parser = PhonePeLineParser(mode='loop')
+    with mock.patch.object(phonepe, 'LINE_PATTERN', mock.Mock(search=mock.Mock(side_effect=AssertionError))):
+        # A header, no currency marker, no month name or '/'
+        assert parser.parse_line('Page 1 of 3') is SKIP
+        assert parser.parse_line('Nov 01, 2024 Paid to SWIGGY 349.00') is None
+        assert parser.parse_line('Closing balance INR 500.00') is None
+
+
+class CountingStr(str):
+    """A line that counts its lower() calls"""
+    lowered = 0
+
+    def lower(self):
+        CountingStr.lowered += 1
+        return super().lower()
+
+
+def test_line_is_lowercased_once():
+    CountingStr.lowered = 0
+    record = PhonePeLineParser(mode='loop').parse_line(CountingStr(LINE_FORMATS[0][0]))
+    assert record['amount_paise'] == -34900
+    assert CountingStr.lowered == 1
@@ -0,0 +1,88 @@
+import io
+import os
+
+import api_statement_parser
+from api_statement_parser import parse_statement_from_file
+from statement_core.ingest import PdfSource, import_pymupdf
+from statement_core.result_cache import ResultCache
+
+
+def statement(payee='SWIGGY'):
+    doc = import_pymupdf().open()
+    page = doc.new_page()
+    page.insert_text((30, 40), "PhonePe Transaction Statement", fontsize=9)
+    page.insert_text((30, 60), f"Nov 01, 2024 Paid to {payee} DEBIT INR 349.00", fontsize=8)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def test_memory_tier_evicts_least_recently_used(cache_dir):
+    cache = ResultCache(str(cache_dir / 'results'), max_entries=2)
+    cache.put('a', {'result': 'a'})
+    cache.put('b', {'result': 'b'})
+    assert cache.get('a') == {'result': 'a'}
+    cache.put('c', {'result': 'c'})
+    # 'b' left memory but is still on disk
+    assert cache.get('b') == {'result': 'b'}
+    stats = cache.get_stats()
+    assert (stats['memory_hits'], stats['disk_hits'], stats['misses']) == (1, 1, 0)
+    assert stats['memory_evictions'] == 2
+    assert stats['memory_entries'] == 2
+
+
+def test_disk_tier_is_shared_and_bounded(cache_dir):
+    directory = str(cache_dir / 'results')
+    ResultCache(directory).put('a', {'result': 'a'})
+    # Another worker finds it on disk
+    other = ResultCache(directory)
+    assert other.get('a') == {'result': 'a'}
+    assert other.get('missing') is None
+    assert (other.stats['disk_hits'], other.stats['misses']) == (1, 1)
+
+    size = os.path.getsize(os.path.join(directory, 'a.json'))
+    small = ResultCache(directory, max_disk_bytes=2 * size)
+    os.utime(os.path.join(directory, 'a.json'), (0, 0))
+    small.put('b', {'result': 'b'})
+    small.put('c', {'result': 'c'})
+    # The least recently used file goes first
+    assert sorted(os.listdir(directory)) == ['b.json', 'c.json']
+    assert small.stats['disk_evictions'] == 1
+
+
+def test_key_changes_with_content_and_version():
+    cache = ResultCache()
+    data = statement('SWIGGY')
+    first, second = PdfSource(data=data), PdfSource(data=statement('Zomato'))
+    assert cache.key(first, 'v1') == cache.key(PdfSource(data=bytes(data)), 'v1')
+    assert cache.key(first, 'v1') != cache.key(second, 'v1')
+    assert cache.key(first, 'v1') != cache.key(first, 'v2')
+
+
+def test_parser_change_invalidates_results(monkeypatch):
+    data = statement()
+    parse_statement_from_file(data)
+    parse_statement_from_file(data)
+    assert api_statement_parser.result_cache.stats['memory_hits'] == 1
+    monkeypatch.setattr(api_statement_parser, 'PARSER_VERSION', 'changed')
+    parse_statement_from_file(data)
+    assert api_statement_parser.result_cache.stats['misses'] == 2
+
+
+def test_cache_stats_endpoint(monkeypatch, tmp_path):
+    # The app writes its log file under the working directory
+    monkeypatch.chdir(tmp_path)
+    import api_server
+    monkeypatch.setattr(api_server, 'result_cache', api_statement_parser.result_cache)
+
+    client = api_server.app.test_client()
+    data = statement()
+    for _ in range(2):
+        upload = {'file': (io.BytesIO(data), 'statement.pdf')}
+        response = client.post('/analyze-statement', data=upload, content_type='multipart/form-data')
+        assert response.status_code == 200
+    stats = client.get('/cache-stats').get_json()
+    assert (stats['memory_hits'], stats['disk_hits'], stats['misses']) == (1, 0, 1)
+    assert stats['hit_rate'] == 0.5
+    assert stats['memory_entries'] == 1
+    assert 'merchant_memo' in stats
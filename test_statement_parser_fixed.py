@@ -0,0 +1,31 @@
+import io
+
+from statement_core.ingest import import_pymupdf
+from statement_parser_fixed import StatementParser
+
+LINES = [
+    'Nov 01, 2024 Paid to SWIGGY DEBIT Rs. 349.00',
+    # The same order twice in a day is two real payments
+    'Nov 02, 2024 Paid to Uber India DEBIT Rs. 120.50',
+    'Nov 02, 2024 Paid to Uber India DEBIT Rs. 120.50',
+    'Nov 03, 2024 Received from Ramesh Kumar CREDIT Rs. 1,000.00',
+]
+
+
+def text_statement():
+    doc = import_pymupdf().open()
+    page = doc.new_page()
+    page.insert_text((30, 40), "PhonePe Transaction Statement", fontsize=9)
+    for index, line in enumerate(LINES):
+        page.insert_text((30, 60 + 14 * index), line, fontsize=8)
+    upload = io.BytesIO(doc.tobytes())
+    doc.close()
+    upload.name = 'statement.pdf'
+    return upload
+
+
+def test_text_mode_keeps_repeated_payments():
+    df = StatementParser(text_statement(), mode='text').parse()
+    assert len(df) == len(LINES)
+    assert df['description'].tolist().count('Paid to Uber India') == 2
+    assert round(df['amount'].sum(), 2) == 410.0
@@ -0,0 +1,57 @@
+import random
+import time
+
+from api_statement_parser import TRANSACTION_PATTERNS
+from statement_core.tokenizer import RecordTokenizer
+
+FRAGMENTS = [
+    'Jan 01, 2024', '12 Mar 2024', '10:30 AM', 'Paid to', 'Received from', 'DEBIT', 'Credit',
+    'INR', '₹', 'Rs.', '1,250.00', '99', ',', '.', ' ', '   ', 'UPI', 'Transaction ID T2401',
+]
+
+
+def fuzz_lines(count, seed=0):
+    """Random statement-like lines, heavy on dates and digits without amounts"""
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(count):
+        size = rng.randint(1, 40)
+        lines.append(' '.join(rng.choice(FRAGMENTS) for _ in range(size)))
+    return lines
+
+
+def adversarial_lines(count):
+    """Every line opens a record but no amount ever closes the pattern"""
+    return ['Jan 01, 2024 ' + '1 ' * 200 + 'x' * 500 for _ in range(count)]
+
+
+def time_tokenizer(lines):
+    tokenizer = RecordTokenizer(TRANSACTION_PATTERNS)
+    start = time.process_time()
+    for _ in tokenizer.matches(lines):
+        pass
+    return time.process_time() - start
+
+
+def test_linear_time():
+    for make_lines in (fuzz_lines, adversarial_lines):
+        small = time_tokenizer(make_lines(500))
+        large = time_tokenizer(make_lines(4000))
+        # 8x the input; allow generous noise but nothing near quadratic (64x)
+        assert large < max(small, 0.01) * 20
+
+
+def test_single_huge_line_is_bounded():
+    line = 'Jan 01, 2024 ' + ' '.join(['123'] * 200000)
+    elapsed = time_tokenizer([line])
+    assert elapsed < 1
+
+
+def test_budget_truncates():
+    tokenizer = RecordTokenizer(TRANSACTION_PATTERNS, cpu_budget=0)
+    matches = list(tokenizer.matches(fuzz_lines(1000)))
+    assert tokenizer.truncated
+
+    tokenizer = RecordTokenizer(TRANSACTION_PATTERNS)
+    list(tokenizer.matches(fuzz_lines(1000)))
+    assert not tokenizer.truncated